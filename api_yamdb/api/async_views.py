@@ -0,0 +1,296 @@
+"""Асинхронные представления чтения для развёртывания на ASGI.
+
+Под ASGI GET-запросы к произведениям, жанрам, категориям, отзывам и
+комментариям обслуживают эти представления (см. AsyncReadMiddleware).
+Независимые запросы к БД одного ответа — строка произведения, его
+жанры, распределение оценок, страница отзывов, количество записей —
+выполняются параллельно в ограниченном пуле потоков, поэтому время
+ответа определяется самым долгим запросом, а не их суммой.
+
+Аутентификация, права, фильтрация, поиск, сортировка, набор полей и
+пагинация берутся из представлений DRF тех же ресурсов, а проверки DRF
+перед действием (initial) выполняются в пуле параллельно с запросами
+данных. Запросы, ответом на которые будет ошибка, а также выборка по
+списку id и ответы не в JSON передаются синхронным представлениям DRF,
+так что ответ не зависит от способа развёртывания.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.urls import resolve
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api_yamdb.constants import ASYNC_READ_WORKERS, EXPAND_COMMENTS_SIZE
+from api_yamdb.db_routers import load_related
+from reviews.models import Comment, Genre, Review, Title, TitleScoreHistogram
+from .multiget import IDS_PARAM
+from .serializers import (CommentSerializer, ReviewSerializer,
+                          TitleReadSerializer)
+from .utils import call_in_thread
+from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+                    ReviewViewSet, TitleViewSet)
+
+# Параметры, меняющие действие или формат ответа представления DRF.
+SYNC_PARAMS = {IDS_PARAM, api_settings.URL_FORMAT_OVERRIDE}
+
+executor = ThreadPoolExecutor(
+    max_workers=ASYNC_READ_WORKERS, thread_name_prefix='read'
+)
+
+
+async def gather(*functions):
+    """Параллельное выполнение функций, обращающихся к БД. Функции
+    получают контекстные переменные запроса, в том числе выбор реплики.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(
+        loop.run_in_executor(
+            executor, contextvars.copy_context().run, call_in_thread,
+            function
+        )
+        for function in functions
+    ))
+
+
+async def fallback(request):
+    """Ответ синхронного представления DRF на тот же запрос."""
+    match = resolve(request.path_info, settings.ROOT_URLCONF)
+    return await sync_to_async(match.func)(
+        request, *match.args, **match.kwargs
+    )
+
+
+async def run(view, *functions):
+    """Проверки DRF перед действием view — аутентификация (для
+    JWTAuthentication это запрос пользователя к БД), права и ограничение
+    частоты — параллельно с функциями functions. Возвращает результаты
+    functions.
+    """
+    _, *results = await gather(
+        partial(view.initial, view.request, *view.args, **view.kwargs),
+        *functions
+    )
+    return results
+
+
+def read_view(viewset, action):
+    """Асинхронное представление GET-запросов к действию action
+    представления DRF viewset. Представление получает экземпляр viewset
+    с запросом DRF. Остальные запросы, а также запросы, для которых
+    представление вернуло None или завершилось ошибкой, обслуживает
+    синхронное представление.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or SYNC_PARAMS & set(request.GET):
+                return await fallback(request)
+            drf_view = viewset(
+                action_map={'get': action}, args=args, kwargs=kwargs,
+                format_kwarg=None
+            )
+            drf_request = drf_view.request = drf_view.initialize_request(
+                request, *args, **kwargs
+            )
+            try:
+                response = await view(drf_view, drf_request, *args, **kwargs)
+            except (APIException, Http404):
+                response = None
+            if response is None or not isinstance(
+                getattr(drf_request, 'accepted_renderer', None), JSONRenderer
+            ):
+                return await fallback(request)
+            return response
+        return wrapper
+    return decorator
+
+
+def filtered(view, queryset):
+    """queryset с фильтрами, поиском, сортировкой и связями из набора
+    полей представления view. Столбцы не откладываются: сериализатор может
+    читать поля вне набора, а догрузить их в цикле событий нельзя.
+    """
+    return view.filter_queryset(queryset).defer(None)
+
+
+def render(data):
+    return HttpResponse(
+        JSONRenderer().render(data), content_type='application/json'
+    )
+
+
+def get_page(request, paginator):
+    """Номер страницы или None, если он некорректен."""
+    try:
+        page = int(request.query_params.get(paginator.page_query_param, 1))
+    except ValueError:
+        return None
+    return page if page >= 1 else None
+
+
+def paginate(request, paginator, page, size, count, results):
+    """Ответ в формате PageNumberPagination или None для пустой
+    страницы после первой.
+    """
+    if page > 1 and (page - 1) * size >= count:
+        return None
+    param = paginator.page_query_param
+    url = request.build_absolute_uri()
+    previous = None
+    if page == 2:
+        previous = remove_query_param(url, param)
+    elif page > 2:
+        previous = replace_query_param(url, param, page - 1)
+    return {
+        'count': count,
+        'next': replace_query_param(url, param, page + 1)
+        if page * size < count else None,
+        'previous': previous,
+        'results': results,
+    }
+
+
+async def list_response(view, request, queryset, serializer_class,
+                        context=None, exists=None):
+    """Страница списка queryset с фильтрами, набором полей и пагинацией
+    представления view. Строки страницы, количество записей и проверка
+    exists родительского объекта выполняются параллельно; фильтры
+    применяются в каждом потоке, так как фильтр может читать БД.
+    """
+    paginator = view.paginator
+    page = get_page(request, paginator)
+    size = paginator.get_page_size(request)
+    if page is None or size is None:
+        return None
+    functions = [
+        lambda: list(
+            filtered(view, queryset)[(page - 1) * size:page * size]
+        ),
+        lambda: filtered(view, queryset).count(),
+    ]
+    if exists is not None:
+        functions.append(exists)
+    rows, count, *found = await run(view, *functions)
+    if found and not found[0]:
+        return None
+    data = paginate(request, paginator, page, size, count, serializer_class(
+        rows, many=True, context=context or {'request': request}
+    ).data)
+    return None if data is None else render(data)
+
+
+@read_view(GenreViewSet, 'list')
+async def genre_list(view, request):
+    return await list_response(
+        view, request, view.get_queryset(), view.get_serializer_class(),
+        view.get_serializer_context()
+    )
+
+
+@read_view(CategoryViewSet, 'list')
+async def category_list(view, request):
+    return await list_response(
+        view, request, view.get_queryset(), view.get_serializer_class(),
+        view.get_serializer_context()
+    )
+
+
+@read_view(TitleViewSet, 'list')
+async def title_list(view, request):
+    # get_queryset выбирает пагинацию по параметрам запроса.
+    return await list_response(
+        view, request, view.get_queryset(), view.get_serializer_class(),
+        view.get_serializer_context()
+    )
+
+
+def latest_reviews(title_id, comments):
+    """Первая страница отзывов произведения с последними комментариями."""
+    reviews = load_related(
+        Review.objects.filter(title_id=title_id), 'author'
+    ).order_by('-pub_date', '-pk')
+    if comments:
+        reviews = reviews.prefetch_latest_comments(EXPAND_COMMENTS_SIZE)
+    return list(reviews[:api_settings.PAGE_SIZE])
+
+
+@read_view(TitleViewSet, 'retrieve')
+async def title_detail(view, request, pk):
+    expand = view.get_expand()
+    fields = view.get_fieldset()
+    # Жанры и распределение оценок загружаются параллельно со строкой
+    # произведения, а не через prefetch_related.
+    functions = [
+        lambda: filtered(
+            view, Title.objects.filter(pk=pk)
+        ).prefetch_related(None).first(),
+        partial(list, Genre.objects.filter(titles=pk))
+        if 'genre' in fields else list,
+        TitleScoreHistogram.objects.filter(title_id=pk).first
+        if 'score_histogram' in fields else lambda: None,
+    ]
+    if 'reviews' in expand:
+        functions.append(
+            partial(latest_reviews, pk, 'latest_comments' in expand)
+        )
+    title, genres, histogram, *reviews = await run(view, *functions)
+    if title is None:
+        return None
+    title._prefetched_objects_cache = {'genre': genres}
+    Title.score_histogram.related.set_cached_value(title, histogram)
+    if reviews:
+        title.latest_reviews = reviews[0]
+    return render(TitleReadSerializer(
+        title, context=view.get_serializer_context()
+    ).data)
+
+
+@read_view(ReviewViewSet, 'list')
+async def review_list(view, request, title_id):
+    return await list_response(
+        view, request, Review.objects.filter(title_id=title_id),
+        ReviewSerializer, exists=Title.objects.filter(pk=title_id).exists
+    )
+
+
+@read_view(ReviewViewSet, 'retrieve')
+async def review_detail(view, request, title_id, pk):
+    review, = await run(view, lambda: filtered(
+        view, Review.objects.filter(title_id=title_id, pk=pk)
+    ).first())
+    if review is None:
+        return None
+    return render(ReviewSerializer(
+        review, context={'request': request}
+    ).data)
+
+
+@read_view(CommentViewSet, 'list')
+async def comment_list(view, request, title_id, review_id):
+    return await list_response(
+        view, request, Comment.objects.filter(review_id=review_id),
+        CommentSerializer,
+        exists=Review.objects.filter(pk=review_id, title_id=title_id).exists
+    )
+
+
+@read_view(CommentViewSet, 'retrieve')
+async def comment_detail(view, request, title_id, review_id, pk):
+    comment, = await run(view, lambda: filtered(
+        view, Comment.objects.filter(
+            review__title_id=title_id, review_id=review_id, pk=pk
+        )
+    ).first())
+    if comment is None:
+        return None
+    return render(CommentSerializer(
+        comment, context={'request': request}
+    ).data)
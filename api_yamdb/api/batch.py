@@ -0,0 +1,114 @@
+"""Выполнение пакета вложенных запросов к API одним HTTP-запросом.
+
+Вложенные запросы разрешаются тем же URL-резолвером и выполняются теми
+же представлениями, что и обычные. Пользователь определяется один раз
+по внешнему запросу и передаётся вложенным. Подряд идущие GET-запросы
+выполняются параллельно в ограниченном пуле потоков, запросы с другими
+методами — последовательно, в порядке пакета, поэтому GET после POST
+видит результат записи. Ошибка одного вложенного запроса не прерывает
+пакет: его результат — статус 500.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.constants import BATCH_WORKERS
+from .utils import call_in_thread
+
+# Заголовки внешнего запроса, которые не переходят во вложенные.
+REQUEST_KEYS = (
+    'wsgi.input', 'CONTENT_LENGTH', 'CONTENT_TYPE', 'PATH_INFO',
+    'QUERY_STRING', 'REQUEST_METHOD',
+)
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=BATCH_WORKERS, thread_name_prefix='batch'
+)
+
+
+def build_request(request, method, path, body=None):
+    """Вложенный запрос с заголовками и пользователем внешнего."""
+    path, _, query = path.partition('?')
+    content = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in REQUEST_KEYS
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+    })
+    sub_request = WSGIRequest(environ)
+    if request.user.is_authenticated:
+        # Токен уже проверен при разборе внешнего запроса.
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def perform(request, method, path, body=None):
+    """Результат вложенного запроса: {'status': ..., 'body': ...}."""
+    sub_request = build_request(request, method, path, body)
+    try:
+        match = resolve(sub_request.path_info)
+    except Resolver404:
+        return {'status': 404, 'body': {'detail': 'Страница не найдена.'}}
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('Ошибка вложенного запроса %s %s', method, path)
+        return {
+            'status': 500,
+            'body': {'detail': 'Внутренняя ошибка сервера.'},
+        }
+    if hasattr(response, 'data'):
+        body = response.data
+    elif response.content:
+        body = response.content.decode(response.charset)
+    else:
+        body = None
+    return {'status': response.status_code, 'body': body}
+
+
+def perform_batch(request, items):
+    """Результаты вложенных запросов в порядке пакета."""
+    results = []
+    reads = []
+    for item in items + [None]:
+        if item is not None and item['method'] == 'GET':
+            reads.append(item)
+            continue
+        if len(reads) > 1:
+            results.extend(executor.map(
+                lambda read: call_in_thread(
+                    perform, request, read['method'], read['path']
+                ),
+                reads
+            ))
+        elif reads:
+            results.append(perform(request, 'GET', reads[0]['path']))
+        reads = []
+        if item is not None:
+            results.append(
+                perform(request, item['method'], item['path'], item['body'])
+            )
+    return results
+
+
+def has_writes(items, results):
+    """Есть ли в пакете успешный изменяющий вложенный запрос."""
+    return any(
+        item['method'] not in SAFE_METHODS and result['status'] < 400
+        for item, result in zip(items, results)
+    )
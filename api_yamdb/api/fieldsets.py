@@ -0,0 +1,96 @@
+"""Разреженные наборы полей: параметры ?fields= и ?omit=.
+
+?fields=id,name оставляет в ответе только перечисленные поля,
+?omit=description убирает перечисленные. Параметры действуют только на
+безопасные запросы и только на поля основного объекта ответа, вложенные
+сериализаторы выводятся целиком. Представления не загружают связи и
+столбцы, которые не попадут в ответ.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.db_routers import load_related
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def split_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def selected_fields(request, field_names):
+    """Поля, которые попадут в ответ на запрос."""
+    field_names = list(field_names)
+    if request is None or request.method not in SAFE_METHODS:
+        return field_names
+    params = request.query_params
+    if params.get(FIELDS_PARAM):
+        requested = split_names(params[FIELDS_PARAM])
+        field_names = [name for name in field_names if name in requested]
+    if params.get(OMIT_PARAM):
+        omitted = split_names(params[OMIT_PARAM])
+        field_names = [name for name in field_names if name not in omitted]
+    return field_names
+
+
+class SparseFieldsetMixin:
+    """Миксин сериализатора, выводящего только запрошенные поля."""
+
+    def is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root_serializer():
+            return fields
+        return {
+            name: fields[name]
+            for name in selected_fields(self.context.get('request'), fields)
+        }
+
+
+class SparseFieldsetViewMixin:
+    """Миксин представления, загружающего только нужные для ответа связи
+    и столбцы.
+
+    select_fields и prefetch_fields сопоставляют поле сериализатора со
+    связью для select_related (load_related для связей между БД) и
+    prefetch_related. Столбцы модели, поля
+    которых не попали в ответ, загружаются отложенно.
+    """
+
+    select_fields = {}
+    prefetch_fields = {}
+
+    def get_fieldset(self):
+        """Поля сериализатора, которые попадут в ответ."""
+        return selected_fields(
+            self.request, self.get_serializer_class().Meta.fields
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_fieldset()
+        for name, lookup in self.select_fields.items():
+            if name in fields:
+                queryset = load_related(queryset, lookup)
+        for name, lookup in self.prefetch_fields.items():
+            if name in fields:
+                queryset = queryset.prefetch_related(lookup)
+        deferred = []
+        meta = queryset.model._meta
+        for name in self.get_serializer_class().Meta.fields:
+            if name in fields:
+                continue
+            try:
+                field = meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.primary_key:
+                deferred.append(field.name)
+        return queryset.defer(*deferred) if deferred else queryset
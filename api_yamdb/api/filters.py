@@ -0,0 +1,49 @@
+from django_filters import rest_framework as filters
+
+from reviews.indexes import GenreMode, title_index
+from reviews.models import Genre, Title
+
+
+class TitleFilter(filters.FilterSet):
+    """Фильтр произведений, в том числе по диапазону рейтинга и по
+    нескольким жанрам.
+    """
+
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    category = filters.CharFilter(field_name='category__slug')
+    genre = filters.CharFilter(
+        method='filter_genre',
+        help_text='Slug жанров через запятую.'
+    )
+    genre_mode = filters.ChoiceFilter(
+        choices=GenreMode.choices,
+        method='filter_genre_mode',
+        help_text='all — все перечисленные жанры, any — любой из них.'
+    )
+
+    class Meta:
+        model = Title
+        fields = ('category__slug', 'genre__slug', 'name', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        """Произведения с жанрами из параметра genre. Кандидаты
+        выбираются индексом жанров в памяти, из БД они читаются одним
+        запросом по id.
+        """
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        if not slugs:
+            return queryset
+        mode = self.form.cleaned_data.get('genre_mode') or GenreMode.ALL
+        genre_ids = list(
+            Genre.objects.filter(slug__in=slugs).values_list('pk', flat=True)
+        )
+        if mode == GenreMode.ALL and len(genre_ids) < len(slugs):
+            return queryset.none()
+        return queryset.filter(
+            pk__in=title_index.filter_genres(genre_ids, mode).tolist()
+        )
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+        return queryset
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+
+from reviews.models import Review, Title
+
+
+def query_delay(seconds):
+    """Обёртка запросов, добавляющая задержку сетевой БД."""
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+class Command(BaseCommand):
+    """Команда для сравнения времени ответа представлений чтения под WSGI
+    и ASGI.
+    """
+
+    help = (
+        'Сравнение времени ответа представлений чтения под WSGI '
+        '(синхронные представления DRF) и ASGI (асинхронные представления '
+        'с параллельными запросами к БД).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов к каждому адресу.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Количество одновременных запросов.'
+        )
+        parser.add_argument(
+            '--query-delay',
+            type=float,
+            default=0,
+            help='Задержка каждого запроса к БД в миллисекундах.'
+        )
+
+    def get_urls(self):
+        title = Title.objects.order_by('-review_count').first()
+        review = Review.objects.order_by('-comment_count').first()
+        if title is None or review is None:
+            raise CommandError('Для замеров нужны произведения и отзывы.')
+        reviews = f'/api/v1/titles/{review.title_id}/reviews/'
+        return [
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/?expand=latest_comments',
+            reviews,
+            f'{reviews}{review.pk}/comments/',
+        ]
+
+    def run_wsgi(self, url, requests, concurrency):
+        def fetch(_):
+            started = time.perf_counter()
+            Client().get(url)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(fetch, range(requests)))
+
+    def run_asgi(self, url, requests, concurrency):
+        async def fetch(client, semaphore):
+            async with semaphore:
+                started = time.perf_counter()
+                await client.get(url)
+                return time.perf_counter() - started
+
+        async def fetch_all():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(
+                fetch(client, semaphore) for _ in range(requests)
+            ))
+
+        return asyncio.run(fetch_all())
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError(
+                'Параметры --requests и --concurrency должны быть больше '
+                'нуля.'
+            )
+        delay = query_delay(options['query_delay'] / 1000)
+
+        def add_delay(connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        urls = self.get_urls()
+        connection.close()
+        connection_created.connect(add_delay, weak=False)
+        try:
+            for url in urls:
+                for mode, run in (
+                    ('WSGI', self.run_wsgi), ('ASGI', self.run_asgi)
+                ):
+                    started = time.perf_counter()
+                    latencies = np.array(run(
+                        url, options['requests'], options['concurrency']
+                    )) * 1000
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'{mode} {url}: среднее {latencies.mean():.1f} мс, '
+                        f'p95 {np.percentile(latencies, 95):.1f} мс, '
+                        f'{options["requests"] / elapsed:.0f} запросов/с'
+                    )
+        finally:
+            connection_created.disconnect(add_delay)
@@ -0,0 +1,126 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api_yamdb.db_routers import (fresh_replicas, mark_recent_write,
+                                  readable_replicas, recent_write_seq)
+
+
+def get_token_user_id(request):
+    """id пользователя из JWT запроса без обращения к БД или None."""
+    authentication = JWTAuthentication()
+    try:
+        header = authentication.get_header(request)
+        raw_token = header and authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+class AsyncCapableMiddleware:
+    """Базовый middleware, который под ASGI работает в цикле событий без
+    переключения в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Django определяет асинхронный middleware по этому атрибуту.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+class AsyncReadMiddleware(AsyncCapableMiddleware):
+    """Под ASGI направляет GET-запросы на маршруты ASYNC_ROOT_URLCONF с
+    асинхронными представлениями чтения. Под WSGI ничего не меняет.
+    """
+
+    async def __acall__(self, request):
+        if request.method == 'GET':
+            request.urlconf = settings.ASYNC_ROOT_URLCONF
+        return await self.get_response(request)
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """Разрешает чтение с реплик БД безопасным запросам к API. После
+    успешного изменяющего запроса пользователь читает только с реплик,
+    которые уже содержат его изменения, а пока таких нет — с основной
+    БД. Представление может уточнить, изменил ли запрос данные, атрибутом
+    запроса writes_data.
+    """
+
+    @staticmethod
+    def reads_replicas(request):
+        """Может ли запрос читать с реплик."""
+        return bool(
+            request.method in SAFE_METHODS
+            and request.path.startswith('/api/')
+            and settings.DATABASE_REPLICAS
+        )
+
+    @staticmethod
+    def writes_data(request, response):
+        return (
+            getattr(request, 'writes_data', request.method not in SAFE_METHODS)
+            and request.token_user_id is not None
+            and response.status_code < 400
+        )
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.token_user_id = get_token_user_id(request)
+        replicas = ()
+        if self.reads_replicas(request):
+            replicas = fresh_replicas(
+                request.token_user_id,
+                recent_write_seq(request.token_user_id)
+            )
+        token = readable_replicas.set(replicas)
+        try:
+            response = self.get_response(request)
+        finally:
+            readable_replicas.reset(token)
+        if self.writes_data(request, response):
+            mark_recent_write(request.token_user_id)
+        return response
+
+    async def __acall__(self, request):
+        request.token_user_id = get_token_user_id(request)
+        replicas = ()
+        if self.reads_replicas(request):
+            seq = recent_write_seq(request.token_user_id)
+            # Сравнение с репликами обращается к БД, поэтому выполняется
+            # в потоке, только если пользователь недавно что-то изменял.
+            replicas = settings.DATABASE_REPLICAS if seq is None else (
+                await sync_to_async(fresh_replicas)(
+                    request.token_user_id, seq
+                )
+            )
+        token = readable_replicas.set(replicas)
+        try:
+            response = await self.get_response(request)
+        finally:
+            readable_replicas.reset(token)
+        if self.writes_data(request, response):
+            await sync_to_async(mark_recent_write)(request.token_user_id)
+        return response
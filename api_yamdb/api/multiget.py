@@ -0,0 +1,78 @@
+"""Получение нескольких объектов по списку id одним запросом.
+
+GET-запрос к списку с параметром ?ids=3,1,2 или POST-запрос к
+<список>/multiget/ с телом {"ids": [3, 1, 2]} возвращают объекты в
+порядке запрошенных id. POST-запрос — только способ передать длинный
+список id, права проверяются как для чтения.
+"""
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import clone_request
+from rest_framework.response import Response
+
+from api_yamdb.constants import MULTIGET_LIMIT
+
+IDS_PARAM = 'ids'
+
+
+class MultiGetMixin:
+    """Миксин представления с выборкой объектов по списку id."""
+
+    multiget_limit = MULTIGET_LIMIT
+
+    def initial(self, request, *args, **kwargs):
+        if self.action == 'multiget' and request.method == 'POST':
+            # Тело разбирается до подмены метода запроса на GET.
+            request.data
+            request = self.request = clone_request(request, 'GET')
+        super().initial(request, *args, **kwargs)
+
+    def get_multiget_ids(self):
+        """Уникальные id из запроса в исходном порядке."""
+        if not isinstance(self.request.data, dict):
+            raise ValidationError(
+                'Ожидается объект с ключом ids в теле запроса.'
+            )
+        ids = self.request.data.get(IDS_PARAM)
+        if ids is None:
+            ids = self.request.query_params.get(IDS_PARAM, '')
+        if isinstance(ids, str):
+            ids = [value for value in ids.split(',') if value.strip()]
+        try:
+            ids = list(dict.fromkeys(int(value) for value in ids))
+        except (TypeError, ValueError):
+            raise ValidationError({IDS_PARAM: 'Ожидается список целых id.'})
+        if not ids:
+            raise ValidationError({IDS_PARAM: 'Список id не может быть пуст.'})
+        if len(ids) > self.multiget_limit:
+            raise ValidationError({
+                IDS_PARAM: f'Не больше {self.multiget_limit} id за запрос.'
+            })
+        return ids
+
+    def list(self, request, *args, **kwargs):
+        if IDS_PARAM in request.query_params:
+            return self.multiget(request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get', 'post'], url_path='multiget')
+    def multiget(self, request, *args, **kwargs):
+        """Объекты с запрошенными id в порядке запроса и список id, для
+        которых объекты не найдены.
+        """
+        ids = self.get_multiget_ids()
+        objects = {
+            obj.pk: obj
+            for obj in self.filter_queryset(self.get_queryset()).filter(
+                pk__in=ids
+            )
+        }
+        for obj in objects.values():
+            self.check_object_permissions(self.request, obj)
+        serializer = self.get_serializer(
+            [objects[pk] for pk in ids if pk in objects], many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in objects],
+        })
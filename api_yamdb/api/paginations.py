@@ -1,6 +1,10 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from api_yamdb.constants import (MAX_PAGINATION_VALUE, MIDDLE_PAGINATION_VALUE,
+from api_yamdb.constants import (CHANGES_MAX_PAGE_SIZE, CHANGES_PAGE_SIZE,
+                                 MAX_PAGINATION_VALUE, MIDDLE_PAGINATION_VALUE,
                                  MIN_PAGINATION_VALUE)
 
 
@@ -17,3 +21,62 @@ class CategoryPagination(PageNumberPagination):
 
     page_size = MIN_PAGINATION_VALUE
     page_size_query_param = 'page_size'
+
+
+class SequencePagination(BasePagination):
+    """Пагинатор журнала изменений по номеру записи.
+
+    ?since=<seq> возвращает записи с большим номером. cursor в ответе —
+    номер последней записи страницы, его передают в since следующего
+    запроса; next указывает на следующую страницу, если она есть.
+    """
+
+    ordering = 'seq'
+    since_query_param = 'since'
+    page_size = CHANGES_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = CHANGES_MAX_PAGE_SIZE
+
+    def get_int_param(self, request, name, default, minimum):
+        value = request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or value < minimum:
+            raise ValidationError(
+                {name: f'Ожидается целое число не меньше {minimum}.'}
+            )
+        return value
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        since = self.get_int_param(request, self.since_query_param, 0, 0)
+        page_size = min(
+            self.get_int_param(
+                request, self.page_size_query_param, self.page_size, 1
+            ),
+            self.max_page_size
+        )
+        page = list(queryset.filter(
+            **{f'{self.ordering}__gt': since}
+        ).order_by(self.ordering)[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.cursor = getattr(page[-1], self.ordering) if page else since
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.since_query_param, self.cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'cursor': self.cursor,
+            'next': self.get_next_link(),
+            'results': data,
+        })
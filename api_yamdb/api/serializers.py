@@ -1,11 +1,16 @@
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator, UniqueTogetherValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title
-from api_yamdb.constants import (MAX_LENGTH_EMAIL, MAX_LENGTH_NAME,
-                                 MIN_SCORE_VALUE, MAX_SCORE_VALUE,
-                                 REGEX_USERNAME)
+from reviews.models import (Category, ChangeLogEntry, Comment, Genre,
+                            LeaderboardEntry,
+                            Recommendation, Review, SimilarTitle, Title,
+                            TitleScoreHistogram)
+from api_yamdb.constants import (BATCH_REQUESTS_LIMIT, MAX_LENGTH_EMAIL,
+                                 MAX_LENGTH_NAME, MIN_SCORE_VALUE,
+                                 MAX_SCORE_VALUE, REGEX_USERNAME)
+from .fieldsets import SparseFieldsetMixin
 
 User = get_user_model()
 
@@ -50,7 +55,8 @@ class UserMixin:
         return username
 
 
-class UserSerializer(UserMixin, serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, UserMixin,
+                     serializers.ModelSerializer):
     """Сериализатор пользователя, регистрируемого администратором."""
 
     class Meta:
@@ -93,7 +99,7 @@ class TokenCreateSerializer(serializers.Serializer):
     )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор жанра."""
 
     class Meta:
@@ -101,7 +107,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор категории."""
 
     class Meta:
@@ -109,19 +115,90 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор произведения для чтения."""
 
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     description = serializers.CharField(allow_blank=True, default="")
+    score_histogram = serializers.SerializerMethodField()
+    reviews = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category',
+            'id', 'name', 'year', 'rating', 'weighted_rating',
+            'review_count', 'description', 'genre', 'category',
+            'score_histogram', 'reviews',
         )
 
+    def __init__(self, *args, **kwargs):
+        """Распределение оценок и встроенные отзывы выводятся, только
+        если они запрошены через контекст сериализатора.
+        """
+        super().__init__(*args, **kwargs)
+        if not self.context.get('score_histogram'):
+            self.fields.pop('score_histogram', None)
+        if 'reviews' not in self.context.get('expand', ()):
+            self.fields.pop('reviews', None)
+
+    def get_score_histogram(self, obj):
+        """Количество отзывов с каждой оценкой."""
+        try:
+            return obj.score_histogram.as_dict()
+        except TitleScoreHistogram.DoesNotExist:
+            return TitleScoreHistogram(title=obj).as_dict()
+
+    def get_reviews(self, obj):
+        """Первая страница отзывов произведения, загруженная заранее в
+        атрибут latest_reviews, и ссылка на следующую.
+        """
+        reviews = obj.latest_reviews
+        next_url = None
+        request = self.context.get('request')
+        if request is not None and obj.review_count > len(reviews):
+            next_url = request.build_absolute_uri(
+                reverse('reviews-list', kwargs={'title_id': obj.pk})
+                + '?page=2'
+            )
+        return {
+            'count': obj.review_count,
+            'next': next_url,
+            'results': ExpandedReviewSerializer(
+                reviews, many=True, context=self.context
+            ).data,
+        }
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Сериализатор позиции произведения в рейтинговом списке."""
+
+    title = TitleReadSerializer()
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('position', 'score', 'title')
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """Сериализатор похожего произведения."""
+
+    title = TitleReadSerializer(source='similar')
+
+    class Meta:
+        model = SimilarTitle
+        fields = ('position', 'score', 'title')
+
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    """Сериализатор рекомендованного произведения."""
+
+    title = TitleReadSerializer()
+
+    class Meta:
+        model = Recommendation
+        fields = ('position', 'score', 'title')
+
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор произведения для записи."""
@@ -152,7 +229,7 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Обрабатывает данные отзыва, включая валидацию рейтинга и уникальности
     отзыва для каждого произведения (title) от каждого пользователя (author).
     """
@@ -163,7 +240,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ['id', 'text', 'author', 'score', 'pub_date']
+        fields = [
+            'id', 'text', 'author', 'score', 'pub_date', 'comment_count'
+        ]
 
     def validate_score(self, value):
         """Проверяет, что рейтинг находится в пределах от MIN_SCORE_VALUE до
@@ -214,7 +293,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для модели Comment.
     Обрабатывает данные комментария, включая валидацию на наличие
     соответствующего отзыва и произведения.
@@ -227,3 +306,67 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'text', 'author', 'pub_date']
+
+
+class ExpandedReviewSerializer(ReviewSerializer):
+    """Сериализатор отзыва, встроенного в произведение, с последними
+    комментариями.
+    """
+
+    latest_comments = CommentSerializer(many=True, read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ['latest_comments']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'latest_comments' not in self.context.get('expand', ()):
+            self.fields.pop('latest_comments', None)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Сериализатор одного вложенного запроса пакета."""
+
+    method = serializers.ChoiceField(
+        choices=('GET', 'POST', 'PATCH', 'PUT', 'DELETE')
+    )
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, default=None)
+
+    def validate_path(self, value):
+        """Вложенный запрос может обращаться только к API, но не к самому
+        пакетному запросу."""
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError(
+                'Путь должен начинаться с /api/.'
+            )
+        if value.partition('?')[0] == reverse('batch'):
+            raise serializers.ValidationError(
+                'Пакетные запросы не могут быть вложенными.'
+            )
+        return value
+
+
+class BatchSerializer(serializers.ListSerializer):
+    """Сериализатор пакета вложенных запросов."""
+
+    child = BatchItemSerializer()
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('allow_empty', False)
+        super().__init__(*args, **kwargs)
+
+    def validate(self, attrs):
+        if len(attrs) > BATCH_REQUESTS_LIMIT:
+            raise serializers.ValidationError(
+                f'Не больше {BATCH_REQUESTS_LIMIT} запросов в пакете.'
+            )
+        return attrs
+
+
+class ChangeLogEntrySerializer(serializers.ModelSerializer):
+    """Сериализатор записи журнала изменений."""
+
+    class Meta:
+        model = ChangeLogEntry
+        fields = ('seq', 'model', 'object_id', 'action', 'data', 'created_at')
@@ -0,0 +1,126 @@
+"""Поток Server-Sent Events об отзывах и комментариях произведения.
+
+GET /api/v1/titles/{title_id}/events/ держит соединение открытым и
+передаёт события review.created, review.updated, review.deleted,
+comment.created, comment.updated и comment.deleted. Django 3.2 не
+поддерживает асинхронные потоковые ответы, поэтому поток обслуживает
+ASGI-приложение EventStreamRouter, подключённое перед приложением Django
+в api_yamdb/asgi.py. Остальные запросы передаются Django без изменений.
+
+Подписчик, отключённый за переполнение буфера, получает событие
+evicted, после чего соединение закрывается.
+"""
+import asyncio
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from api_yamdb.constants import EVENTS_HEARTBEAT
+from reviews.events import broker, title_channel
+from reviews.models import Title
+
+EVENTS_PATH = re.compile(r'^/api/v1/titles/(?P<title_id>\d+)/events/$')
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+HEARTBEAT = b': ping\n\n'
+EVICTED = b'event: evicted\ndata: {}\n\n'
+
+
+def format_event(event):
+    return f'event: {event.type}\ndata: {event.data}\n\n'.encode()
+
+
+@sync_to_async
+def title_exists(title_id):
+    close_old_connections()
+    try:
+        return Title.objects.filter(pk=title_id).exists()
+    finally:
+        close_old_connections()
+
+
+async def send_json(send, status, data):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps(data, ensure_ascii=False).encode(),
+    })
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class EventStreamRouter:
+    """ASGI-приложение, обслуживающее потоки событий и передающее
+    остальные запросы приложению Django.
+    """
+
+    def __init__(self, application, heartbeat=EVENTS_HEARTBEAT):
+        self.application = application
+        self.heartbeat = heartbeat
+
+    async def __call__(self, scope, receive, send):
+        match = scope['type'] == 'http' and EVENTS_PATH.match(scope['path'])
+        if not match:
+            return await self.application(scope, receive, send)
+        if scope['method'] != 'GET':
+            return await send_json(
+                send, 405, {'detail': 'Метод не разрешён.'}
+            )
+        title_id = int(match['title_id'])
+        if not await title_exists(title_id):
+            return await send_json(
+                send, 404, {'detail': 'Страница не найдена.'}
+            )
+        await self.stream(title_id, receive, send)
+
+    async def stream(self, title_id, receive, send):
+        subscription = broker.subscribe(title_channel(title_id))
+        disconnect = asyncio.ensure_future(wait_disconnect(receive))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': HEADERS,
+            })
+            await send({
+                'type': 'http.response.body',
+                'body': HEARTBEAT,
+                'more_body': True,
+            })
+            while True:
+                event = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    {event, disconnect}, timeout=self.heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnect in done:
+                    event.cancel()
+                    return
+                if event not in done:
+                    event.cancel()
+                    body = HEARTBEAT
+                elif event.result() is None:
+                    break
+                else:
+                    body = format_event(event.result())
+                await send({
+                    'type': 'http.response.body',
+                    'body': body,
+                    'more_body': True,
+                })
+            await send({'type': 'http.response.body', 'body': EVICTED})
+        finally:
+            subscription.close()
+            disconnect.cancel()
@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, TokenCreateViewSet,
-                    UserCreateViewSet, UserViewSet)
+from .views import (BatchView, CategoryViewSet, ChangeLogViewSet,
+                    CommentViewSet, GenreViewSet, ReviewViewSet,
+                    TitleViewSet, TokenCreateViewSet, UserCreateViewSet,
+                    UserViewSet)
 
 router_v1 = DefaultRouter()
 
@@ -11,6 +12,7 @@ router_v1.register('titles', TitleViewSet, basename='titles')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('users', UserViewSet, basename='users')
+router_v1.register('changes', ChangeLogViewSet, basename='changes')
 
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews',
@@ -23,6 +25,7 @@ router_v1.register(
 
 urlpatterns = [
     path("v1/", include(router_v1.urls)),
+    path('v1/batch/', BatchView.as_view(), name='batch'),
     path(
         'v1/auth/signup/',
         UserCreateViewSet.as_view({'post': 'create'}),
@@ -1,6 +1,7 @@
 from django.core.mail import send_mail
 
 from django.conf import settings
+from django.db import close_old_connections
 
 
 def send_confirmation_code(email, confirmation_code):
@@ -12,3 +13,14 @@ def send_confirmation_code(email, confirmation_code):
         recipient_list=(email, ),
         fail_silently=False,
     )
+
+
+def call_in_thread(function, *args, **kwargs):
+    """Вызов функции в потоке пула. Соединения с БД потока закрываются
+    так же, как после обычного запроса.
+    """
+    close_old_connections()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        close_old_connections()
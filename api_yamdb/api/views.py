@@ -4,15 +4,34 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title
-from .paginations import CategoryPagination, GenrePagination
+from api_yamdb.constants import EXPAND_COMMENTS_SIZE
+from reviews.facets import get_facets
+from reviews.indexes import title_index
+from reviews.leaderboards import ALL_SCOPE, category_scope, genre_scope
+from reviews.models import (Category, ChangeLogEntry, Genre, Leaderboard,
+                            LeaderboardEntry, Recommendation, Review,
+                            SimilarTitle, Title)
+from reviews.recommendations import cold_start
+from .batch import has_writes, perform_batch
+from .fieldsets import SparseFieldsetViewMixin, split_names
+from .filters import TitleFilter
+from .multiget import MultiGetMixin
+from .paginations import (CategoryPagination, GenrePagination,
+                          SequencePagination)
 from .permissions import (IsAnonymous, IsAuthor, IsModerator,
                           IsSuperUserOrIsAdmin)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer,
+from .serializers import (BatchSerializer, CategorySerializer,
+                          ChangeLogEntrySerializer,
+                          CommentSerializer, GenreSerializer,
+                          LeaderboardEntrySerializer,
+                          RecommendationSerializer,
+                          ReviewSerializer, SimilarTitleSerializer,
                           TitleReadSerializer, TitleWriteSerializer,
                           TokenCreateSerializer, UserCreateSerializer,
                           UserSerializer)
@@ -21,7 +40,7 @@ from .utils import send_confirmation_code
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Представление для взаимодействия с пользователем, создание
     пользователя администратором, удаление/изменение/получение пользователя.
     """
@@ -48,7 +67,7 @@ class UserViewSet(viewsets.ModelViewSet):
         elif request.method == 'DELETE':
             user.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
-        serializer = UserSerializer(user)
+        serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(
@@ -69,7 +88,28 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = UserSerializer(request.user)
+        serializer = self.get_serializer(request.user)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='me/recommendations',
+        permission_classes=(permissions.IsAuthenticated, )
+    )
+    def recommendations(self, request):
+        """Рекомендованные пользователю произведения по предсказанной
+        оценке. Без рассчитанного списка выводятся лучшие произведения
+        категории, которую пользователь оценивал чаще всего.
+        """
+        recommendations = list(Recommendation.objects.filter(
+            user=request.user
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).order_by('position'))
+        if not recommendations:
+            recommendations = cold_start(request.user)
+        serializer = RecommendationSerializer(recommendations, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -151,6 +191,7 @@ class TokenCreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
 
 
 class BaseViewSet(
+        SparseFieldsetViewMixin,
         mixins.DestroyModelMixin,
         mixins.CreateModelMixin,
         mixins.ListModelMixin,
@@ -183,26 +224,150 @@ class GenreViewSet(BaseViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(MultiGetMixin, SparseFieldsetViewMixin,
+                   viewsets.ModelViewSet):
     """Представление для работы с произведениями."""
 
-    queryset = Title.objects.all().order_by('name')
+    EXPAND_FIELDS = ('reviews', 'latest_comments')
+
+    queryset = Title.objects.order_by('name')
+    select_fields = {'category': 'category'}
+    prefetch_fields = {'genre': 'genre'}
     permission_classes = (IsSuperUserOrIsAdmin | IsAnonymous,)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
-    filterset_fields = ('category__slug', 'genre__slug', 'name', 'year')
+    filter_backends = (
+        DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter
+    )
+    filterset_class = TitleFilter
     search_fields = ('category__slug', 'genre__slug', 'name', 'year',)
+    ordering_fields = (
+        'rating', 'weighted_rating', 'year', 'name', 'review_count'
+    )
+    ordering = ('name',)
 
     def get_queryset(self):
         """Возвращает базовый queryset с применением пользовательского
         пагинатора в зависимости от переданных параметров запроса."""
 
         queryset = super().get_queryset()
+        if (
+            self.action == 'retrieve'
+            and 'score_histogram' in self.get_fieldset()
+        ):
+            queryset = queryset.select_related('score_histogram')
+        expand = self.get_expand()
+        if 'reviews' in expand:
+            queryset = queryset.prefetch_latest_reviews(
+                api_settings.PAGE_SIZE,
+                EXPAND_COMMENTS_SIZE if 'latest_comments' in expand else 0
+            )
         if 'genre' in self.request.query_params:
             self.pagination_class = GenrePagination
         elif 'category' in self.request.query_params:
             self.pagination_class = CategoryPagination
         return queryset
 
+    def get_serializer_context(self):
+        """Распределение оценок выводится только для одного
+        произведения."""
+        context = super().get_serializer_context()
+        context['score_histogram'] = self.action == 'retrieve'
+        context['expand'] = self.get_expand()
+        return context
+
+    def get_expand(self):
+        """Встраиваемые в ответ связанные объекты из параметра expand:
+        reviews — первая страница отзывов, latest_comments — ещё и
+        последние комментарии каждого отзыва.
+        """
+        if self.action not in ('list', 'retrieve', 'multiget'):
+            return set()
+        expand = split_names(self.request.query_params.get('expand', ''))
+        unknown = expand - set(self.EXPAND_FIELDS)
+        if unknown:
+            allowed = ', '.join(self.EXPAND_FIELDS)
+            raise ValidationError(
+                {'expand': f'Допустимые значения: {allowed}.'}
+            )
+        if 'latest_comments' in expand:
+            expand.add('reviews')
+        if 'reviews' not in self.get_fieldset():
+            return set()
+        return expand
+
+    @action(detail=False, methods=['get'], url_path='top')
+    def top(self, request):
+        """Предрассчитанный рейтинговый список произведений: популярные
+        (board=trending) или лучшие по взвешенному рейтингу
+        (board=top_rated), для всего каталога, категории или жанра.
+        """
+        board = request.query_params.get('board', Leaderboard.TRENDING)
+        if board not in Leaderboard.values:
+            return Response(
+                {'board': f'Допустимые значения: {Leaderboard.values}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        scope = ALL_SCOPE
+        if 'category' in request.query_params:
+            scope = category_scope(request.query_params['category'])
+        elif 'genre' in request.query_params:
+            scope = genre_scope(request.query_params['genre'])
+        entries = LeaderboardEntry.objects.filter(
+            board=board, scope=scope
+        ).select_related('title__category').prefetch_related('title__genre')
+        page = self.paginate_queryset(entries.order_by('position'))
+        serializer = LeaderboardEntrySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """Количество произведений по жанрам, категориям, годам и
+        десятилетиям выпуска для тех же параметров фильтрации и поиска,
+        что и список произведений.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(get_facets(queryset, request.query_params))
+
+    @action(detail=True, methods=['get'], url_path='similar')
+    def similar(self, request, pk=None):
+        """Похожие произведения, предрассчитанные по оценкам
+        пользователей, в порядке убывания сходства. Для произведений без
+        общих оценок — похожие по метаданным.
+        """
+        title = self.get_object()
+        neighbours = list(SimilarTitle.objects.filter(
+            title=title
+        ).select_related('similar__category').prefetch_related(
+            'similar__genre'
+        ).order_by('position'))
+        if not neighbours:
+            neighbours = self.similar_by_content(title)
+        serializer = SimilarTitleSerializer(neighbours, many=True)
+        return Response(serializer.data)
+
+    def similar_by_content(self, title):
+        """Похожие по жанрам, категории и году произведения для
+        произведений без рассчитанных соседей по оценкам.
+        """
+        ranked = title_index.similar(title.pk)
+        titles = self.queryset.select_related('category').prefetch_related(
+            'genre'
+        ).in_bulk(
+            [similar_id for similar_id, _ in ranked]
+        )
+        ranked = [
+            (similar_id, score) for similar_id, score in ranked
+            if similar_id in titles
+        ]
+        return [
+            SimilarTitle(
+                title=title,
+                position=position,
+                similar=titles[similar_id],
+                score=score,
+            )
+            for position, (similar_id, score) in enumerate(ranked, 1)
+        ]
+
     def update(self, request, *args, **kwargs):
         """Возращает статус ошибки 405 METHOD NOT ALLOWED
         в случае отправки запроса PUT."""
@@ -247,7 +412,8 @@ class TitleViewSet(viewsets.ModelViewSet):
         )
 
 
-class BaseTitleReviewViewSet(viewsets.ModelViewSet):
+class BaseTitleReviewViewSet(MultiGetMixin, SparseFieldsetViewMixin,
+                             viewsets.ModelViewSet):
     """Базовое представление для работы с объектами Title и Review.
 
     Содержит общую логику, которая используется в других вьюсетах,
@@ -309,6 +475,7 @@ class ReviewViewSet(BaseTitleReviewViewSet):
     """
 
     serializer_class = ReviewSerializer
+    select_fields = {'author': 'author'}
 
     def get_queryset(self):
         """Получает набор отзывов, связанных с конкретным произведением.
@@ -348,6 +515,7 @@ class CommentViewSet(BaseTitleReviewViewSet):
     """
 
     serializer_class = CommentSerializer
+    select_fields = {'author': 'author'}
 
     def get_queryset(self):
         """Получает набор комментариев, связанных с конкретным отзывом.
@@ -369,3 +537,38 @@ class CommentViewSet(BaseTitleReviewViewSet):
             author=self.request.user,
             review=self.get_review()
         )
+
+
+class ChangeLogViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Представление журнала изменений для зеркал каталога.
+
+    ?since=<seq> возвращает изменения после записи seq, ?model= —
+    изменения только объектов одной модели.
+    """
+
+    queryset = ChangeLogEntry.objects.all()
+    serializer_class = ChangeLogEntrySerializer
+    permission_classes = (IsAnonymous,)
+    pagination_class = SequencePagination
+    filterset_fields = ('model',)
+
+
+class BatchView(APIView):
+    """Представление для выполнения пакета вложенных запросов.
+
+    Принимает список объектов {method, path, body} и возвращает список
+    объектов {status, body} в том же порядке. Права проверяются для
+    каждого вложенного запроса отдельно.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+        results = perform_batch(request, items)
+        # Пакет только из чтений не переводит пользователя на чтение с
+        # основной БД (см. ReplicaMiddleware).
+        request._request.writes_data = has_writes(items, results)
+        return Response(results)
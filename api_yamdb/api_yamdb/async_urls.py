@@ -0,0 +1,21 @@
+"""Маршруты для ASGI-развёртывания: асинхронные представления чтения
+перед обычными маршрутами проекта.
+"""
+from django.urls import path
+
+from api import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+REVIEWS = 'api/v1/titles/<int:title_id>/reviews/'
+COMMENTS = REVIEWS + '<int:review_id>/comments/'
+
+urlpatterns = [
+    path('api/v1/genres/', async_views.genre_list),
+    path('api/v1/categories/', async_views.category_list),
+    path('api/v1/titles/', async_views.title_list),
+    path('api/v1/titles/<int:pk>/', async_views.title_detail),
+    path(REVIEWS, async_views.review_list),
+    path(REVIEWS + '<int:pk>/', async_views.review_detail),
+    path(COMMENTS, async_views.comment_list),
+    path(COMMENTS + '<int:pk>/', async_views.comment_detail),
+] + sync_urlpatterns
@@ -15,3 +15,23 @@ MAX_PAGINATION_VALUE: int = 10
 REGEX_USERNAME: str = r'^[\w.@+-]+\Z'
 REGEX_SLUG_BASE_MODEL: str = r'^[-a-zA-Z0-9_]+$'
 MIN_VALUE_VALIDATOR: int = 0
+
+LEADERBOARD_SIZE: int = 100
+TRENDING_HALF_LIFE_DAYS: float = 7.0
+RATING_PRIOR_WEIGHT: float = 10.0
+RATING_PRIOR_MEAN: float = (MIN_SCORE_VALUE + MAX_SCORE_VALUE) / 2
+SIMILAR_TITLES_SIZE: int = 20
+CONTENT_GENRE_WEIGHT: float = 0.7
+CONTENT_CATEGORY_WEIGHT: float = 0.2
+CONTENT_YEAR_WEIGHT: float = 0.1
+RECOMMENDATIONS_SIZE: int = 20
+FACETS_CACHE_TIMEOUT: int = 300
+EXPAND_COMMENTS_SIZE: int = 3
+MULTIGET_LIMIT: int = 100
+BATCH_REQUESTS_LIMIT: int = 30
+BATCH_WORKERS: int = 4
+EVENTS_BUFFER_SIZE: int = 100
+EVENTS_HEARTBEAT: float = 15.0
+CHANGES_PAGE_SIZE: int = 100
+CHANGES_MAX_PAGE_SIZE: int = 1000
+ASYNC_READ_WORKERS: int = 8
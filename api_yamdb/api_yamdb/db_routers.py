@@ -0,0 +1,171 @@
+"""Маршрутизация запросов к БД: приложения пользователей, основная БД и
+реплики.
+
+Приложения из настройки USERS_DATABASE_APPS хранятся в БД
+USERS_DATABASE (см. AppRouter), по умолчанию — в основной. Связи
+каталога с пользователями хранятся как id без внешнего ключа БД, поэтому
+связанные объекты из другой БД загружаются отдельным запросом, а не
+соединением таблиц (см. load_related).
+
+Чтение каталога направляется на реплику из настройки DATABASE_REPLICAS,
+только если это разрешено для текущего запроса (см. ReplicaMiddleware):
+запрос безопасный, а реплика содержит все изменения пользователя. Запись,
+миграции, всё остальное чтение, в том числе команды управления, и любое
+чтение приложений пользователей используют основную БД: пользователь
+должен проходить аутентификацию сразу после регистрации, а изменение
+роли — действовать сразу.
+
+После записи пользователя в кэш сохраняется номер последней записи
+журнала изменений основной БД. Пока реплика не содержит записи с этим
+номером, пользователь с неё не читает; отметка удаляется, когда все
+реплики её догонят. Отметки хранятся в кэше REPLICA_CACHE_ALIAS,
+который с репликами общий для всех процессов.
+"""
+import random
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.constants import LOOKUP_SEP
+
+# Реплики, с которых разрешено читать в текущем запросе.
+readable_replicas = ContextVar('readable_replicas', default=())
+
+
+def replica_cache():
+    return caches[settings.REPLICA_CACHE_ALIAS]
+
+
+def recent_write_key(user_id):
+    return f'db:recent_write:{user_id}'
+
+
+def change_seq(using):
+    """Номер последней записи журнала изменений в БД using."""
+    entries = apps.get_model('reviews', 'ChangeLogEntry').objects
+    return entries.using(using).order_by('-seq').values_list(
+        'seq', flat=True
+    ).first() or 0
+
+
+def mark_recent_write(user_id):
+    """Чтение пользователя с основной БД, пока реплики не догонят её."""
+    replica_cache().set(
+        recent_write_key(user_id), change_seq(DEFAULT_DB_ALIAS), None
+    )
+
+
+def recent_write_seq(user_id):
+    """Номер записи журнала, которую должна содержать реплика для
+    чтения пользователя, или None.
+    """
+    if user_id is None:
+        return None
+    return replica_cache().get(recent_write_key(user_id))
+
+
+def has_recent_write(user_id):
+    return recent_write_seq(user_id) is not None
+
+
+def fresh_replicas(user_id, seq):
+    """Реплики, которые содержат запись журнала seq. Когда её содержат
+    все реплики, отметка о записи пользователя удаляется.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if seq is None:
+        return list(replicas)
+    fresh = [alias for alias in replicas if change_seq(alias) >= seq]
+    if len(fresh) == len(replicas):
+        replica_cache().delete(recent_write_key(user_id))
+    return fresh
+
+
+def app_database(app_label):
+    """БД, в которой хранятся модели приложения."""
+    if app_label in settings.USERS_DATABASE_APPS:
+        return settings.USERS_DATABASE
+    return DEFAULT_DB_ALIAS
+
+
+def crosses_databases(model, lookup):
+    """Ведёт ли цепочка связей lookup от модели model в другую БД."""
+    database = app_database(model._meta.app_label)
+    for name in lookup.split(LOOKUP_SEP):
+        model = model._meta.get_field(name).related_model
+        if app_database(model._meta.app_label) != database:
+            return True
+    return False
+
+
+def load_related(queryset, *lookups):
+    """select_related для связей в пределах одной БД. Связи с моделями из
+    другой БД загружаются отдельным запросом через prefetch_related.
+    """
+    for lookup in lookups:
+        if crosses_databases(queryset.model, lookup):
+            queryset = queryset.prefetch_related(lookup)
+        else:
+            queryset = queryset.select_related(lookup)
+    return queryset
+
+
+class AppRouter:
+    """Роутер, направляющий запросы к моделям приложений пользователей в
+    БД USERS_DATABASE.
+    """
+
+    def db_for_read(self, model, **hints):
+        database = app_database(model._meta.app_label)
+        return None if database == DEFAULT_DB_ALIAS else database
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {
+            DEFAULT_DB_ALIAS, settings.USERS_DATABASE,
+            *settings.DATABASE_REPLICAS
+        }
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if settings.USERS_DATABASE == DEFAULT_DB_ALIAS:
+            return None
+        if app_label in settings.USERS_DATABASE_APPS:
+            return db == settings.USERS_DATABASE
+        if db == settings.USERS_DATABASE:
+            return False
+        return None
+
+
+class ReplicaRouter:
+    """Роутер, распределяющий разрешённое чтение по репликам."""
+
+    def db_for_read(self, model, **hints):
+        replicas = readable_replicas.get()
+        if (
+            replicas
+            and model._meta.app_label not in settings.USERS_DATABASE_APPS
+        ):
+            return random.choice(replicas)
+        # Без явного ответа Django читает связанные объекты из БД объекта,
+        # через который к ним обращаются, в том числе из БД пользователей.
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -37,10 +38,15 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.AsyncReadMiddleware',
+    'api.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# Маршруты GET-запросов при развёртывании на ASGI.
+ASYNC_ROOT_URLCONF = 'api_yamdb.async_urls'
+
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
     {
@@ -70,6 +76,81 @@ DATABASES = {
     }
 }
 
+# Профиль БД для production включается переменной окружения
+# DB_PROFILE=production: соединения переиспользуются CONN_MAX_AGE секунд,
+# при открытии соединения выполняются PRAGMA из ключа PRAGMAS.
+DB_PROFILE = os.getenv('DB_PROFILE', 'development')
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер кэша в КиБ.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+if DB_PROFILE == 'production':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.getenv('DB_CONN_MAX_AGE', 600)),
+        PRAGMAS=SQLITE_PRODUCTION_PRAGMAS,
+    )
+
+# Реплики основной БД: файлы SQLite через запятую в переменной окружения
+# DB_REPLICAS, обновляются командой refresh_replicas. В тестах реплики
+# используют тестовую основную БД.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+# Отметки о записи пользователей для чтения с реплик (см.
+# api_yamdb.db_routers) должны быть видны всем процессам. Реплики SQLite
+# — файлы на том же сервере, что и процессы приложения, поэтому с
+# репликами отметки хранятся в файловом кэше в каталоге CACHE_DIR.
+REPLICA_CACHE_ALIAS = 'replicas'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    REPLICA_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': REPLICA_CACHE_ALIAS,
+    },
+}
+if DATABASE_REPLICAS:
+    CACHES[REPLICA_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIR', BASE_DIR / 'cache'),
+        # Отметки удаляются, когда реплики их догоняют; вытеснение
+        # отметки вернуло бы пользователя к чтению устаревших реплик.
+        'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+    }
+
+# Отдельная БД приложений пользователей: путь к файлу SQLite в
+# переменной окружения DB_USERS. Миграции применяются к каждой БД:
+# migrate и migrate --database users.
+USERS_DATABASE = 'default'
+USERS_DATABASE_APPS = ['users', 'auth', 'contenttypes', 'admin', 'sessions']
+if os.getenv('DB_USERS'):
+    USERS_DATABASE = 'users'
+    DATABASES[USERS_DATABASE] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_USERS'),
+    }
+
+DATABASE_ROUTERS = [
+    'api_yamdb.db_routers.AppRouter',
+    'api_yamdb.db_routers.ReplicaRouter',
+]
+
 
 # Password validation
 
@@ -134,3 +215,6 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_YAMDB = 'example@mail.com'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Бэкенд доставки событий об отзывах и комментариях между процессами.
+EVENTS_BACKEND = 'reviews.events.LocalBackend'
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title
+from .models import (Category, Comment, Genre, RatingPrior, Review, Title,
+                     TitleStats)
 
 
 @admin.register(Review)
@@ -17,8 +18,8 @@ class ReviewAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     """Админ модель комментариев."""
 
-    list_display = ('id', 'review', 'author', 'text', 'pub_date')
-    search_fields = ('review__title', 'author__username')
+    list_display = ('id', 'review', 'author_id', 'text', 'pub_date')
+    search_fields = ('review__title__name', 'author_id')
     list_filter = ('pub_date',)
 
 
@@ -34,7 +35,10 @@ class BaseAdmin(admin.ModelAdmin):
 class TitleAdmin(admin.ModelAdmin):
     """Админ модель произведения"""
 
-    list_display = ('name', 'year', 'category')
+    list_display = (
+        'name', 'year', 'category', 'rating', 'weighted_rating',
+        'review_count'
+    )
     search_fields = ('name',)
     list_filter = ('category', 'year')
     ordering = ('-year',)
@@ -56,3 +60,20 @@ class CategoryAdmin(BaseAdmin):
 
     verbose_name = 'Категория'
     verbose_name_plural = 'Категории'
+
+
+@admin.register(RatingPrior)
+class RatingPriorAdmin(admin.ModelAdmin):
+    """Админ модель априорных значений рейтинга."""
+
+    list_display = ('category', 'mean', 'weight', 'updated_at')
+
+
+@admin.register(TitleStats)
+class TitleStatsAdmin(admin.ModelAdmin):
+    """Админ модель статистики произведений."""
+
+    list_display = (
+        'title', 'review_count', 'mean', 'median', 'std', 'percentile_rank',
+        'monthly_velocity', 'computed_at'
+    )
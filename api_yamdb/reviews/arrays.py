@@ -0,0 +1,33 @@
+"""Чтение данных из БД порциями в массивы NumPy для офлайн расчётов."""
+from itertools import islice
+
+import numpy as np
+
+CHUNK_SIZE = 100000
+# Категория произведений без категории в массивах NumPy.
+NO_CATEGORY = -1
+
+
+def category_value(category_id):
+    """id категории в массивах NumPy: NO_CATEGORY вместо NULL."""
+    return NO_CATEGORY if category_id is None else category_id
+
+
+def read_columns(queryset, fields, chunk_size=CHUNK_SIZE, converters=None):
+    """Порции значений полей fields записей queryset в виде кортежей
+    массивов, по массиву на поле. converters сопоставляет полю функцию,
+    которая преобразует его значения перед записью в массив.
+    """
+    converters = converters or {}
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield tuple(
+            np.array(
+                [converters[field](value) for value in column]
+                if field in converters else column
+            )
+            for field, column in zip(fields, zip(*chunk))
+        )
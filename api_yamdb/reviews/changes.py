@@ -0,0 +1,112 @@
+"""Журнал изменений для зеркал каталога.
+
+Каждое создание, изменение и удаление произведения, жанра, категории,
+отзыва и комментария добавляет запись в ChangeLogEntry в той же
+транзакции. Зеркало запоминает seq последней обработанной записи и
+запрашивает только более поздние записи; created и updated применяются
+как вставка или замена объекта целиком, deleted — как удаление.
+
+Денормализованные счётчики произведений и отзывов (рейтинг, количество
+отзывов и комментариев) в журнал не попадают: зеркало пересчитывает их
+по отзывам и комментариям.
+
+Записи, после которых есть более поздняя запись того же объекта, не
+нужны зеркалам и удаляются командой compact_changes.
+"""
+from django.db.models import Exists, OuterRef, prefetch_related_objects
+
+from .models import (Category, ChangeAction, ChangeLogEntry, Comment, Genre,
+                     Review, Title)
+
+# Модели журнала и поля, которые попадают в данные записи.
+TRACKED_FIELDS = {
+    Title: ('name', 'year', 'description', 'category_id'),
+    Genre: ('name', 'slug'),
+    Category: ('name', 'slug'),
+    Review: ('title_id', 'text', 'score', 'pub_date'),
+    Comment: ('review_id', 'text', 'pub_date'),
+}
+
+
+def model_name(model):
+    return model._meta.model_name
+
+
+def snapshot(instance):
+    """Состояние объекта для записи журнала."""
+    data = {'id': instance.pk}
+    for field in TRACKED_FIELDS[type(instance)]:
+        data[field] = getattr(instance, field)
+    if isinstance(instance, (Review, Comment)):
+        data['author'] = instance.author.username
+    if isinstance(instance, Title):
+        data['genre'] = sorted(
+            Title.genre.through.objects.filter(
+                title_id=instance.pk
+            ).values_list('genre_id', flat=True)
+        )
+    return data
+
+
+def log_change(instance, action):
+    """Запись изменения объекта в журнал."""
+    ChangeLogEntry.objects.create(
+        model=model_name(type(instance)),
+        object_id=instance.pk,
+        action=action,
+        data=None if action == ChangeAction.DELETED else snapshot(instance),
+    )
+
+
+def log_titles_updated(title_ids):
+    """Запись изменения произведений, связи которых изменились без
+    сохранения самих произведений.
+    """
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(
+            model=model_name(Title),
+            object_id=title.pk,
+            action=ChangeAction.UPDATED,
+            data=snapshot(title),
+        )
+        for title in Title.objects.filter(pk__in=title_ids)
+    )
+
+
+def log_bulk_saved(model, created, updated):
+    """Запись в журнал объектов, сохранённых bulk_create и bulk_update:
+    эти методы не отправляют сигналы post_save.
+    """
+    if model not in TRACKED_FIELDS:
+        return
+    if model in (Review, Comment):
+        prefetch_related_objects([*created, *updated], 'author')
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(
+            model=model_name(model),
+            object_id=instance.pk,
+            action=action,
+            data=snapshot(instance),
+        )
+        for instances, action in (
+            (created, ChangeAction.CREATED), (updated, ChangeAction.UPDATED)
+        )
+        for instance in instances
+    )
+
+
+def compact(before=None):
+    """Удаление записей, после которых в журнале есть более поздняя
+    запись того же объекта. Если задан before, затрагиваются только
+    записи с seq меньше before. Возвращает количество удалённых записей.
+    """
+    entries = ChangeLogEntry.objects.filter(Exists(
+        ChangeLogEntry.objects.filter(
+            model=OuterRef('model'),
+            object_id=OuterRef('object_id'),
+            seq__gt=OuterRef('seq'),
+        )
+    ))
+    if before is not None:
+        entries = entries.filter(seq__lt=before)
+    return entries.delete()[0]
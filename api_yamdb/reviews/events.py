@@ -0,0 +1,156 @@
+"""Публикация событий об отзывах и комментариях произведения.
+
+Изменения отзывов и комментариев публикуются после фиксации транзакции
+в канал произведения. Брокер доставляет события подписчикам своего
+процесса через их циклы событий asyncio. Доставку между процессами
+выполняет подключаемый бэкенд из настройки EVENTS_BACKEND: бэкенд
+получает опубликованное событие и должен вызвать Broker.deliver во всех
+процессах. LocalBackend доставляет события только в своём процессе.
+
+У каждого подписчика ограниченный буфер. Подписчик, который не успевает
+забирать события и переполняет буфер, отключается.
+"""
+import asyncio
+import json
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from api_yamdb.constants import EVENTS_BUFFER_SIZE
+
+# data — JSON-текст, общий для всех подписчиков.
+Event = namedtuple('Event', ('type', 'data'))
+
+
+def title_channel(title_id):
+    return f'title:{title_id}'
+
+
+class LocalBackend:
+    """Доставка событий подписчикам текущего процесса."""
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+
+class Subscription:
+    """Подписка на канал с ограниченным буфером событий. Создаётся и
+    читается в цикле событий asyncio.
+    """
+
+    def __init__(self, broker, channel, size):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(size + 1)
+        self.size = size
+        self.evicted = False
+
+    def put(self, event):
+        """Добавление события в буфер; выполняется в цикле событий."""
+        if self.evicted:
+            return
+        if self.queue.qsize() >= self.size:
+            self.evicted = True
+            self.close()
+            # Последнее место в очереди — для пометки об отключении.
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        """Следующее событие или None, если подписчик отключён из-за
+        переполнения буфера.
+        """
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Подписчики каналов текущего процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    @cached_property
+    def backend(self):
+        return import_string(settings.EVENTS_BACKEND)(self.deliver)
+
+    def subscribe(self, channel, size=EVENTS_BUFFER_SIZE):
+        subscription = Subscription(self, channel, size)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            channel = self.subscriptions.get(subscription.channel, set())
+            channel.discard(subscription)
+            if not channel:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        """Публикация события для подписчиков всех процессов."""
+        self.backend.publish(channel, event)
+
+    def deliver(self, channel, event):
+        """Доставка события подписчикам канала в этом процессе. Может
+        вызываться из любого потока.
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.put, event
+                )
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт.
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+def publish_on_commit(title_id, event_type, data):
+    """Публикация события в канал произведения после фиксации текущей
+    транзакции. Данные сериализуются сразу, пока объект не изменился.
+    """
+    event = Event(
+        event_type,
+        json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    )
+    transaction.on_commit(
+        lambda: broker.publish(title_channel(title_id), event)
+    )
+
+
+def review_data(review):
+    return {
+        'id': review.pk,
+        'text': review.text,
+        'author': review.author.username,
+        'score': review.score,
+        'pub_date': review.pub_date,
+    }
+
+
+def comment_data(comment):
+    return {
+        'id': comment.pk,
+        'review_id': comment.review_id,
+        'text': comment.text,
+        'author': comment.author.username,
+        'pub_date': comment.pub_date,
+    }
@@ -0,0 +1,78 @@
+"""Количество произведений по жанрам, категориям и годам выпуска.
+
+Счётчики считаются одним запросом с группировкой на каждый вид
+(годы — одним запросом, десятилетия складываются из годов) и кэшируются
+по набору параметров фильтрации без параметров пагинации. В ключ кэша
+входит версия каталога из той же БД, что и счётчики (DataVersion). Она
+увеличивается при любом изменении произведений, жанров или категорий в
+любом процессе, поэтому устаревшие счётчики не используются. Фильтры по
+рейтингу зависят и от отзывов, для них срок жизни ограничен
+FACETS_CACHE_TIMEOUT.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from api_yamdb.constants import FACETS_CACHE_TIMEOUT
+from .indexes import bump_version, get_version
+from .models import Title
+
+VERSION_KEY = 'reviews:facets_version'
+DECADE = 10
+# Параметры, которые не влияют на счётчики.
+PAGINATION_PARAMS = ('page', 'page_size')
+
+
+def invalidate():
+    """Сброс кэша счётчиков после изменения каталога."""
+    bump_version(VERSION_KEY)
+
+
+def cache_key(params, using=None):
+    """Ключ кэша по версии каталога в БД using и параметрам запроса."""
+    signature = urlencode(sorted(
+        (name, value) for name, values in params.lists() for value in values
+        if name not in PAGINATION_PARAMS
+    ))
+    digest = hashlib.blake2b(signature.encode(), digest_size=16).hexdigest()
+    version = get_version(VERSION_KEY, using)
+    return f'titles:facets:{using}:{version}:{digest}'
+
+
+def count_facets(queryset):
+    """Счётчики для отфильтрованного набора произведений."""
+    titles = Title.objects.filter(pk__in=queryset.order_by().values('pk'))
+    genres = Title.genre.through.objects.filter(
+        title__in=titles
+    ).order_by('genre__slug').values_list('genre__slug').annotate(
+        count=Count('title_id')
+    )
+    categories = titles.filter(category__isnull=False).order_by(
+        'category__slug'
+    ).values_list('category__slug').annotate(count=Count('pk'))
+    years = dict(titles.order_by('year').values_list('year').annotate(
+        count=Count('pk')
+    ))
+    decades = {}
+    for year, count in years.items():
+        decade = str(year // DECADE * DECADE)
+        decades[decade] = decades.get(decade, 0) + count
+    return {
+        'count': sum(years.values()),
+        'genre': dict(genres),
+        'category': dict(categories),
+        'year': {str(year): count for year, count in years.items()},
+        'decade': decades,
+    }
+
+
+def get_facets(queryset, params):
+    """Счётчики из кэша или рассчитанные заново."""
+    key = cache_key(params, queryset.db)
+    facets = cache.get(key)
+    if facets is None:
+        facets = count_facets(queryset)
+        cache.set(key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,299 @@
+"""Индекс метаданных произведений в памяти процесса.
+
+Каждое произведение хранится строкой: битовое множество жанров,
+упакованное NumPy в байты, категория и десятилетие выпуска. Индекс
+строится при первом обращении и запоминает seq последней записи журнала
+изменений (ChangeLogEntry). При следующих обращениях каждый процесс
+читает из журнала id произведений, изменённых после этой записи, и
+перечитывает из БД только их строки. Целиком индекс перестраивается,
+только если изменённых произведений больше DELTA_LIMIT или версия
+индекса в основной БД (DataVersion) изменилась, например после импорта
+данных без сигналов. Индекс читает основную БД, а не реплики.
+
+Индекс используется для поиска похожих произведений и для фильтрации по
+нескольким жанрам: столбец битов жанра — битовое множество его
+произведений, поэтому пересечение и объединение жанров считаются
+побитовыми операциями над столбцами без запросов к БД.
+"""
+import threading
+
+import numpy as np
+from django.db import models, router, transaction
+from django.db.models import F
+
+from api_yamdb.constants import (CONTENT_CATEGORY_WEIGHT,
+                                 CONTENT_GENRE_WEIGHT, CONTENT_YEAR_WEIGHT,
+                                 SIMILAR_TITLES_SIZE)
+from api_yamdb.db_routers import change_seq
+from .arrays import NO_CATEGORY, category_value
+from .changes import model_name
+from .models import ChangeLogEntry, DataVersion, Title
+
+VERSION_KEY = 'reviews:title_index_version'
+YEAR_BUCKET = 10
+# Количество изменённых произведений, после которого индекс дешевле
+# построить заново, чем перечитать их строки.
+DELTA_LIMIT = 10000
+# Количество id в одном запросе при чтении изменённых произведений.
+ID_CHUNK_SIZE = 500
+# Строка удалённого произведения.
+EMPTY = -1
+# Количество единичных битов в каждом значении байта.
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], np.uint8)
+
+
+class GenreMode(models.TextChoices):
+    """Режим фильтрации по нескольким жанрам."""
+
+    ALL = 'all', 'Все жанры'
+    ANY = 'any', 'Любой из жанров'
+
+
+def primary(model):
+    """Менеджер модели, читающий из основной БД."""
+    return model.objects.db_manager(router.db_for_write(model))
+
+
+def get_version(key=VERSION_KEY, using=None):
+    """Текущая версия данных, общая для всех процессов. По умолчанию
+    читается из основной БД.
+    """
+    versions = (
+        DataVersion.objects.using(using) if using else primary(DataVersion)
+    )
+    return versions.filter(key=key).values_list(
+        'version', flat=True
+    ).first() or 0
+
+
+def bump_version(key=VERSION_KEY):
+    """Новая версия данных для всех процессов."""
+    versions = primary(DataVersion)
+    with transaction.atomic(using=versions.db):
+        if not versions.filter(key=key).update(version=F('version') + 1):
+            versions.get_or_create(key=key)
+            versions.filter(key=key).update(version=F('version') + 1)
+        return get_version(key)
+
+
+class TitleIndex:
+    """Метаданные всех произведений в массивах NumPy."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self.seq = 0
+        self.reset()
+
+    def reset(self, capacity=0):
+        self.rows = {}
+        self.genre_bits = {}
+        self.size = 0
+        self.title_ids = np.full(capacity, EMPTY, dtype=np.int64)
+        self.categories = np.full(capacity, NO_CATEGORY, dtype=np.int64)
+        self.buckets = np.zeros(capacity, dtype=np.int64)
+        self.genre_counts = np.zeros(capacity, dtype=np.int64)
+        self.bits = np.zeros((capacity, 1), dtype=np.uint8)
+
+    def build(self):
+        """Полное построение индекса по БД."""
+        self.seq = change_seq(router.db_for_write(ChangeLogEntry))
+        titles = list(primary(Title).order_by('pk').values_list(
+            'pk', 'category_id', 'year'
+        ))
+        genres = {}
+        for title_id, genre_id in primary(Title.genre.through).values_list(
+            'title_id', 'genre_id'
+        ).iterator():
+            genres.setdefault(title_id, []).append(genre_id)
+        self.reset(len(titles))
+        for title_id, category_id, year in titles:
+            self.set_row(title_id, category_id, year, genres.get(title_id, ()))
+
+    def ensure(self):
+        """Построение индекса или применение изменений из журнала."""
+        version = get_version()
+        if self.version != version:
+            self.build()
+            self.version = version
+            return
+        changes = list(primary(ChangeLogEntry).filter(
+            model=model_name(Title), seq__gt=self.seq
+        ).order_by('seq').values_list('seq', 'object_id')[:DELTA_LIMIT + 1])
+        if len(changes) > DELTA_LIMIT:
+            self.build()
+        elif changes:
+            self.load_titles({title_id for _, title_id in changes})
+            self.seq = changes[-1][0]
+
+    def load_titles(self, title_ids):
+        """Перечитывание строк произведений title_ids из БД. Строки
+        удалённых произведений очищаются.
+        """
+        title_ids = sorted(title_ids)
+        for start in range(0, len(title_ids), ID_CHUNK_SIZE):
+            chunk = title_ids[start:start + ID_CHUNK_SIZE]
+            titles = primary(Title).filter(pk__in=chunk).values_list(
+                'pk', 'category_id', 'year'
+            )
+            genres = {}
+            for title_id, genre_id in primary(
+                Title.genre.through
+            ).filter(title_id__in=chunk).values_list('title_id', 'genre_id'):
+                genres.setdefault(title_id, []).append(genre_id)
+            found = set()
+            for title_id, category_id, year in titles:
+                self.set_row(
+                    title_id, category_id, year, genres.get(title_id, ())
+                )
+                found.add(title_id)
+            for title_id in chunk:
+                if title_id not in found:
+                    self.drop_row(title_id)
+
+    def grow(self, rows, columns):
+        """Увеличение массивов с запасом, чтобы добавление строк в конец
+        выполнялось за амортизированное O(1).
+        """
+        if rows > len(self.title_ids):
+            capacity = max(rows, 2 * len(self.title_ids), 16)
+            extra = capacity - len(self.title_ids)
+            self.title_ids = np.concatenate(
+                [self.title_ids, np.full(extra, EMPTY, dtype=np.int64)]
+            )
+            self.categories = np.concatenate(
+                [self.categories, np.full(extra, NO_CATEGORY, np.int64)]
+            )
+            self.buckets = np.concatenate(
+                [self.buckets, np.zeros(extra, dtype=np.int64)]
+            )
+            self.genre_counts = np.concatenate(
+                [self.genre_counts, np.zeros(extra, dtype=np.int64)]
+            )
+            self.bits = np.vstack(
+                [self.bits, np.zeros((extra, self.bits.shape[1]), np.uint8)]
+            )
+        if columns > self.bits.shape[1]:
+            self.bits = np.hstack([self.bits, np.zeros(
+                (len(self.bits), max(columns, 2 * self.bits.shape[1])
+                 - self.bits.shape[1]),
+                dtype=np.uint8
+            )])
+
+    def genre_mask(self, genre_ids, create=False):
+        """Битовое множество жанров в виде упакованных байтов."""
+        bits = []
+        for genre_id in genre_ids:
+            if genre_id not in self.genre_bits:
+                if not create:
+                    continue
+                self.genre_bits[genre_id] = len(self.genre_bits)
+            bits.append(self.genre_bits[genre_id])
+        mask = np.zeros(self.bits.shape[1] * 8, dtype=bool)
+        if bits and max(bits) >= len(mask):
+            self.grow(0, max(bits) // 8 + 1)
+            mask = np.zeros(self.bits.shape[1] * 8, dtype=bool)
+        mask[bits] = True
+        return np.packbits(mask)
+
+    def set_row(self, title_id, category_id, year, genre_ids):
+        row = self.rows.get(title_id)
+        if row is None:
+            row = self.rows[title_id] = self.size
+            self.size += 1
+            self.grow(self.size, 1)
+        mask = self.genre_mask(genre_ids, create=True)
+        self.title_ids[row] = title_id
+        self.categories[row] = category_value(category_id)
+        self.buckets[row] = year // YEAR_BUCKET
+        self.bits[row] = mask
+        self.genre_counts[row] = POPCOUNT[mask].sum()
+
+    def drop_row(self, title_id):
+        row = self.rows.pop(title_id, None)
+        if row is not None:
+            self.title_ids[row] = EMPTY
+            self.bits[row] = 0
+            self.genre_counts[row] = 0
+
+    def invalidate(self):
+        """Перестроение индекса во всех процессах."""
+        with self.lock:
+            bump_version()
+
+    def similar(self, title_id, size=SIMILAR_TITLES_SIZE):
+        """Похожие по метаданным произведения: список пар
+        (title_id, сходство) по убыванию сходства.
+
+        Сходство — взвешенная сумма коэффициента Жаккара множеств жанров,
+        совпадения категории и совпадения десятилетия выпуска. Перед
+        поиском индекс перечитывает только произведения, изменённые после
+        прошлого обращения (см. ensure).
+        """
+        with self.lock:
+            self.ensure()
+            row = self.rows.get(title_id)
+            if row is None:
+                return []
+            common = np.zeros(self.size, dtype=np.int64)
+            # Байты без жанров произведения не влияют на пересечение.
+            for column in np.flatnonzero(self.bits[row]):
+                common += POPCOUNT[
+                    self.bits[:self.size, column] & self.bits[row, column]
+                ]
+            counts = self.genre_counts[:self.size]
+            union = counts + counts[row] - common
+            scores = CONTENT_GENRE_WEIGHT * np.divide(
+                common, union, out=np.zeros(self.size), where=union > 0
+            )
+            categories = self.categories[:self.size]
+            if self.categories[row] != NO_CATEGORY:
+                scores += CONTENT_CATEGORY_WEIGHT * (
+                    categories == self.categories[row]
+                )
+            scores += CONTENT_YEAR_WEIGHT * (
+                self.buckets[:self.size] == self.buckets[row]
+            )
+            scores[(self.title_ids[:self.size] == EMPTY)] = 0
+            scores[row] = 0
+            size = min(size, self.size)
+            if not size:
+                return []
+            top = np.argpartition(-scores, size - 1)[:size]
+            top = top[np.lexsort((self.title_ids[top], -scores[top]))]
+            return [
+                (title, score) for title, score in zip(
+                    self.title_ids[top].tolist(), scores[top].tolist()
+                )
+                if score > 0
+            ]
+
+    def filter_genres(self, genre_ids, mode=GenreMode.ALL):
+        """Отсортированный массив id произведений, у которых есть все
+        (mode=all) или хотя бы один (mode=any) из жанров genre_ids.
+        """
+        with self.lock:
+            self.ensure()
+            known = [
+                genre_id for genre_id in genre_ids
+                if genre_id in self.genre_bits
+            ]
+            if not known or (
+                mode == GenreMode.ALL and len(known) < len(set(genre_ids))
+            ):
+                return np.empty(0, dtype=np.int64)
+            mask = self.genre_mask(known)
+            bits = self.bits[:self.size]
+            if mode == GenreMode.ALL:
+                rows = np.ones(self.size, dtype=bool)
+                for column in np.flatnonzero(mask):
+                    rows &= (bits[:, column] & mask[column]) == mask[column]
+            else:
+                rows = np.zeros(self.size, dtype=bool)
+                for column in np.flatnonzero(mask):
+                    rows |= (bits[:, column] & mask[column]) != 0
+            title_ids = self.title_ids[:self.size]
+            return np.sort(title_ids[rows & (title_ids != EMPTY)])
+
+
+title_index = TitleIndex()
@@ -0,0 +1,167 @@
+"""Инкрементальный пересчёт рейтинговых списков произведений.
+
+Популярность произведения — количество отзывов, где вклад каждого отзыва
+затухает вдвое за TRENDING_HALF_LIFE_DAYS. Значение хранится на момент
+последнего пересчёта: при следующем пересчёте все значения умножаются на
+общий коэффициент затухания одним UPDATE, а затем заново считаются по
+отзывам только для произведений, отзывы которых появились или изменились
+после прошлого пересчёта. Такие произведения находятся по журналу
+изменений (ChangeLogEntry), поэтому учитываются и отзывы, записанные
+импортом с произвольными id. При удалении отзыва популярность его
+произведения сразу пересчитывается на момент прошлого пересчёта.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from api_yamdb.constants import LEADERBOARD_SIZE, TRENDING_HALF_LIFE_DAYS
+from .changes import model_name
+from .models import (Category, ChangeLogEntry, Genre, Leaderboard,
+                     LeaderboardEntry, LeaderboardState, Review, Title)
+
+ALL_SCOPE = 'all'
+UPDATE_BATCH_SIZE = 500
+HALF_LIFE = timedelta(days=TRENDING_HALF_LIFE_DAYS)
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def genre_scope(slug):
+    return f'genre:{slug}'
+
+
+def decay(age):
+    """Коэффициент затухания для промежутка времени age."""
+    return 0.5 ** (age / HALF_LIFE)
+
+
+def apply_decay(state, now):
+    """Затухание популярности всех произведений с прошлого пересчёта."""
+    if state.refreshed_at is None:
+        return
+    Title.objects.filter(popularity__gt=0).update(
+        popularity=F('popularity') * decay(now - state.refreshed_at)
+    )
+
+
+def title_popularity(title_ids, at):
+    """Популярность произведений title_ids на момент at по их отзывам."""
+    popularity = dict.fromkeys(title_ids, 0)
+    reviews = Review.objects.filter(
+        title_id__in=title_ids
+    ).order_by().values_list('title_id', 'pub_date')
+    for title_id, pub_date in reviews.iterator():
+        popularity[title_id] += decay(max(at - pub_date, timedelta(0)))
+    return popularity
+
+
+def save_popularity(popularity):
+    """Запись популярности произведений из словаря {title_id: значение}."""
+    title_ids = list(popularity)
+    for start in range(0, len(title_ids), UPDATE_BATCH_SIZE):
+        batch = title_ids[start:start + UPDATE_BATCH_SIZE]
+        Title.objects.filter(pk__in=batch).update(
+            popularity=Case(
+                *[
+                    When(pk=title_id, then=Value(popularity[title_id]))
+                    for title_id in batch
+                ],
+                output_field=FloatField()
+            )
+        )
+
+
+def changed_titles(state):
+    """id произведений, отзывы которых появились или изменились после
+    записи журнала state.last_seq. Сдвигает state.last_seq.
+    """
+    title_ids = set()
+    entries = ChangeLogEntry.objects.filter(
+        model=model_name(Review), seq__gt=state.last_seq
+    ).order_by('seq').values_list('seq', 'data')
+    for seq, data in entries.iterator():
+        # Удалённые отзывы учтены при удалении (см. forget_review).
+        if data is not None:
+            title_ids.add(data['title_id'])
+        state.last_seq = seq
+    return title_ids
+
+
+def add_changed_titles(state, now):
+    """Пересчёт популярности произведений с изменёнными отзывами."""
+    title_ids = sorted(changed_titles(state))
+    for start in range(0, len(title_ids), UPDATE_BATCH_SIZE):
+        save_popularity(title_popularity(
+            title_ids[start:start + UPDATE_BATCH_SIZE], now
+        ))
+    return len(title_ids)
+
+
+def forget_review(title_id):
+    """Пересчёт популярности произведения после удаления его отзыва на
+    момент прошлого пересчёта, чтобы удалённый отзыв не учитывался до
+    полного затухания.
+    """
+    refreshed_at = LeaderboardState.objects.filter(pk=1).values_list(
+        'refreshed_at', flat=True
+    ).first()
+    if refreshed_at is not None:
+        save_popularity(title_popularity([title_id], refreshed_at))
+
+
+def scopes():
+    """Области рейтинговых списков с фильтрами произведений."""
+    yield ALL_SCOPE, {}
+    for slug in Category.objects.values_list('slug', flat=True):
+        yield category_scope(slug), {'category__slug': slug}
+    for slug in Genre.objects.values_list('slug', flat=True):
+        yield genre_scope(slug), {'genre__slug': slug}
+
+
+BOARD_FIELDS = {
+    Leaderboard.TRENDING: 'popularity',
+    Leaderboard.TOP_RATED: 'weighted_rating',
+}
+
+
+def build_entries(size):
+    """Позиции всех рейтинговых списков."""
+    entries = []
+    for scope, filters in scopes():
+        for board, field in BOARD_FIELDS.items():
+            ranked = Title.objects.filter(
+                **filters, **{f'{field}__gt': 0}
+            ).order_by(f'-{field}', 'pk').values_list('pk', field)[:size]
+            entries.extend(
+                LeaderboardEntry(
+                    board=board,
+                    scope=scope,
+                    position=position,
+                    title_id=title_id,
+                    score=score,
+                )
+                for position, (title_id, score) in enumerate(ranked, 1)
+            )
+    return entries
+
+
+def refresh_leaderboards(now=None, size=LEADERBOARD_SIZE):
+    """Пересчёт популярности и рейтинговых списков. Взвешенный рейтинг
+    поддерживается при изменении отзывов. Возвращает количество
+    произведений с новыми или изменёнными отзывами.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        state, _ = LeaderboardState.objects.select_for_update(
+        ).get_or_create(pk=1)
+        apply_decay(state, now)
+        updated = add_changed_titles(state, now)
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(build_entries(size))
+        state.refreshed_at = now
+        state.save()
+    return updated
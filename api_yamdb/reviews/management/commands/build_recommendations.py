@@ -0,0 +1,60 @@
+import os
+
+from django.core.management import BaseCommand, CommandError
+
+from api_yamdb.constants import RECOMMENDATIONS_SIZE
+from reviews.recommendations import (BATCH_USERS, WRITE_BATCH_SIZE,
+                                     refresh_recommendations)
+
+
+class Command(BaseCommand):
+    """Команда для расчёта персональных рекомендаций."""
+
+    help = (
+        'Расчёт списков рекомендованных произведений для всех '
+        'пользователей с отзывами по таблице похожих произведений. '
+        'Запускается после build_similar_titles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=RECOMMENDATIONS_SIZE,
+            help='Количество рекомендаций для каждого пользователя.'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Количество процессов для расчёта.'
+        )
+        parser.add_argument(
+            '--batch-users',
+            type=int,
+            default=BATCH_USERS,
+            help='Количество пользователей в одном пакете расчёта.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=WRITE_BATCH_SIZE,
+            help='Количество записей в одном INSERT.'
+        )
+
+    def handle(self, *args, **options):
+        numbers = ('size', 'jobs', 'batch_users', 'batch_size')
+        if any(options[name] < 1 for name in numbers):
+            raise CommandError(
+                'Параметры --size, --jobs, --batch-users и --batch-size '
+                'должны быть больше нуля.'
+            )
+        total = refresh_recommendations(
+            size=options['size'],
+            jobs=options['jobs'],
+            batch_users=options['batch_users'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено рекомендаций: {total}')
+        )
@@ -0,0 +1,65 @@
+from django.core.management import BaseCommand, CommandError
+
+from api_yamdb.constants import SIMILAR_TITLES_SIZE
+from reviews.models import Similarity
+from reviews.similarity import (BATCH_SIZE, BLOCK_CELLS, CHUNK_SIZE,
+                                refresh_similar_titles)
+
+
+class Command(BaseCommand):
+    """Команда для расчёта похожих произведений по оценкам."""
+
+    help = (
+        'Расчёт K самых похожих произведений для каждого произведения '
+        'по оценкам пользователей, оставивших отзывы на оба.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--similarity',
+            choices=Similarity.values,
+            default=Similarity.ADJUSTED_COSINE,
+            help='Способ расчёта сходства.'
+        )
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=SIMILAR_TITLES_SIZE,
+            help='Количество похожих произведений для каждого произведения.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество отзывов, читаемых из БД за один раз.'
+        )
+        parser.add_argument(
+            '--block-cells',
+            type=int,
+            default=BLOCK_CELLS,
+            help='Максимальный размер блока матрицы сходства в ячейках.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество записей в одном INSERT.'
+        )
+
+    def handle(self, *args, **options):
+        numbers = ('size', 'chunk_size', 'block_cells', 'batch_size')
+        if any(options[name] < 1 for name in numbers):
+            raise CommandError(
+                'Параметры --size, --chunk-size, --block-cells и '
+                '--batch-size должны быть больше нуля.'
+            )
+        total = refresh_similar_titles(
+            similarity=options['similarity'],
+            size=options['size'],
+            chunk_size=options['chunk_size'],
+            block_cells=options['block_cells'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено похожих произведений: {total}')
+        )
@@ -0,0 +1,36 @@
+from django.core.management import BaseCommand
+
+from reviews.user_links import delete_user_data, orphan_user_ids
+
+
+class Command(BaseCommand):
+    """Команда для удаления данных отсутствующих пользователей."""
+
+    help = (
+        'Удаление отзывов, комментариев и рекомендаций, которые ссылаются '
+        'на отсутствующих пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести id отсутствующих пользователей.'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = orphan_user_ids()
+        if not user_ids:
+            self.stdout.write(
+                self.style.SUCCESS('Данных без пользователя нет.')
+            )
+            return
+        self.stdout.write(
+            f'Отсутствующие пользователи: '
+            f'{", ".join(map(str, user_ids))}.'
+        )
+        if options['dry_run']:
+            return
+        for label, count in delete_user_data(user_ids).items():
+            self.stdout.write(f'{label}: удалено {count}.')
+        self.stdout.write(self.style.SUCCESS('Данные удалены.'))
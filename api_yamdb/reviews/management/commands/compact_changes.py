@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews.changes import compact
+
+
+class Command(BaseCommand):
+    """Команда для сжатия журнала изменений."""
+
+    help = (
+        'Удаление записей журнала изменений, после которых есть более '
+        'поздняя запись того же объекта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            type=int,
+            default=None,
+            help='Сжимать только записи с номером меньше заданного.'
+        )
+
+    def handle(self, *args, **options):
+        if options['before'] is not None and options['before'] < 1:
+            raise CommandError('Параметр --before должен быть больше нуля.')
+        total = compact(options['before'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено записей журнала: {total}')
+        )
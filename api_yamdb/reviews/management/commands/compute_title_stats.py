@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews.stats import BATCH_SIZE, CHUNK_SIZE, refresh_stats
+
+
+class Command(BaseCommand):
+    """Команда для расчёта статистики оценок произведений."""
+
+    help = (
+        'Расчёт средней оценки, медианы, стандартного отклонения, '
+        'процентильного ранга в категории и количества отзывов в месяц '
+        'для каждого произведения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество отзывов, читаемых из БД за один раз.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество записей статистики в одном INSERT.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['batch_size'] < 1:
+            raise CommandError(
+                'Параметры --chunk-size и --batch-size должны быть больше '
+                'нуля.'
+            )
+        total = refresh_stats(options['chunk_size'], options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Рассчитана статистика произведений: {total}')
+        )
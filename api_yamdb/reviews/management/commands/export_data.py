@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_JOBS = 4
+
+# Имя выгрузки совпадает с именем csv файла в import_data, колонки
+# перечислены парами (колонка в файле, поле модели).
+EXPORT_TABLES = {
+    'genre': (Genre, (('id', 'id'), ('name', 'name'), ('slug', 'slug'))),
+    'category': (
+        Category, (('id', 'id'), ('name', 'name'), ('slug', 'slug'))
+    ),
+    # Персональные данные (email, имя, фамилия, биография, пароль)
+    # в аналитическую выгрузку не попадают.
+    'users': (
+        User,
+        (
+            ('id', 'id'), ('username', 'username'), ('role', 'role'),
+            ('date_joined', 'date_joined'),
+        )
+    ),
+    'titles': (
+        Title,
+        (
+            ('id', 'id'), ('name', 'name'), ('year', 'year'),
+            ('description', 'description'), ('category', 'category_id'),
+        )
+    ),
+    'review': (
+        Review,
+        (
+            ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+            ('author', 'author_id'), ('score', 'score'),
+            ('pub_date', 'pub_date'),
+        )
+    ),
+    'comments': (
+        Comment,
+        (
+            ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+            ('author', 'author_id'), ('pub_date', 'pub_date'),
+        )
+    ),
+    'genre_title': (
+        Title.genre.through,
+        (('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'))
+    ),
+}
+
+ARROW_TYPES = {
+    'AutoField': pa.int64(),
+    'BigAutoField': pa.int64(),
+    'IntegerField': pa.int64(),
+    'BigIntegerField': pa.int64(),
+    'PositiveIntegerField': pa.int64(),
+    'BooleanField': pa.bool_(),
+    'CharField': pa.string(),
+    'SlugField': pa.string(),
+    'TextField': pa.string(),
+    'EmailField': pa.string(),
+    'DateTimeField': pa.timestamp('us', tz='UTC'),
+}
+
+
+def arrow_type(field):
+    """Тип колонки parquet для поля модели."""
+    if field.is_relation:
+        field = field.target_field
+    return ARROW_TYPES[field.get_internal_type()]
+
+
+def get_schema(model, columns):
+    """Схема parquet файла, одинаковая для всех групп строк."""
+    return pa.schema([
+        (column, arrow_type(model._meta.get_field(lookup)))
+        for column, lookup in columns
+    ])
+
+
+class Command(BaseCommand):
+    """Команда для выгрузки данных в parquet для аналитики."""
+
+    help = 'Выгрузка данных в parquet файлы, зеркально import_data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.BASE_DIR, 'export'),
+            help='Директория для parquet файлов.'
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            choices=list(EXPORT_TABLES),
+            default=list(EXPORT_TABLES),
+            help='Выгружаемые таблицы.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк в одной группе строк parquet.'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=DEFAULT_JOBS,
+            help='Количество таблиц, выгружаемых параллельно.'
+        )
+        parser.add_argument(
+            '--compression',
+            default='snappy',
+            help='Алгоритм сжатия parquet.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['jobs'] < 1:
+            raise CommandError(
+                'Параметры --chunk-size и --jobs должны быть больше нуля.'
+            )
+        os.makedirs(options['output'], exist_ok=True)
+        with ThreadPoolExecutor(max_workers=options['jobs']) as executor:
+            futures = {
+                executor.submit(
+                    self.export_table,
+                    file_name,
+                    options['output'],
+                    options['chunk_size'],
+                    options['compression'],
+                ): file_name
+                for file_name in options['tables']
+            }
+            for future in as_completed(futures):
+                file_path, rows = future.result()
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Выгружено строк: {rows} в файл {file_path}'
+                    )
+                )
+
+    @staticmethod
+    def read_chunks(model, columns, chunk_size):
+        """Чтение таблицы частями, каждая часть — словарь колонок."""
+        lookups = [lookup for _, lookup in columns]
+        rows = model.objects.order_by('pk').values_list(*lookups).iterator(
+            chunk_size=chunk_size
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def export_table(self, file_name, output, chunk_size, compression):
+        """Выгрузка одной таблицы в parquet по группам строк.
+
+        Выполняется в отдельном потоке, поэтому по завершении закрывает
+        собственное соединение с БД.
+        """
+        model, columns = EXPORT_TABLES[file_name]
+        schema = get_schema(model, columns)
+        file_path = os.path.join(output, f'{file_name}.parquet')
+        tmp_path = f'{file_path}.tmp'
+        rows = 0
+        try:
+            with pq.ParquetWriter(
+                tmp_path, schema, compression=compression
+            ) as writer:
+                for chunk in self.read_chunks(model, columns, chunk_size):
+                    writer.write_table(
+                        pa.Table.from_arrays(
+                            [
+                                pa.array(values, type=field.type)
+                                for values, field in zip(zip(*chunk), schema)
+                            ],
+                            schema=schema
+                        ),
+                        row_group_size=chunk_size
+                    )
+                    rows += len(chunk)
+            os.replace(tmp_path, file_path)
+        finally:
+            connection.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return file_path, rows
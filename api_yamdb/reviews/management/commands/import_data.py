@@ -1,17 +1,153 @@
+import hashlib
 import os
-import csv
+from datetime import datetime
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews import changes, facets
+from reviews.indexes import title_index
+from reviews.management.readers import find_source_file, read_chunks
+from reviews.management.validation import Validator, read_frame
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleScoreHistogram)
 from users.models import User
 
+DEFAULT_CHUNK_SIZE = 10_000
+# Ограничение на количество параметров в одном запросе у SQLite.
+ID_BATCH_SIZE = 900
+
+FILE_NAMES = (
+    'genre', 'category', 'users', 'titles', 'review', 'comments',
+    'genre_title',
+)
+
+INSERT = 'insert'
+UPSERT = 'upsert'
+
+
+def get_columns(cur_model, columns):
+    """Сопоставление колонок файла с полями модели."""
+    fields = {}
+    for column in columns:
+        try:
+            fields[column] = cur_model._meta.get_field(column)
+        except FieldDoesNotExist:
+            raise CommandError(
+                f'Поле "{column}" отсутствует в модели '
+                f'{cur_model.__name__}.'
+            )
+    if cur_model._meta.pk.name not in columns:
+        raise CommandError(
+            f'Для режима {UPSERT} в файле нужна колонка '
+            f'"{cur_model._meta.pk.name}".'
+        )
+    return fields
+
+
+def to_python(field, value):
+    """Преобразование строкового значения из файла к типу поля."""
+    if value == '' and field.null:
+        return None
+    value = field.to_python(value)
+    if isinstance(value, datetime) and timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.utc)
+    return value
+
+
+def normalize(value):
+    """Одинаковое строковое представление для значений из файла и БД."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    return str(value)
+
+
+def row_hash(values):
+    """Хеш содержимого записи без первичного ключа."""
+    return hashlib.blake2b(
+        '\x1f'.join(map(normalize, values)).encode(), digest_size=16
+    ).digest()
+
 
 class Command(BaseCommand):
-    """Команда для импорта данных из csv."""
+    """Команда для импорта данных из csv, csv.gz, ndjson или parquet."""
+
+    help = 'Импорт данных из файлов в форматах csv, csv.gz, ndjson, parquet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=os.path.join(settings.BASE_DIR, 'static/data/'),
+            help='Директория с файлами данных.'
+        )
+        parser.add_argument(
+            '--file',
+            action='append',
+            default=[],
+            dest='files',
+            metavar='ИМЯ=ПУТЬ',
+            help='Явный путь к файлу, например review=/tmp/review.parquet.'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=(INSERT, UPSERT),
+            default=INSERT,
+            help=(
+                f'{INSERT} — добавлять только отсутствующие записи, '
+                f'{UPSERT} — добавлять новые и обновлять изменённые записи '
+                'по первичному ключу.'
+            )
+        )
+        parser.add_argument(
+            '--validate-only',
+            action='store_true',
+            help='Только проверить файлы, ничего не записывая в БД.'
+        )
+        parser.add_argument(
+            '--skip-validation',
+            action='store_true',
+            help='Не выполнять предварительную проверку файлов.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество записей, обрабатываемых за один раз.'
+        )
 
     def handle(self, *args, **kwargs):
+        self.source = kwargs['source']
+        self.chunk_size = kwargs['chunk_size']
+        self.paths = self.parse_files(kwargs['files'])
+        if kwargs['validate_only'] or not kwargs['skip_validation']:
+            self.validate()
+            if kwargs['validate_only']:
+                return
+        if kwargs['mode'] == UPSERT:
+            for cur_model, file_name in (
+                (Genre, 'genre'),
+                (Category, 'category'),
+                (User, 'users'),
+                (Title, 'titles'),
+                (Review, 'review'),
+                (Comment, 'comments'),
+                (Title.genre.through, 'genre_title'),
+            ):
+                self.upsert_data(cur_model, file_name)
+            # bulk_create и bulk_update не отправляют сигналы,
+            # поэтому хранимые рейтинг, счётчики и гистограммы
+            # пересчитываются отдельно.
+            Title.objects.refresh_rating()
+            Review.objects.refresh_comment_count()
+            TitleScoreHistogram.rebuild()
+            title_index.invalidate()
+            facets.invalidate()
+            return
         self.import_data(Genre, 'genre')
         self.import_data(Category, 'category')
         self.import_data(User, 'users')
@@ -19,74 +155,219 @@ class Command(BaseCommand):
         self.import_data(Review, 'review')
         self.import_data(Comment, 'comments')
         self.import_genre_title('genre_title')
+        title_index.invalidate()
+        facets.invalidate()
 
     @staticmethod
-    def read_file(file_name):
-        """Чтение данных из csv файла для последующего импорта."""
-        file_path = os.path.join(
-            settings.BASE_DIR, 'static/data/', f'{file_name}.csv'
+    def parse_files(files):
+        """Разбор явно переданных путей вида ИМЯ=ПУТЬ."""
+        paths = {}
+        for item in files:
+            file_name, separator, path = item.partition('=')
+            if not separator or not os.path.exists(path):
+                raise CommandError(f'Некорректный путь к файлу: {item}')
+            paths[file_name] = path
+        return paths
+
+    def get_path(self, file_name):
+        """Путь к файлу с данными: явно переданный или из директории."""
+        return self.paths.get(file_name) or find_source_file(
+            self.source, file_name
         )
-        with open(file_path, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            return list(reader)
+
+    def validate(self):
+        """Предварительная проверка всех файлов до записи в БД."""
+        frames = {}
+        for file_name in FILE_NAMES:
+            file_path = self.get_path(file_name)
+            if file_path is not None:
+                frames[file_name] = read_frame(file_path)
+        problems = Validator(frames).validate()
+        for problem in problems:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{problem.file_name}: {problem.rule} — '
+                    f'строк: {problem.count}, например: {problem.examples}'
+                )
+            )
+        if problems:
+            raise CommandError(
+                f'Проверка не пройдена, нарушений: {len(problems)}. '
+                'Данные не импортированы.'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Проверка пройдена, файлов: {len(frames)}.'
+            )
+        )
+
+    def read_file(self, file_name):
+        """Чтение данных частями из файла для последующего импорта."""
+        file_path = self.get_path(file_name)
+        if file_path is None:
+            self.stdout.write(
+                self.style.WARNING(f'Файл с данными "{file_name}" не найден.')
+            )
+            return
+        yield from read_chunks(file_path, self.chunk_size)
 
     def get_new_data(self, cur_model, file_name):
         """Загружаем только те данные, которых нет в БД."""
-        reader = self.read_file(file_name)
-        db_data = list(cur_model.objects.all().values(*reader[0].keys()))
-        for record in db_data:
-            for key in record.keys():
-                record[key] = str(record[key])
-        db_data_set = {tuple(d.items()) for d in db_data}
-        new_data = [
-            row for row in reader if tuple(row.items()) not in db_data_set
-        ]
-        return new_data
+        db_data_set = None
+        for reader in self.read_file(file_name):
+            if db_data_set is None:
+                db_data = list(
+                    cur_model.objects.all().values(*reader[0].keys())
+                )
+                for record in db_data:
+                    for key in record.keys():
+                        record[key] = str(record[key])
+                db_data_set = {tuple(d.items()) for d in db_data}
+            yield [
+                row for row in reader if tuple(row.items()) not in db_data_set
+            ]
 
     def import_data(self, cur_model, file_name):
         """Импорт данных в БД."""
-        reader = self.get_new_data(cur_model, file_name)
-        for row in reader:
-            if cur_model == Title:
-                category_id = row.pop('category', None)
-                row['category'] = Category.objects.get(id=category_id)
-            elif cur_model in (Review, Comment):
-                author_id = row.pop('author', None)
-                row['author'] = User.objects.get(id=author_id)
-            model, created = cur_model.objects.get_or_create(**row)
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(f'Добавлена запись: {model}')
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(f'Запись уже существует: {model}')
+        for reader in self.get_new_data(cur_model, file_name):
+            for row in reader:
+                self.import_row(cur_model, row)
+
+    def import_row(self, cur_model, row):
+        """Импорт одной записи в БД."""
+        if cur_model == Title:
+            category_id = row.pop('category', None)
+            row['category'] = Category.objects.get(
+                id=category_id
+            ) if category_id not in (None, '') else None
+        elif cur_model in (Review, Comment):
+            author_id = row.pop('author', None)
+            row['author'] = User.objects.get(id=author_id)
+        model, created = cur_model.objects.get_or_create(**row)
+        if created:
+            self.stdout.write(
+                self.style.SUCCESS(f'Добавлена запись: {model}')
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING(f'Запись уже существует: {model}')
+            )
+
+    def upsert_data(self, cur_model, file_name):
+        """Синхронизация данных с БД по первичному ключу.
+
+        Записи сравниваются по хешу содержимого: новые добавляются,
+        изменённые обновляются, неизменённые пропускаются.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for reader in self.read_file(file_name):
+            fields = get_columns(cur_model, reader[0].keys())
+            try:
+                with transaction.atomic(
+                    using=router.db_for_write(cur_model)
+                ):
+                    for key, value in self.upsert_chunk(
+                        cur_model, fields, reader
+                    ).items():
+                        counts[key] += value
+            except IntegrityError as error:
+                raise CommandError(
+                    f'{file_name}: нарушено ограничение БД ({error}). '
+                    'Предыдущие части файла уже записаны.'
                 )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{file_name}: добавлено {counts["inserted"]}, '
+                f'обновлено {counts["updated"]}, '
+                f'без изменений {counts["unchanged"]}.'
+            )
+        )
+        return counts
 
-    def import_genre_title(self, file_name):
-        """Импорт данных в БД для связи многие ко многим."""
-        reader = self.read_file(file_name)
+    def upsert_chunk(self, cur_model, fields, reader):
+        """Синхронизация одной части данных с БД."""
+        pk_name = cur_model._meta.pk.name
+        attnames = [
+            field.attname for field in fields.values()
+            if not field.primary_key
+        ]
+        records = {}
         for row in reader:
-            # Проверяем существование title и genre перед созданием связи
             try:
-                title = Title.objects.get(id=row['title_id'])
-                genre = Genre.objects.get(id=row['genre_id'])
-                title.genre.add(genre)
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Связь между произведением ID "{title.id}"'
-                        + f'и жанром ID "{genre.id}" создана.'
-                    )
+                values = {
+                    field.attname: to_python(field, row[column])
+                    for column, field in fields.items()
+                }
+            except ValidationError as error:
+                raise CommandError(f'Некорректная запись {row}: {error}')
+            records[values.pop(pk_name)] = values
+        existing = self.get_hashes(cur_model, attnames, list(records))
+        new_objs, changed_objs = [], []
+        for pk, values in records.items():
+            if pk not in existing:
+                new_objs.append(cur_model(pk=pk, **values))
+            elif existing[pk] != row_hash(values[name] for name in attnames):
+                changed_objs.append(cur_model(pk=pk, **values))
+        if cur_model is Title.genre.through:
+            # Произведения, от которых уходят изменённые связи.
+            title_ids = set(cur_model.objects.filter(
+                pk__in=[obj.pk for obj in changed_objs]
+            ).values_list('title_id', flat=True))
+        cur_model.objects.bulk_create(new_objs, batch_size=ID_BATCH_SIZE)
+        if changed_objs and attnames:
+            cur_model.objects.bulk_update(
+                changed_objs, attnames, batch_size=ID_BATCH_SIZE
+            )
+        changes.log_bulk_saved(cur_model, new_objs, changed_objs)
+        if cur_model is Title.genre.through:
+            title_ids.update(obj.title_id for obj in new_objs + changed_objs)
+            changes.log_titles_updated(title_ids)
+        return {
+            'inserted': len(new_objs),
+            'updated': len(changed_objs),
+            'unchanged': len(records) - len(new_objs) - len(changed_objs),
+        }
+
+    @staticmethod
+    def get_hashes(cur_model, attnames, ids):
+        """Хеши содержимого записей из БД, запрашиваемые пачками id."""
+        hashes = {}
+        for start in range(0, len(ids), ID_BATCH_SIZE):
+            rows = cur_model.objects.filter(
+                pk__in=ids[start:start + ID_BATCH_SIZE]
+            ).values_list('pk', *attnames)
+            for pk, *values in rows:
+                hashes[pk] = row_hash(values)
+        return hashes
+
+    def import_genre_title(self, file_name):
+        """Импорт данных в БД для связи многие ко многим."""
+        for reader in self.read_file(file_name):
+            for row in reader:
+                self.import_genre_title_row(row)
+
+    def import_genre_title_row(self, row):
+        """Импорт одной связи между произведением и жанром."""
+        # Проверяем существование title и genre перед созданием связи
+        try:
+            title = Title.objects.get(id=row['title_id'])
+            genre = Genre.objects.get(id=row['genre_id'])
+            title.genre.add(genre)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Связь между произведением ID "{title.id}"'
+                    + f'и жанром ID "{genre.id}" создана.'
                 )
-            except Title.DoesNotExist:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'Произведение с ID "{row["title_id"]}" не существует.'
-                    )
+            )
+        except Title.DoesNotExist:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Произведение с ID "{row["title_id"]}" не существует.'
                 )
-            except Genre.DoesNotExist:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'Жанр с ID "{row["genre_id"]}" не существует.'
-                    )
+            )
+        except Genre.DoesNotExist:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Жанр с ID "{row["genre_id"]}" не существует.'
                 )
+            )
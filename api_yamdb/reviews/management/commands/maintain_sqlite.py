@@ -0,0 +1,62 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews.sqlite import maintain
+
+
+class Command(BaseCommand):
+    """Команда для обслуживания БД SQLite."""
+
+    help = (
+        'ANALYZE, PRAGMA optimize, постраничное освобождение места '
+        '(incremental_vacuum) и перенос журнала WAL в файл БД '
+        '(wal_checkpoint).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Псевдоним БД из настройки DATABASES.'
+        )
+        parser.add_argument(
+            '--vacuum-pages',
+            type=int,
+            default=0,
+            help='Количество освобождаемых страниц, 0 — все свободные.'
+        )
+        parser.add_argument(
+            '--skip-analyze',
+            action='store_true',
+            help='Не пересчитывать статистику всех таблиц (ANALYZE).'
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum',
+            action='store_true',
+            help=(
+                'Включить auto_vacuum=INCREMENTAL. Для существующей БД '
+                'выполняет полный VACUUM.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['vacuum_pages'] < 0:
+            raise CommandError(
+                'Параметр --vacuum-pages не может быть отрицательным.'
+            )
+        if options['database'] not in connections:
+            raise CommandError(f'БД {options["database"]} не настроена.')
+        try:
+            steps = maintain(
+                connections[options['database']],
+                analyze=not options['skip_analyze'],
+                vacuum_pages=options['vacuum_pages'],
+                enable_incremental_vacuum=(
+                    options['enable_incremental_vacuum']
+                ),
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        for step, result in steps:
+            self.stdout.write(f'{step}: {result}')
+        self.stdout.write(self.style.SUCCESS('Обслуживание БД завершено.'))
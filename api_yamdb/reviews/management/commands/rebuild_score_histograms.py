@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+
+from reviews.models import TitleScoreHistogram
+
+
+class Command(BaseCommand):
+    """Команда для полного пересчёта гистограмм оценок произведений."""
+
+    help = 'Пересчёт гистограмм оценок произведений по всем отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество гистограмм, записываемых за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        total = TitleScoreHistogram.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано гистограмм: {total}')
+        )
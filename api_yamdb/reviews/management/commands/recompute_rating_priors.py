@@ -0,0 +1,49 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews.models import Category
+from reviews.rating import CHUNK_SIZE, PRIOR_QUANTILE, refresh_priors
+
+
+class Command(BaseCommand):
+    """Команда для пересчёта априорных значений взвешенного рейтинга."""
+
+    help = (
+        'Пересчёт априорного среднего и веса взвешенного рейтинга '
+        'глобально и по категориям, затем взвешенного рейтинга '
+        'всех произведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество отзывов, читаемых из БД за один раз.'
+        )
+        parser.add_argument(
+            '--quantile',
+            type=float,
+            default=PRIOR_QUANTILE,
+            help=(
+                'Квантиль количества отзывов у произведений, '
+                'используемый как априорный вес.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError(
+                'Параметр --chunk-size должен быть больше нуля.'
+            )
+        if not 0 <= options['quantile'] <= 1:
+            raise CommandError('Параметр --quantile должен быть от 0 до 1.')
+        priors = refresh_priors(options['chunk_size'], options['quantile'])
+        names = dict(Category.objects.values_list('id', 'name'))
+        for category_id, (mean, weight) in priors.items():
+            self.stdout.write(
+                f'{names.get(category_id, "Все категории")}: '
+                f'C={mean:.2f}, m={weight:.1f}'
+            )
+        self.stdout.write(
+            self.style.SUCCESS('Взвешенный рейтинг пересчитан.')
+        )
@@ -0,0 +1,82 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import SCORES, Comment, Review, Title, TitleScoreHistogram
+
+
+def subquery_count(queryset, field, aggregate):
+    """Коррелированный подзапрос с агрегатом по связанной модели."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(value=aggregate).values('value')
+        ),
+        0
+    )
+
+
+def drifted_histograms():
+    """id произведений, гистограмма оценок которых не совпадает с
+    отзывами, в том числе отсутствующая или лишняя.
+    """
+    actual = {}
+    for title_id, score, count in Review.objects.order_by().values_list(
+        'title_id', 'score'
+    ).annotate(count=Count('id')).iterator():
+        actual.setdefault(title_id, {})[score] = count
+    stored = {}
+    for title_id, *counts in TitleScoreHistogram.objects.values_list(
+        'title_id', *map(TitleScoreHistogram.field_name, SCORES)
+    ).iterator():
+        stored[title_id] = {
+            score: count for score, count in zip(SCORES, counts) if count
+        }
+    return sorted(
+        title_id for title_id in actual.keys() | stored.keys()
+        if actual.get(title_id, {}) != stored.get(title_id, {})
+    )
+
+
+class Command(BaseCommand):
+    """Команда для сверки хранимых счётчиков с фактическими данными."""
+
+    help = (
+        'Сверка и исправление review_count, score_sum, rating и '
+        'распределения оценок произведений и comment_count отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать количество расхождений.'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.annotate(
+            actual_count=subquery_count(Review.objects, 'title', Count('id')),
+            actual_sum=subquery_count(Review.objects, 'title', Sum('score')),
+        ).exclude(
+            review_count=F('actual_count'), score_sum=F('actual_sum')
+        )
+        reviews = Review.objects.annotate(
+            actual_count=subquery_count(Comment.objects, 'review', Count('id'))
+        ).exclude(comment_count=F('actual_count'))
+        title_ids = list(titles.values_list('pk', flat=True))
+        review_ids = list(reviews.values_list('pk', flat=True))
+        histogram_ids = drifted_histograms()
+        self.stdout.write(
+            f'Расхождения: произведений {len(title_ids)}, '
+            f'отзывов {len(review_ids)}, '
+            f'распределений оценок {len(histogram_ids)}.'
+        )
+        if options['dry_run']:
+            return
+        with transaction.atomic():
+            Title.objects.filter(pk__in=title_ids).refresh_rating()
+            Review.objects.filter(pk__in=review_ids).refresh_comment_count()
+            TitleScoreHistogram.rebuild(histogram_ids)
+        self.stdout.write(self.style.SUCCESS('Счётчики исправлены.'))
@@ -0,0 +1,30 @@
+from django.core.management import BaseCommand
+
+from api_yamdb.constants import LEADERBOARD_SIZE
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    """Команда для пересчёта рейтинговых списков произведений."""
+
+    help = (
+        'Инкрементальный пересчёт популярности и взвешенного рейтинга '
+        'произведений и построение рейтинговых списков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=LEADERBOARD_SIZE,
+            help='Количество позиций в каждом списке.'
+        )
+
+    def handle(self, *args, **options):
+        updated = refresh_leaderboards(size=options['size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинги пересчитаны, произведений с новыми отзывами: '
+                f'{updated}.'
+            )
+        )
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews.sqlite import BACKUP_PAGES, copy_database
+
+
+class Command(BaseCommand):
+    """Команда для обновления реплик основной БД."""
+
+    help = (
+        'Копирование основной БД SQLite в файлы реплик из настройки '
+        'DATABASE_REPLICAS через online backup API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=BACKUP_PAGES,
+            help='Количество страниц, копируемых за один шаг.'
+        )
+
+    def handle(self, *args, **options):
+        if options['pages'] < 1:
+            raise CommandError('Параметр --pages должен быть больше нуля.')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте переменную окружения '
+                'DB_REPLICAS.'
+            )
+        source = connections[DEFAULT_DB_ALIAS]
+        for alias in settings.DATABASE_REPLICAS:
+            target = connections[alias]
+            if target.settings_dict['NAME'] == source.settings_dict['NAME']:
+                continue
+            try:
+                copy_database(
+                    source, target.settings_dict['NAME'], options['pages']
+                )
+            except ValueError as error:
+                raise CommandError(error)
+            self.stdout.write(f'Реплика {alias} обновлена.')
+        self.stdout.write(self.style.SUCCESS('Реплики обновлены.'))
@@ -0,0 +1,127 @@
+"""Чтение файлов импорта в разных форматах.
+
+Каждый формат отдаёт данные частями: список словарей со строковыми
+значениями, как у csv.DictReader, поэтому дальнейшая обработка в
+import_data не зависит от исходного формата.
+"""
+import csv
+import gzip
+import json
+import os
+
+import pyarrow.parquet as pq
+
+CSV = 'csv'
+CSV_GZIP = 'csv.gz'
+NDJSON = 'ndjson'
+PARQUET = 'parquet'
+
+# Порядок важен: при поиске в директории выбирается первый найденный файл.
+EXTENSIONS = (
+    ('.parquet', PARQUET),
+    ('.ndjson', NDJSON),
+    ('.jsonl', NDJSON),
+    ('.csv.gz', CSV_GZIP),
+    ('.csv', CSV),
+)
+
+PARQUET_MAGIC = b'PAR1'
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def detect_format(path):
+    """Определение формата файла по расширению, а если оно неизвестно —
+    по содержимому.
+    """
+    lower_path = str(path).lower()
+    for extension, file_format in EXTENSIONS:
+        if lower_path.endswith(extension):
+            return file_format
+    with open(path, mode='rb') as file:
+        head = file.read(len(PARQUET_MAGIC))
+        if head == PARQUET_MAGIC:
+            return PARQUET
+        if head.startswith(GZIP_MAGIC):
+            return CSV_GZIP
+        if (head + file.read(64)).lstrip().startswith(b'{'):
+            return NDJSON
+    return CSV
+
+
+def find_source_file(source, file_name):
+    """Поиск файла с данными в директории по имени без расширения."""
+    for extension, _ in EXTENSIONS:
+        path = os.path.join(source, f'{file_name}{extension}')
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def to_str(value):
+    """Приведение значения к строке, как в csv файле."""
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def chunked(records, chunk_size):
+    """Разбивка потока записей на части."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv(file, chunk_size):
+    """Чтение csv, в том числе сжатого gzip."""
+    yield from chunked(csv.DictReader(file), chunk_size)
+
+
+def read_ndjson(file, chunk_size):
+    """Чтение NDJSON: один json объект на строку."""
+    columns = None
+    records = []
+    for line in file:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        if columns is None:
+            columns = list(data)
+        records.append(
+            {column: to_str(data.get(column)) for column in columns}
+        )
+        if len(records) == chunk_size:
+            yield records
+            records = []
+    if records:
+        yield records
+
+
+def read_parquet(path, chunk_size):
+    """Parquet читается по колонкам пакетами внутри групп строк."""
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        columns = batch.to_pydict()
+        names = list(columns)
+        values = [map(to_str, columns[name]) for name in names]
+        yield [dict(zip(names, row)) for row in zip(*values)]
+
+
+def read_chunks(path, chunk_size, file_format=None):
+    """Чтение файла частями по chunk_size записей."""
+    file_format = file_format or detect_format(path)
+    if file_format == PARQUET:
+        yield from read_parquet(path, chunk_size)
+        return
+    opener = gzip.open if file_format == CSV_GZIP else open
+    with opener(path, mode='rt', encoding='utf-8', newline='') as file:
+        if file_format == NDJSON:
+            yield from read_ndjson(file, chunk_size)
+        else:
+            yield from read_csv(file, chunk_size)
@@ -0,0 +1,288 @@
+"""Предварительная проверка файлов импорта.
+
+Каждый файл загружается в pandas целиком по колонкам, все ограничения
+моделей и ссылки между файлами проверяются векторно, до первой записи в
+БД. Уникальные значения проверяются и внутри файла, и среди записей БД
+с другими id; записи БД читаются порциями по id. Результат — список
+нарушений с количеством и примерами id.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from api_yamdb.constants import (LIMIT_LENGTH, MAX_LENGTH, MAX_LENGTH_EMAIL,
+                                 MAX_LENGTH_NAME, MAX_SCORE_VALUE,
+                                 MIN_SCORE_VALUE, MIN_VALUE_VALIDATOR,
+                                 REGEX_SLUG_BASE_MODEL, REGEX_USERNAME)
+from reviews.management.readers import (CSV_GZIP, NDJSON, PARQUET,
+                                        detect_format)
+from reviews.models import Category, Genre, Review, Title
+from users.models import Role, User
+
+MAX_EXAMPLES = 5
+# Количество записей БД в одной порции при проверке уникальности.
+ID_CHUNK_SIZE = 10000
+# Модели файлов жанров и категорий.
+BASE_MODELS = {'genre': Genre, 'category': Category}
+
+Problem = namedtuple('Problem', ('file_name', 'rule', 'count', 'examples'))
+
+
+def read_frame(path):
+    """Загрузка файла в DataFrame."""
+    file_format = detect_format(path)
+    if file_format == PARQUET:
+        return pd.read_parquet(path)
+    if file_format == NDJSON:
+        return pd.read_json(path, lines=True, dtype=False)
+    return pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        compression='gzip' if file_format == CSV_GZIP else None,
+    )
+
+
+def as_text(column):
+    return column.fillna('').astype(str)
+
+
+def as_number(column):
+    return pd.to_numeric(column, errors='coerce')
+
+
+def db_chunks(model, fields, chunk_size=ID_CHUNK_SIZE):
+    """Записи модели из БД (id и поля fields) порциями по id."""
+    last_id = 0
+    while True:
+        rows = list(model.objects.filter(pk__gt=last_id).order_by(
+            'pk'
+        ).values_list('pk', *fields)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+class Validator:
+    """Проверка набора файлов импорта."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.problems = []
+        self.known_ids = {}
+
+    def add(self, file_name, rule, mask):
+        """Регистрация нарушения для строк, отмеченных маской."""
+        mask = np.asarray(mask, dtype=bool)
+        count = int(mask.sum())
+        if not count:
+            return
+        frame = self.frames[file_name]
+        if 'id' in frame:
+            examples = frame['id'][mask].head(MAX_EXAMPLES).tolist()
+        else:
+            examples = np.flatnonzero(mask)[:MAX_EXAMPLES].tolist()
+        self.problems.append(Problem(file_name, rule, count, examples))
+
+    def ids(self, file_name, model):
+        """id из файла вместе с id, уже существующими в БД."""
+        if file_name in self.known_ids:
+            return self.known_ids[file_name]
+        file_ids = (
+            as_number(self.frames[file_name]['id']).dropna().to_numpy()
+            if file_name in self.frames else np.array([])
+        )
+        db_ids = np.fromiter(
+            model.objects.values_list('id', flat=True).iterator(),
+            dtype=np.int64
+        )
+        self.known_ids[file_name] = np.union1d(file_ids, db_ids)
+        return self.known_ids[file_name]
+
+    def check_required(self, file_name, columns):
+        frame = self.frames[file_name]
+        missing = [column for column in columns if column not in frame]
+        if missing:
+            self.problems.append(Problem(
+                file_name, f'нет колонок: {", ".join(missing)}',
+                len(frame), []
+            ))
+        return not missing
+
+    def check_unique(self, file_name, *columns):
+        frame = self.frames[file_name]
+        self.add(
+            file_name,
+            f'повторяющиеся значения {", ".join(columns)}',
+            frame.duplicated(list(columns), keep='first')
+        )
+
+    def check_unique_in_db(self, file_name, model, fields):
+        """Проверка, что значений колонок нет у записей БД с другими id.
+        fields сопоставляет колонки файла с полями модели.
+        """
+        frame = self.frames[file_name]
+        columns = list(fields)
+        keys = pd.DataFrame({
+            column: as_text(frame[column]).to_numpy()
+            for column in ['id', *columns]
+        })
+        keys['row'] = np.arange(len(keys))
+        mask = np.zeros(len(frame), dtype=bool)
+        for rows in db_chunks(model, list(fields.values())):
+            existing = pd.DataFrame(
+                rows, columns=['db_id', *columns]
+            ).astype(str)
+            matches = keys.merge(existing, on=columns)
+            mask[matches['row'][
+                matches['id'] != matches['db_id']
+            ].to_numpy()] = True
+        self.add(
+            file_name, f'значения {", ".join(columns)} уже есть в БД', mask
+        )
+
+    def check_length(self, file_name, column, max_length, blank=False):
+        text = as_text(self.frames[file_name][column])
+        lengths = text.str.len()
+        self.add(
+            file_name, f'{column}: длина больше {max_length}',
+            lengths > max_length
+        )
+        if not blank:
+            self.add(file_name, f'{column}: пустое значение', lengths == 0)
+
+    def check_regex(self, file_name, column, regex):
+        text = as_text(self.frames[file_name][column])
+        self.add(
+            file_name, f'{column}: не соответствует {regex}',
+            ~text.str.match(regex)
+        )
+
+    def check_range(self, file_name, column, min_value, max_value):
+        values = as_number(self.frames[file_name][column])
+        self.add(
+            file_name,
+            f'{column}: вне диапазона {min_value}..{max_value}',
+            values.isna() | (values < min_value) | (values > max_value)
+        )
+
+    def check_choices(self, file_name, column, choices):
+        self.add(
+            file_name, f'{column}: допустимы {", ".join(choices)}',
+            ~as_text(self.frames[file_name][column]).isin(choices)
+        )
+
+    def check_datetime(self, file_name, column):
+        values = pd.to_datetime(
+            self.frames[file_name][column], errors='coerce', utc=True,
+            format='ISO8601'
+        )
+        self.add(file_name, f'{column}: некорректная дата', values.isna())
+
+    def check_references(self, file_name, column, ids, target, null=False):
+        """Проверка ссылок на записи target. При null пустое значение
+        допустимо.
+        """
+        column_values = self.frames[file_name][column]
+        values = as_number(column_values)
+        mask = values.isna() | ~np.isin(values.to_numpy(), ids)
+        if null:
+            mask &= as_text(column_values).str.strip() != ''
+        self.add(file_name, f'{column}: нет записи в {target}', mask)
+
+    def validate_base_model(self, file_name):
+        self.check_unique(file_name, 'id')
+        self.check_unique(file_name, 'slug')
+        self.check_unique_in_db(
+            file_name, BASE_MODELS[file_name], {'slug': 'slug'}
+        )
+        self.check_length(file_name, 'name', MAX_LENGTH)
+        self.check_length(file_name, 'slug', LIMIT_LENGTH)
+        self.check_regex(file_name, 'slug', REGEX_SLUG_BASE_MODEL)
+
+    def validate_users(self, file_name):
+        self.check_unique(file_name, 'id')
+        self.check_unique(file_name, 'username')
+        self.check_unique(file_name, 'email')
+        self.check_unique_in_db(file_name, User, {'username': 'username'})
+        self.check_unique_in_db(file_name, User, {'email': 'email'})
+        self.check_length(file_name, 'username', MAX_LENGTH_NAME)
+        self.check_length(file_name, 'email', MAX_LENGTH_EMAIL)
+        self.check_regex(file_name, 'username', REGEX_USERNAME)
+        if 'role' in self.frames[file_name]:
+            self.check_choices(file_name, 'role', Role.values)
+
+    def validate_titles(self, file_name):
+        self.check_unique(file_name, 'id')
+        self.check_length(file_name, 'name', MAX_LENGTH)
+        self.check_range(
+            file_name, 'year', MIN_VALUE_VALIDATOR, timezone.now().year
+        )
+        self.check_references(
+            file_name, 'category', self.ids('category', Category),
+            'category', null=Title._meta.get_field('category').null
+        )
+
+    def validate_review(self, file_name):
+        self.check_unique(file_name, 'id')
+        self.check_unique(file_name, 'author', 'title_id')
+        self.check_unique_in_db(
+            file_name, Review, {'author': 'author_id', 'title_id': 'title_id'}
+        )
+        self.check_range(file_name, 'score', MIN_SCORE_VALUE, MAX_SCORE_VALUE)
+        self.check_datetime(file_name, 'pub_date')
+        self.check_references(
+            file_name, 'title_id', self.ids('titles', Title), 'titles'
+        )
+        self.check_references(
+            file_name, 'author', self.ids('users', User), 'users'
+        )
+
+    def validate_comments(self, file_name):
+        self.check_unique(file_name, 'id')
+        self.check_datetime(file_name, 'pub_date')
+        self.check_references(
+            file_name, 'review_id', self.ids('review', Review), 'review'
+        )
+        self.check_references(
+            file_name, 'author', self.ids('users', User), 'users'
+        )
+
+    def validate_genre_title(self, file_name):
+        self.check_unique(file_name, 'title_id', 'genre_id')
+        self.check_references(
+            file_name, 'title_id', self.ids('titles', Title), 'titles'
+        )
+        self.check_references(
+            file_name, 'genre_id', self.ids('genre', Genre), 'genre'
+        )
+
+    def validate(self):
+        """Проверка всех загруженных файлов."""
+        for file_name, (columns, method) in RULES.items():
+            if file_name not in self.frames:
+                continue
+            if self.check_required(file_name, columns):
+                getattr(self, method)(file_name)
+        return self.problems
+
+
+# Файл: (обязательные колонки, метод проверки).
+RULES = {
+    'genre': (('id', 'name', 'slug'), 'validate_base_model'),
+    'category': (('id', 'name', 'slug'), 'validate_base_model'),
+    'users': (('id', 'username', 'email'), 'validate_users'),
+    'titles': (('id', 'name', 'year', 'category'), 'validate_titles'),
+    'review': (
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        'validate_review'
+    ),
+    'comments': (
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        'validate_comments'
+    ),
+    'genre_title': (('title_id', 'genre_id'), 'validate_genre_title'),
+}
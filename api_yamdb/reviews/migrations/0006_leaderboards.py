@@ -0,0 +1,56 @@
+# Generated by Django 3.2 on 2026-10-19 07:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_review_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_review_id', models.BigIntegerField(default=0, verbose_name='Последний учтённый отзыв')),
+                ('refreshed_at', models.DateTimeField(null=True, verbose_name='Время пересчёта')),
+            ],
+            options={
+                'verbose_name': 'Состояние рейтингов',
+                'verbose_name_plural': 'Состояние рейтингов',
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='popularity',
+            field=models.FloatField(default=0, editable=False, help_text='Количество отзывов с экспоненциальным затуханием.', verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, editable=False, help_text='Байесовская оценка с учётом количества отзывов.', null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('trending', 'Trending'), ('top_rated', 'Top Rated')], max_length=50, verbose_name='Список')),
+                ('scope', models.CharField(max_length=60, verbose_name='Область')),
+                ('position', models.PositiveIntegerField(verbose_name='Позиция')),
+                ('score', models.FloatField(verbose_name='Значение')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Позиции в рейтингах',
+                'ordering': ['board', 'scope', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'scope', 'position'), name='unique_board_scope_position'),
+        ),
+    ]
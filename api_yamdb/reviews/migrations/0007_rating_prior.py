@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-19 07:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+from api_yamdb.constants import RATING_PRIOR_MEAN, RATING_PRIOR_WEIGHT
+
+
+def fill_weighted_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(
+        weighted_rating=Case(
+            When(review_count=0, then=Value(None)),
+            default=(
+                Cast(F('score_sum'), FloatField())
+                + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT
+            ) / (F('review_count') + RATING_PRIOR_WEIGHT),
+            output_field=FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='Априорное среднее (C)')),
+                ('weight', models.FloatField(verbose_name='Априорный вес (m)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Время пересчёта')),
+                ('category', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rating_prior', to='reviews.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Априорные значения рейтинга',
+                'verbose_name_plural': 'Априорные значения рейтинга',
+            },
+        ),
+        migrations.RunPython(fill_weighted_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-19 07:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_rating_prior'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('mean', models.FloatField(verbose_name='Средняя оценка')),
+                ('median', models.FloatField(verbose_name='Медиана оценок')),
+                ('std', models.FloatField(verbose_name='Стандартное отклонение оценок')),
+                ('percentile_rank', models.FloatField(help_text='Доля произведений категории со средней оценкой ниже, %.', verbose_name='Процентильный ранг в категории')),
+                ('monthly_velocity', models.FloatField(help_text='Среднее количество отзывов в месяц с первого отзыва.', verbose_name='Отзывов в месяц')),
+                ('first_review_at', models.DateTimeField(verbose_name='Первый отзыв')),
+                ('last_review_at', models.DateTimeField(verbose_name='Последний отзыв')),
+                ('computed_at', models.DateTimeField(verbose_name='Время расчёта')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_data_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['model', 'seq'], name='change_model_seq_idx'),
+        ),
+    ]
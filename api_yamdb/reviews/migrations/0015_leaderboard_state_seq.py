@@ -0,0 +1,22 @@
+# Generated by Django 3.2 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_change_model_seq_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='leaderboardstate',
+            name='last_review_id',
+        ),
+        migrations.AddField(
+            model_name='leaderboardstate',
+            name='last_seq',
+            field=models.BigIntegerField(default=0, verbose_name='Последняя учтённая запись журнала изменений'),
+        ),
+    ]
@@ -1,17 +1,24 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
-from django.db import models
-from django.db.models import Avg
+from django.db import models, router, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef,
+                              Prefetch, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
 from django.utils import timezone
 
 from api_yamdb.constants import (LIMIT_LENGTH, MAX_LENGTH, MAX_SCORE_VALUE,
-                                 MIN_SCORE_VALUE, REGEX_SLUG_BASE_MODEL,
+                                 MIN_SCORE_VALUE, RATING_PRIOR_MEAN,
+                                 RATING_PRIOR_WEIGHT, REGEX_SLUG_BASE_MODEL,
                                  MIN_VALUE_VALIDATOR)
+from api_yamdb.db_routers import load_related
 
 User = get_user_model()
 
+SCORES = range(MIN_SCORE_VALUE, MAX_SCORE_VALUE + 1)
+
 
 def max_current_year(value):
     """Динамическая валидация, в зависимости от текущего года."""
@@ -20,7 +27,47 @@ def max_current_year(value):
         raise ValidationError(f'Год не может быть больше {current_year}.')
 
 
-class BaseModel(models.Model):
+class AtomicSaveMixin:
+    """Сохранение модели вместе с обработчиками post_save выполняется
+    в одной транзакции, как и каскадное удаление.
+
+    Поля с editable=False — счётчики, которые обработчики сигналов
+    изменяют выражениями F(). При изменении существующего объекта они не
+    записываются, иначе значения, загруженные вместе с объектом, затёрли
+    бы изменения счётчиков после загрузки.
+    """
+
+    def save(self, *args, **kwargs):
+        if (
+            not args and not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = self.stored_field_names()
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    def stored_field_names(self):
+        """Поля, которые записываются при изменении объекта, или None,
+        если у модели нет счётчиков.
+        """
+        fields = [
+            field for field in self._meta.concrete_fields
+            if not field.primary_key
+        ]
+        if all(field.editable for field in fields):
+            return None
+        deferred = self.get_deferred_fields()
+        return [
+            field.name for field in fields
+            if field.editable and field.attname not in deferred
+        ]
+
+
+class BaseModel(AtomicSaveMixin, models.Model):
     """Базовая модель."""
 
     name = models.CharField(max_length=MAX_LENGTH, verbose_name='Название')
@@ -58,7 +105,144 @@ class Category(BaseModel):
         verbose_name_plural = 'Категории'
 
 
-class Title(models.Model):
+def weighted_rating_expression(score_sum, review_count, empty_count):
+    """Байесовский рейтинг (s + m * C) / (n + m) в виде выражения ORM.
+
+    Априорные среднее C и вес m берутся из RatingPrior категории
+    произведения, а при их отсутствии — из глобального RatingPrior.
+    Если количество отзывов в столбце равно empty_count, рейтинг
+    становится NULL.
+    """
+    prior_mean, prior_weight = RatingPrior.global_prior()
+    priors = RatingPrior.objects.filter(category=OuterRef('category'))
+    mean = Coalesce(
+        Subquery(priors.values('mean')[:1]), Value(prior_mean),
+        output_field=FloatField()
+    )
+    weight = Coalesce(
+        Subquery(priors.values('weight')[:1]), Value(prior_weight),
+        output_field=FloatField()
+    )
+    return Case(
+        When(review_count=empty_count, then=Value(None)),
+        default=(Cast(score_sum, FloatField()) + mean * weight) / (
+            review_count + weight
+        ),
+        output_field=FloatField(),
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+    """Набор произведений."""
+
+    def prefetch_latest_reviews(self, size, comments_size=0):
+        """Загрузка последних size отзывов каждого произведения в атрибут
+        latest_reviews, а при comments_size — последних комментариев
+        каждого отзыва в атрибут latest_comments.
+
+        Отбор первых записей в группе выполняется коррелированным
+        подзапросом с LIMIT, поэтому отзывы и комментарии загружаются
+        фиксированным числом запросов независимо от числа произведений.
+        """
+        reviews = Review.objects.filter(pk__in=Subquery(
+            Review.objects.filter(
+                title=OuterRef('title')
+            ).order_by('-pub_date', '-pk').values('pk')[:size]
+        )).order_by('-pub_date', '-pk')
+        reviews = load_related(reviews, 'author')
+        if comments_size:
+            reviews = reviews.prefetch_latest_comments(comments_size)
+        return self.prefetch_related(
+            Prefetch('reviews', queryset=reviews, to_attr='latest_reviews')
+        )
+
+    def refresh_rating(self):
+        """Пересчёт хранимых рейтинга, суммы оценок и количества отзывов
+        одним запросом UPDATE с подзапросами по отзывам, затем взвешенного
+        рейтинга.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        updated = self.update(
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg')
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(count=Count('id')).values('count')),
+                0
+            ),
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+        )
+        self.refresh_weighted_rating()
+        return updated
+
+    def change_reviews(self, count_delta, score_delta):
+        """Атомарное изменение счётчиков отзывов через F() выражения.
+
+        Рейтинг и взвешенный рейтинг вычисляются в том же UPDATE из старых
+        значений столбцов, поэтому параллельные изменения не теряются.
+        """
+        review_count = F('review_count') + count_delta
+        score_sum = F('score_sum') + score_delta
+        return self.update(
+            review_count=review_count,
+            score_sum=score_sum,
+            rating=Case(
+                When(review_count=-count_delta, then=Value(None)),
+                default=Cast(score_sum, FloatField()) / review_count,
+                output_field=FloatField(),
+            ),
+            weighted_rating=weighted_rating_expression(
+                score_sum, review_count, -count_delta
+            ),
+        )
+
+    def refresh_weighted_rating(self):
+        """Пересчёт взвешенного рейтинга из хранимых суммы и количества
+        оценок, например после изменения априорных значений.
+        """
+        return self.update(
+            weighted_rating=weighted_rating_expression(
+                F('score_sum'), F('review_count'), 0
+            )
+        )
+
+
+class ReviewQuerySet(models.QuerySet):
+    """Набор отзывов."""
+
+    def refresh_comment_count(self):
+        """Пересчёт хранимого количества комментариев."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return self.update(
+            comment_count=Coalesce(
+                Subquery(comments.annotate(count=Count('id')).values('count')),
+                0
+            )
+        )
+
+    def prefetch_latest_comments(self, size):
+        """Загрузка последних size комментариев каждого отзыва в атрибут
+        latest_comments.
+        """
+        return self.prefetch_related(Prefetch(
+            'comments',
+            queryset=load_related(Comment.objects.filter(pk__in=Subquery(
+                Comment.objects.filter(
+                    review=OuterRef('review')
+                ).order_by('-pub_date', '-pk').values('pk')[:size]
+            )).order_by('-pub_date', '-pk'), 'author'),
+            to_attr='latest_comments'
+        ))
+
+
+class Title(AtomicSaveMixin, models.Model):
     """Модель произведения."""
 
     name = models.CharField(max_length=MAX_LENGTH, verbose_name='Название')
@@ -82,20 +266,72 @@ class Title(models.Model):
         null=True,
         related_name='titles'
     )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text='Средняя оценка, обновляется при изменении отзывов.'
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Байесовская оценка с учётом количества отзывов.'
+    )
+    popularity = models.FloatField(
+        'Популярность',
+        default=0,
+        editable=False,
+        help_text='Количество отзывов с экспоненциальным затуханием.'
+    )
 
-    @property
-    def rating(self):
-        return self.reviews.aggregate(Avg('score'))['score__avg']
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.loaded_category_id = self.category_id
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает категорию из БД, чтобы при её изменении
+        пересчитать взвешенный рейтинг с априорными значениями новой
+        категории.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_category_id = instance.__dict__.get(
+            'category_id', models.DEFERRED
+        )
+        return instance
+
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['category', '-rating'],
+                name='title_category_rating_idx'
+            ),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
 
-class Review(models.Model):
+class Review(AtomicSaveMixin, models.Model):
     """Модель отзыва."""
 
     title = models.ForeignKey(
@@ -105,9 +341,13 @@ class Review(models.Model):
         verbose_name='Произведение'
     )
     text = models.TextField('Текст отзыва', max_length=MAX_LENGTH)
+    # Пользователи могут храниться в другой БД, поэтому связи с ними — id
+    # без внешнего ключа БД. Данные удалённых пользователей удаляются
+    # приложением (см. reviews.user_links).
     author = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         related_name='reviews',
         verbose_name='Автор'
     )
@@ -120,6 +360,13 @@ class Review(models.Model):
         help_text=f"Оценка от {MIN_SCORE_VALUE} до {MAX_SCORE_VALUE}."
     )
     pub_date = models.DateTimeField('Дата публикации', default=timezone.now)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         constraints = [
@@ -135,8 +382,136 @@ class Review(models.Model):
     def __str__(self):
         return f'{self.author_id} — {self.title} ({self.score})'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.loaded_score = self.score
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает оценку из БД, чтобы при изменении отзыва
+        скорректировать гистограмму оценок произведения.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_score = instance.__dict__.get('score')
+        return instance
+
 
-class Comment(models.Model):
+class TitleScoreHistogram(models.Model):
+    """Распределение оценок произведения: счётчик на каждую оценку."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_histogram',
+        verbose_name='Произведение'
+    )
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'Распределение оценок {self.title_id}'
+
+    @staticmethod
+    def field_name(score):
+        return f'score_{score}'
+
+    def as_dict(self):
+        """Счётчики в виде словаря {оценка: количество отзывов}."""
+        return {
+            str(score): getattr(self, self.field_name(score))
+            for score in SCORES
+        }
+
+    @classmethod
+    def change(cls, title_id, score, delta):
+        """Атомарное изменение счётчика оценки на delta."""
+        if delta > 0:
+            cls.objects.get_or_create(title_id=title_id)
+        field_name = cls.field_name(score)
+        cls.objects.filter(title_id=title_id).update(
+            **{field_name: models.F(field_name) + delta}
+        )
+
+    @classmethod
+    def rebuild(cls, title_ids=None, batch_size=1000):
+        """Пересчёт гистограмм произведений title_ids, по умолчанию всех,
+        одним проходом по отзывам, сгруппированным по произведению и
+        оценке.
+        """
+        reviews, histograms = Review.objects.all(), cls.objects.all()
+        if title_ids is not None:
+            reviews = reviews.filter(title_id__in=title_ids)
+            histograms = histograms.filter(title_id__in=title_ids)
+        rows = reviews.order_by('title_id').values(
+            'title_id', 'score'
+        ).annotate(count=Count('id')).iterator()
+        total = 0
+        with transaction.atomic():
+            histograms.delete()
+            histograms = {}
+            for row in rows:
+                if (
+                    row['title_id'] not in histograms
+                    and len(histograms) >= batch_size
+                ):
+                    cls.objects.bulk_create(histograms.values())
+                    total += len(histograms)
+                    histograms = {}
+                histogram = histograms.setdefault(
+                    row['title_id'], cls(title_id=row['title_id'])
+                )
+                setattr(histogram, cls.field_name(row['score']), row['count'])
+            cls.objects.bulk_create(histograms.values())
+        return total + len(histograms)
+
+
+for score in SCORES:
+    TitleScoreHistogram.add_to_class(
+        TitleScoreHistogram.field_name(score),
+        models.PositiveIntegerField(f'Оценка {score}', default=0)
+    )
+
+
+class TitleStats(models.Model):
+    """Статистика оценок произведения, рассчитываемая офлайн командой
+    compute_title_stats.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение'
+    )
+    review_count = models.PositiveIntegerField('Количество отзывов')
+    mean = models.FloatField('Средняя оценка')
+    median = models.FloatField('Медиана оценок')
+    std = models.FloatField('Стандартное отклонение оценок')
+    percentile_rank = models.FloatField(
+        'Процентильный ранг в категории',
+        help_text='Доля произведений категории со средней оценкой ниже, %.'
+    )
+    monthly_velocity = models.FloatField(
+        'Отзывов в месяц',
+        help_text='Среднее количество отзывов в месяц с первого отзыва.'
+    )
+    first_review_at = models.DateTimeField('Первый отзыв')
+    last_review_at = models.DateTimeField('Последний отзыв')
+    computed_at = models.DateTimeField('Время расчёта')
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    def __str__(self):
+        return f'Статистика произведения {self.title_id}'
+
+
+class Comment(AtomicSaveMixin, models.Model):
     """Модель комментария."""
 
     review = models.ForeignKey(
@@ -148,7 +523,8 @@ class Comment(models.Model):
     text = models.TextField('Текст комментария', max_length=MAX_LENGTH)
     author = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         related_name='comments',
         verbose_name='Автор'
     )
@@ -161,3 +537,232 @@ class Comment(models.Model):
 
     def __str__(self):
         return f'{self.author} комментирует {self.review}'
+
+
+class RatingPrior(models.Model):
+    """Априорные значения взвешенного рейтинга: среднее C и вес m.
+
+    Запись без категории — глобальные значения для произведений, у
+    категории которых своих значений нет.
+    """
+
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='rating_prior',
+        verbose_name='Категория'
+    )
+    mean = models.FloatField('Априорное среднее (C)')
+    weight = models.FloatField('Априорный вес (m)')
+    updated_at = models.DateTimeField('Время пересчёта', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Априорные значения рейтинга'
+        verbose_name_plural = 'Априорные значения рейтинга'
+
+    def __str__(self):
+        scope = self.category or 'Все категории'
+        return f'{scope}: C={self.mean:.2f}, m={self.weight:.0f}'
+
+    @classmethod
+    def global_prior(cls):
+        """Глобальные (C, m) или значения по умолчанию."""
+        prior = cls.objects.filter(category=None).values_list(
+            'mean', 'weight'
+        ).first()
+        return prior or (RATING_PRIOR_MEAN, RATING_PRIOR_WEIGHT)
+
+
+class Leaderboard(models.TextChoices):
+    """Виды рейтинговых списков произведений."""
+
+    TRENDING = 'trending'
+    TOP_RATED = 'top_rated'
+
+
+class LeaderboardEntry(models.Model):
+    """Позиция произведения в предрассчитанном рейтинговом списке.
+
+    Списки строятся для всего каталога (scope="all"), для каждой
+    категории ("category:<slug>") и каждого жанра ("genre:<slug>").
+    """
+
+    board = models.CharField(
+        'Список', max_length=LIMIT_LENGTH, choices=Leaderboard.choices
+    )
+    scope = models.CharField('Область', max_length=LIMIT_LENGTH + 10)
+    position = models.PositiveIntegerField('Позиция')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField('Значение')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'scope', 'position'],
+                name='unique_board_scope_position'
+            )
+        ]
+        ordering = ['board', 'scope', 'position']
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Позиции в рейтингах'
+
+    def __str__(self):
+        return f'{self.board} {self.scope} #{self.position}: {self.title_id}'
+
+
+class LeaderboardState(models.Model):
+    """Состояние инкрементального пересчёта рейтинговых списков."""
+
+    last_seq = models.BigIntegerField(
+        'Последняя учтённая запись журнала изменений', default=0
+    )
+    refreshed_at = models.DateTimeField('Время пересчёта', null=True)
+
+    class Meta:
+        verbose_name = 'Состояние рейтингов'
+        verbose_name_plural = 'Состояние рейтингов'
+
+    def __str__(self):
+        return f'Рейтинги на {self.refreshed_at}'
+
+
+class DataVersion(models.Model):
+    """Версия данных, общая для всех процессов. Процессы сравнивают её с
+    версией своих данных в памяти и кэше и перестраивают устаревшие.
+    """
+
+    key = models.CharField('Ключ', max_length=LIMIT_LENGTH, primary_key=True)
+    version = models.PositiveBigIntegerField('Версия', default=0)
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+
+class Similarity(models.TextChoices):
+    """Способы расчёта сходства произведений."""
+
+    COSINE = 'cosine', 'Косинусное'
+    ADJUSTED_COSINE = 'adjusted_cosine', 'Скорректированное косинусное'
+
+
+class SimilarTitle(models.Model):
+    """Похожее произведение: сосед по оценкам одних и тех же
+    пользователей, рассчитанный офлайн командой build_similar_titles.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='neighbours',
+        verbose_name='Произведение'
+    )
+    position = models.PositiveSmallIntegerField('Позиция')
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожее произведение'
+    )
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'position'],
+                name='unique_title_neighbour_position'
+            )
+        ]
+        ordering = ['title', 'position']
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+
+    def __str__(self):
+        return f'{self.title_id} #{self.position}: {self.similar_id}'
+
+
+class Recommendation(models.Model):
+    """Произведение, рекомендованное пользователю, с предсказанной
+    оценкой. Списки строятся офлайн командой build_recommendations.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='recommendations',
+        verbose_name='Пользователь'
+    )
+    position = models.PositiveSmallIntegerField('Позиция')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField('Предсказанная оценка')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'position'],
+                name='unique_user_recommendation_position'
+            )
+        ]
+        ordering = ['user_id', 'position']
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+
+    def __str__(self):
+        return f'{self.user_id} #{self.position}: {self.title_id}'
+
+
+class ChangeAction(models.TextChoices):
+    """Вид изменения объекта в журнале изменений."""
+
+    CREATED = 'created', 'Создание'
+    UPDATED = 'updated', 'Изменение'
+    DELETED = 'deleted', 'Удаление'
+
+
+class ChangeLogEntry(models.Model):
+    """Запись журнала изменений каталога, отзывов и комментариев.
+
+    Записи добавляются в той же транзакции, что и изменение объекта, и
+    нумеруются возрастающим seq. data — состояние объекта после
+    изменения, для удалённого объекта — NULL.
+    """
+
+    seq = models.BigAutoField('Номер', primary_key=True)
+    model = models.CharField('Модель', max_length=LIMIT_LENGTH)
+    object_id = models.PositiveBigIntegerField('id объекта')
+    action = models.CharField(
+        'Действие', max_length=LIMIT_LENGTH, choices=ChangeAction.choices
+    )
+    data = models.JSONField('Данные', null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField('Время изменения', default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['model', 'object_id', 'seq'],
+                name='change_object_seq_idx'
+            ),
+            models.Index(fields=['model', 'seq'], name='change_model_seq_idx'),
+        ]
+        ordering = ['seq']
+        verbose_name = 'Запись журнала изменений'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.seq}: {self.action} {self.model} {self.object_id}'
@@ -0,0 +1,106 @@
+"""Пересчёт априорных значений взвешенного рейтинга.
+
+Взвешенный рейтинг произведения (s + m * C) / (n + m) считается из
+хранимых суммы s и количества n оценок. Априорное среднее C — средняя
+оценка по отзывам категории, априорный вес m — квантиль количества
+отзывов у произведений категории. Отзывы читаются из БД порциями и
+агрегируются NumPy, в памяти хранятся только частичные суммы по
+произведениям.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from api_yamdb.constants import RATING_PRIOR_MEAN, RATING_PRIOR_WEIGHT
+from .arrays import CHUNK_SIZE, NO_CATEGORY, category_value, read_columns
+from .models import RatingPrior, Review, Title
+
+PRIOR_QUANTILE = 0.5
+MIN_PRIOR_WEIGHT = 1.0
+
+
+def read_review_chunks(chunk_size=CHUNK_SIZE):
+    """Порции отзывов в виде массивов title_id, category_id и score."""
+    return read_columns(
+        Review.objects.order_by(),
+        ('title_id', 'title__category_id', 'score'),
+        chunk_size,
+        {'title__category_id': category_value},
+    )
+
+
+def reduce_by_title(title_ids, categories, counts, sums):
+    """Сложение количеств и сумм оценок с одинаковым title_id."""
+    titles, index = np.unique(title_ids, return_inverse=True)
+    title_categories = np.empty(len(titles), dtype=np.int64)
+    title_categories[index] = categories
+    return (
+        titles,
+        title_categories,
+        np.bincount(index, weights=counts, minlength=len(titles)),
+        np.bincount(index, weights=sums, minlength=len(titles)),
+    )
+
+
+def title_totals(chunk_size=CHUNK_SIZE):
+    """Категория, количество и сумма оценок каждого произведения с
+    отзывами.
+    """
+    partials = []
+    for title_ids, categories, scores in read_review_chunks(chunk_size):
+        partials.append(reduce_by_title(
+            title_ids, categories,
+            np.ones(len(title_ids)), scores.astype(np.float64)
+        ))
+    if not partials:
+        return None
+    return reduce_by_title(
+        *(np.concatenate(column) for column in zip(*partials))
+    )
+
+
+def compute_prior(counts, sums, quantile):
+    """Априорные (C, m) для набора произведений."""
+    return (
+        float(sums.sum() / counts.sum()),
+        max(float(np.quantile(counts, quantile)), MIN_PRIOR_WEIGHT),
+    )
+
+
+def compute_priors(chunk_size=CHUNK_SIZE, quantile=PRIOR_QUANTILE):
+    """Глобальные априорные значения и значения каждой категории.
+
+    Возвращает словарь {category_id: (C, m)}, где None — глобальные
+    значения.
+    """
+    totals = title_totals(chunk_size)
+    if totals is None:
+        return {None: (RATING_PRIOR_MEAN, RATING_PRIOR_WEIGHT)}
+    _, categories, counts, sums = totals
+    priors = {None: compute_prior(counts, sums, quantile)}
+    for category_id in np.unique(categories):
+        if category_id == NO_CATEGORY:
+            continue
+        mask = categories == category_id
+        priors[int(category_id)] = compute_prior(
+            counts[mask], sums[mask], quantile
+        )
+    return priors
+
+
+def refresh_priors(chunk_size=CHUNK_SIZE, quantile=PRIOR_QUANTILE):
+    """Пересчёт и сохранение априорных значений, затем взвешенного
+    рейтинга всех произведений. Возвращает сохранённые значения.
+    """
+    priors = compute_priors(chunk_size, quantile)
+    with transaction.atomic():
+        RatingPrior.objects.exclude(
+            Q(category__isnull=True) | Q(category__in=priors.keys() - {None})
+        ).delete()
+        for category_id, (mean, weight) in priors.items():
+            RatingPrior.objects.update_or_create(
+                category_id=category_id,
+                defaults={'mean': mean, 'weight': weight},
+            )
+        Title.objects.refresh_weighted_rating()
+    return priors
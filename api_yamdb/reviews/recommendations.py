@@ -0,0 +1,261 @@
+"""Офлайн расчёт персональных рекомендаций.
+
+Предсказанная оценка пользователя u для произведения j — средняя оценка
+пользователя плюс взвешенное сходством среднее отклонений его оценок
+произведений i, соседями которых является j:
+
+    r(u, j) = mean(u) + Σ sim(i, j) * (r(u, i) - mean(u)) / Σ |sim(i, j)|
+
+Соседи берутся из таблицы SimilarTitle. Отзывы читаются из БД в порядке
+авторов и делятся на пакеты целых пользователей, которые считаются
+векторно в пуле процессов. Процессы пула не обращаются к БД: таблица
+соседей передаётся им один раз при запуске, а результаты записывает
+основной процесс.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import Count
+
+from api_yamdb.constants import (MAX_SCORE_VALUE, MIN_SCORE_VALUE,
+                                 RECOMMENDATIONS_SIZE)
+from .arrays import CHUNK_SIZE, read_columns
+from .leaderboards import ALL_SCOPE, category_scope
+from .models import (Leaderboard, LeaderboardEntry, Recommendation, Review,
+                     SimilarTitle, Title, User)
+
+BATCH_USERS = 1000
+WRITE_BATCH_SIZE = 1000
+
+# Таблица соседей в процессе пула: (title_ids, indptr, similar, scores).
+neighbours = None
+
+
+def load_neighbours():
+    """Таблица соседей в формате CSR по отсортированным title_id."""
+    rows = np.array(
+        list(SimilarTitle.objects.order_by(
+            'title_id', 'position'
+        ).values_list('title_id', 'similar_id', 'score').iterator(
+            chunk_size=CHUNK_SIZE
+        )),
+        dtype=np.float64
+    ).reshape(-1, 3)
+    title_ids, counts = np.unique(
+        rows[:, 0].astype(np.int64), return_counts=True
+    )
+    indptr = np.zeros(len(title_ids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return title_ids, indptr, rows[:, 1].astype(np.int64), rows[:, 2]
+
+
+def init_worker(table):
+    """Передача таблицы соседей процессу пула."""
+    global neighbours
+    neighbours = table
+
+
+def predict(users, titles, scores, size):
+    """Лучшие size предсказаний для пакета отзывов целых пользователей.
+
+    Возвращает массивы (user_id, title_id, оценка, позиция).
+    """
+    title_ids, indptr, similar, similarity = neighbours
+    empty = (np.empty(0, np.int64),) * 2 + (np.empty(0),) + (
+        np.empty(0, np.int64),
+    )
+    user_ids, user_index = np.unique(users, return_inverse=True)
+    means = np.bincount(user_index, weights=scores) / np.bincount(user_index)
+    deviations = scores - means[user_index]
+
+    if not len(title_ids):
+        return empty
+    positions = np.minimum(
+        np.searchsorted(title_ids, titles), len(title_ids) - 1
+    )
+    rows = np.flatnonzero(title_ids[positions] == titles)
+    starts = indptr[positions[rows]]
+    lengths = indptr[positions[rows] + 1] - starts
+    if not lengths.sum():
+        return empty
+    pair_rows = np.repeat(rows, lengths)
+    pairs = np.repeat(starts, lengths) + np.arange(lengths.sum()) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    candidates = similar[pairs]
+    weights = similarity[pairs]
+
+    # Пара (пользователь, произведение) в одном целом числе.
+    span = int(max(candidates.max(), titles.max())) + 1
+    keys = user_index[pair_rows] * span + candidates
+    keys, key_index = np.unique(keys, return_inverse=True)
+    numerators = np.bincount(
+        key_index, weights=weights * deviations[pair_rows]
+    )
+    denominators = np.bincount(key_index, weights=np.abs(weights))
+    reviewed = np.isin(keys, user_index * span + titles)
+    keys, numerators, denominators = (
+        keys[~reviewed], numerators[~reviewed], denominators[~reviewed]
+    )
+    key_users = keys // span
+    predictions = np.clip(
+        means[key_users] + numerators / denominators,
+        MIN_SCORE_VALUE, MAX_SCORE_VALUE
+    )
+
+    order = np.lexsort((keys % span, -predictions, key_users))
+    key_users = key_users[order]
+    group_starts = np.flatnonzero(np.r_[True, key_users[1:] != key_users[:-1]])
+    ranks = np.arange(len(order)) - np.repeat(
+        group_starts, np.diff(np.r_[group_starts, len(order)])
+    )
+    top = ranks < size
+    return (
+        user_ids[key_users[top]],
+        (keys % span)[order][top],
+        predictions[order][top],
+        ranks[top] + 1,
+    )
+
+
+def read_user_batches(batch_users=BATCH_USERS, chunk_size=CHUNK_SIZE):
+    """Отзывы, сгруппированные в пакеты по batch_users пользователей."""
+    pending = np.empty((0, 3), dtype=np.int64)
+    for columns in read_columns(
+        Review.objects.order_by('author_id'),
+        ('author_id', 'title_id', 'score'), chunk_size,
+    ):
+        pending = np.concatenate([pending, np.column_stack(columns)])
+        starts = user_starts(pending)
+        # Отзывы последнего пользователя могут продолжиться в следующей
+        # порции, поэтому он остаётся в pending.
+        while len(starts) > batch_users:
+            stop = starts[batch_users]
+            yield pending[:stop]
+            pending, starts = pending[stop:], starts[batch_users:] - stop
+    if len(pending):
+        yield pending
+
+
+def user_starts(rows):
+    """Позиции первых отзывов пользователей в строках, отсортированных
+    по author_id.
+    """
+    return np.flatnonzero(np.r_[True, rows[1:, 0] != rows[:-1, 0]])
+
+
+def predict_batch(batch, size):
+    """Предсказания для пакета строк (author_id, title_id, score)."""
+    return predict(
+        batch[:, 0], batch[:, 1], batch[:, 2].astype(np.float64), size
+    )
+
+
+def compute_recommendations(size=RECOMMENDATIONS_SIZE, jobs=1,
+                            batch_users=BATCH_USERS):
+    """Рекомендации всех пользователей в виде несохранённых объектов."""
+    table = load_neighbours()
+    batches = read_user_batches(batch_users)
+    if jobs == 1:
+        init_worker(table)
+        results = (predict_batch(batch, size) for batch in batches)
+        return list(build_objects(results))
+    # Дочерние процессы не должны наследовать открытые соединения с БД.
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=(table,)
+    ) as executor:
+        # Все процессы пула запускаются до чтения отзывов, чтобы fork не
+        # копировал соединение с БД посреди запроса.
+        wait([executor.submit(int) for _ in range(jobs)])
+        return list(build_objects(
+            run_bounded(executor, batches, size, jobs)
+        ))
+
+
+def run_bounded(executor, batches, size, jobs):
+    """Результаты пакетов в порядке отправки. В работе не больше двух
+    пакетов на процесс, чтобы отзывы не читались в память целиком.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(executor.submit(predict_batch, batch, size))
+        if len(pending) >= 2 * jobs:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def build_objects(results):
+    """Несохранённые объекты Recommendation из результатов пакетов."""
+    for user_ids, title_ids, scores, positions in results:
+        for user_id, title_id, score, position in zip(
+            user_ids.tolist(), title_ids.tolist(), scores.tolist(),
+            positions.tolist()
+        ):
+            yield Recommendation(
+                user_id=user_id,
+                title_id=title_id,
+                score=score,
+                position=position,
+            )
+
+
+def refresh_recommendations(size=RECOMMENDATIONS_SIZE, jobs=1,
+                            batch_users=BATCH_USERS,
+                            batch_size=WRITE_BATCH_SIZE):
+    """Пересчёт рекомендаций всех пользователей. Возвращает количество
+    записей.
+    """
+    recommendations = compute_recommendations(size, jobs, batch_users)
+    with transaction.atomic():
+        title_ids = set(Title.objects.values_list('pk', flat=True))
+        user_ids = set(User.objects.values_list('pk', flat=True))
+        recommendations = [
+            recommendation for recommendation in recommendations
+            if recommendation.title_id in title_ids
+            and recommendation.user_id in user_ids
+        ]
+        Recommendation.objects.all().delete()
+        Recommendation.objects.bulk_create(
+            recommendations, batch_size=batch_size
+        )
+    return len(recommendations)
+
+
+def cold_start(user, size=RECOMMENDATIONS_SIZE):
+    """Рекомендации для пользователя без рассчитанного списка: лучшие по
+    взвешенному рейтингу произведения категории, на произведения которой
+    он писал больше всего отзывов, или всего каталога.
+    """
+    category = Title.objects.filter(
+        reviews__author=user, category__isnull=False
+    ).values('category__slug').annotate(
+        count=Count('pk')
+    ).order_by('-count', 'category__slug').values_list(
+        'category__slug', flat=True
+    ).first()
+    scopes = [ALL_SCOPE]
+    if category:
+        scopes.insert(0, category_scope(category))
+    for scope in scopes:
+        entries = LeaderboardEntry.objects.filter(
+            board=Leaderboard.TOP_RATED, scope=scope
+        ).exclude(
+            title__reviews__author=user
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).order_by('position')[:size]
+        if entries:
+            return [
+                Recommendation(
+                    user=user,
+                    position=position,
+                    title=entry.title,
+                    score=entry.score,
+                )
+                for position, entry in enumerate(entries, 1)
+            ]
+    return []
@@ -0,0 +1,241 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import DEFERRED, F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import changes, events, facets, leaderboards, sqlite, user_links
+from .models import (Category, ChangeAction, Comment, Genre, Review, Title,
+                     TitleScoreHistogram, User)
+
+
+@receiver(post_save, sender=Review)
+def update_title_counters(sender, instance, created, **kwargs):
+    """Атомарное обновление счётчиков и рейтинга произведения при
+    создании или изменении оценки отзыва.
+    """
+    titles = Title.objects.filter(pk=instance.title_id)
+    if created:
+        titles.change_reviews(1, instance.score)
+        return
+    loaded_score = getattr(instance, 'loaded_score', None)
+    if loaded_score is None:
+        titles.refresh_rating()
+    elif loaded_score != instance.score:
+        titles.change_reviews(0, instance.score - loaded_score)
+
+
+@receiver(post_delete, sender=Review)
+def decrease_title_counters(sender, instance, **kwargs):
+    """Уменьшение счётчиков произведения при удалении отзыва, в том числе
+    при удалении данных пользователя.
+    """
+    Title.objects.filter(pk=instance.title_id).change_reviews(
+        -1, -instance.score
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_score_histogram(sender, instance, created, **kwargs):
+    """Изменение счётчиков гистограммы оценок при создании или
+    редактировании отзыва.
+    """
+    loaded_score = getattr(instance, 'loaded_score', None)
+    if not created and loaded_score == instance.score:
+        return
+    if not created and loaded_score is None:
+        # Прежняя оценка неизвестна: гистограмма пересчитывается по
+        # отзывам, как и рейтинг в update_title_counters.
+        TitleScoreHistogram.rebuild([instance.title_id])
+        return
+    if not created:
+        TitleScoreHistogram.change(instance.title_id, loaded_score, -1)
+    TitleScoreHistogram.change(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def decrease_score_histogram(sender, instance, **kwargs):
+    """Уменьшение счётчика гистограммы оценок при удалении отзыва."""
+    TitleScoreHistogram.change(instance.title_id, instance.score, -1)
+
+
+@receiver(post_delete, sender=Review)
+def forget_review_popularity(sender, instance, **kwargs):
+    """Исключение удалённого отзыва из популярности произведения."""
+    leaderboards.forget_review(instance.title_id)
+
+
+@receiver(post_save, sender=Title)
+def refresh_weighted_rating(sender, instance, created, **kwargs):
+    """Пересчёт взвешенного рейтинга при смене категории произведения:
+    априорные значения берутся из категории.
+    """
+    loaded_category_id = getattr(
+        instance, 'loaded_category_id', DEFERRED
+    )
+    if not created and loaded_category_id != instance.category_id:
+        Title.objects.filter(pk=instance.pk).refresh_weighted_rating()
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличение счётчика комментариев отзыва."""
+    if created:
+        Review.objects.filter(pk=instance.review_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Уменьшение счётчика комментариев отзыва при удалении комментария,
+    в том числе каскадном при удалении пользователя.
+    """
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_facets(sender, **kwargs):
+    """Сброс кэша счётчиков каталога после фиксации транзакции."""
+    if kwargs.get('action', '').startswith('pre_'):
+        return
+    transaction.on_commit(facets.invalidate)
+
+
+@receiver(post_save, sender=Review)
+def publish_review_saved(sender, instance, created, **kwargs):
+    """Событие о новом или изменённом отзыве для подписчиков
+    произведения.
+    """
+    events.publish_on_commit(
+        instance.title_id,
+        'review.created' if created else 'review.updated',
+        events.review_data(instance)
+    )
+
+
+@receiver(post_delete, sender=Review)
+def publish_review_deleted(sender, instance, **kwargs):
+    events.publish_on_commit(
+        instance.title_id, 'review.deleted', {'id': instance.pk}
+    )
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_saved(sender, instance, created, **kwargs):
+    """Событие о новом или изменённом комментарии для подписчиков
+    произведения.
+    """
+    events.publish_on_commit(
+        instance.review.title_id,
+        'comment.created' if created else 'comment.updated',
+        events.comment_data(instance)
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_deleted(sender, instance, **kwargs):
+    events.publish_on_commit(
+        instance.review.title_id,
+        'comment.deleted',
+        {'id': instance.pk, 'review_id': instance.review_id}
+    )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def log_saved(sender, instance, created, **kwargs):
+    """Запись создания или изменения объекта в журнал изменений."""
+    changes.log_change(
+        instance, ChangeAction.CREATED if created else ChangeAction.UPDATED
+    )
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def log_deleted(sender, instance, **kwargs):
+    """Запись удаления объекта в журнал изменений."""
+    changes.log_change(instance, ChangeAction.DELETED)
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def remember_titles(sender, instance, **kwargs):
+    """Удаление жанра или категории меняет произведения без сигналов,
+    поэтому их id запоминаются до удаления.
+    """
+    instance.changed_title_ids = list(
+        instance.titles.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def log_titles_changed(sender, instance, **kwargs):
+    changes.log_titles_updated(getattr(instance, 'changed_title_ids', ()))
+
+
+@receiver(post_delete, sender=Category)
+def refresh_uncategorized_ratings(sender, instance, **kwargs):
+    """Произведения удалённой категории переходят к глобальным
+    априорным значениям взвешенного рейтинга.
+    """
+    Title.objects.filter(
+        pk__in=getattr(instance, 'changed_title_ids', ())
+    ).refresh_weighted_rating()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """Запись изменения жанров произведений в журнал изменений."""
+    if action == 'pre_clear' and reverse:
+        instance.changed_title_ids = list(
+            instance.titles.values_list('pk', flat=True)
+        )
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif action == 'post_clear':
+        title_ids = instance.changed_title_ids
+    else:
+        title_ids = pk_set
+    changes.log_titles_updated(title_ids)
+
+
+@receiver(pre_save, sender=Review)
+@receiver(pre_save, sender=Comment)
+def check_author(sender, instance, raw, **kwargs):
+    """Проверка автора нового отзыва или комментария."""
+    if not raw and instance._state.adding:
+        user_links.check_user(instance, 'author')
+
+
+@receiver(post_delete, sender=User)
+def delete_user_data(sender, instance, using, **kwargs):
+    """Удаление данных пользователя после фиксации его удаления."""
+    user_id = instance.pk
+    transaction.on_commit(
+        lambda: user_links.delete_user_data([user_id]), using=using
+    )
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настройка нового соединения SQLite по профилю БД."""
+    sqlite.apply_pragmas(connection)
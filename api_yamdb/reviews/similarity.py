@@ -0,0 +1,157 @@
+"""Офлайн расчёт похожих произведений по оценкам пользователей.
+
+Отзывы образуют разреженную матрицу пользователь × произведение в виде
+массивов NumPy (строка, столбец, значение), отсортированных по
+пользователю, со смещениями строк как в формате CSR. Сходство столбцов
+считается блоками: для произведений блока перебираются все пары отзывов
+одних и тех же пользователей, скалярные произведения складываются в
+плотный блок (произведения блока × все произведения), который
+нормируется и сокращается до K лучших соседей.
+"""
+from collections import namedtuple
+
+import numpy as np
+from django.db import transaction
+
+from api_yamdb.constants import SIMILAR_TITLES_SIZE
+from .arrays import CHUNK_SIZE, read_columns
+from .models import Review, SimilarTitle, Similarity, Title
+
+BATCH_SIZE = 1000
+# Максимальное количество ячеек плотного блока сходств.
+BLOCK_CELLS = 2 ** 24
+
+RatingMatrix = namedtuple(
+    'RatingMatrix', ('title_ids', 'users', 'titles', 'values', 'indptr')
+)
+
+
+def read_review_chunks(chunk_size=CHUNK_SIZE):
+    """Порции отзывов в виде массивов author_id, title_id и score."""
+    return read_columns(
+        Review.objects.order_by(), ('author_id', 'title_id', 'score'),
+        chunk_size,
+    )
+
+
+def build_matrix(similarity=Similarity.ADJUSTED_COSINE,
+                 chunk_size=CHUNK_SIZE):
+    """Разреженная матрица оценок. Для скорректированного косинусного
+    сходства из оценок вычитается средняя оценка пользователя.
+    """
+    chunks = list(read_review_chunks(chunk_size))
+    if not chunks:
+        return None
+    authors, reviewed, scores = (
+        np.concatenate(column) for column in zip(*chunks)
+    )
+    user_ids, users = np.unique(authors, return_inverse=True)
+    title_ids, titles = np.unique(reviewed, return_inverse=True)
+    values = scores.astype(np.float64)
+    if similarity == Similarity.ADJUSTED_COSINE:
+        means = np.bincount(users, weights=values) / np.bincount(users)
+        values -= means[users]
+    order = np.argsort(users, kind='stable')
+    indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(users, minlength=len(user_ids)), out=indptr[1:])
+    return RatingMatrix(
+        title_ids.tolist(), users[order], titles[order], values[order], indptr
+    )
+
+
+def co_rating_block(matrix, start, stop):
+    """Скалярные произведения столбцов start..stop со всеми столбцами."""
+    columns = len(matrix.title_ids)
+    rows = np.flatnonzero(
+        (matrix.titles >= start) & (matrix.titles < stop)
+        & (matrix.values != 0)
+    )
+    users = matrix.users[rows]
+    lengths = matrix.indptr[users + 1] - matrix.indptr[users]
+    pair_rows = np.repeat(rows, lengths)
+    # Позиции всех отзывов тех же пользователей в отсортированных массивах.
+    offsets = np.arange(lengths.sum()) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    others = np.repeat(matrix.indptr[users], lengths) + offsets
+    cells = (matrix.titles[pair_rows] - start) * columns + matrix.titles[
+        others
+    ]
+    products = matrix.values[pair_rows] * matrix.values[others]
+    return np.bincount(
+        cells, weights=products, minlength=(stop - start) * columns
+    ).reshape(stop - start, columns)
+
+
+def top_neighbours(block, norms, start, size):
+    """Индексы и сходство K лучших соседей каждой строки блока."""
+    denominators = np.outer(norms[start:start + len(block)], norms)
+    scores = np.divide(
+        block, denominators, out=np.zeros_like(block),
+        where=denominators > 0
+    )
+    rows = np.arange(len(block))
+    scores[rows, rows + start] = 0
+    size = min(size, scores.shape[1])
+    top = np.argpartition(-scores, size - 1, axis=1)[:, :size]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return (
+        np.take_along_axis(top, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1),
+    )
+
+
+def compute_neighbours(similarity=Similarity.ADJUSTED_COSINE,
+                       size=SIMILAR_TITLES_SIZE, chunk_size=CHUNK_SIZE,
+                       block_cells=BLOCK_CELLS):
+    """Похожие произведения в виде несохранённых объектов SimilarTitle.
+    Сохраняются только соседи с положительным сходством.
+    """
+    matrix = build_matrix(similarity, chunk_size)
+    if matrix is None:
+        return
+    columns = len(matrix.title_ids)
+    norms = np.sqrt(np.bincount(
+        matrix.titles, weights=matrix.values ** 2, minlength=columns
+    ))
+    block_size = max(1, block_cells // columns)
+    for start in range(0, columns, block_size):
+        stop = min(start + block_size, columns)
+        neighbours, scores = top_neighbours(
+            co_rating_block(matrix, start, stop), norms, start, size
+        )
+        for row, (indexes, row_scores) in enumerate(
+            zip(neighbours.tolist(), scores.tolist()), start
+        ):
+            for position, (index, score) in enumerate(
+                zip(indexes, row_scores), 1
+            ):
+                if score <= 0:
+                    break
+                yield SimilarTitle(
+                    title_id=matrix.title_ids[row],
+                    position=position,
+                    similar_id=matrix.title_ids[index],
+                    score=score,
+                )
+
+
+def refresh_similar_titles(similarity=Similarity.ADJUSTED_COSINE,
+                           size=SIMILAR_TITLES_SIZE, chunk_size=CHUNK_SIZE,
+                           block_cells=BLOCK_CELLS, batch_size=BATCH_SIZE):
+    """Пересчёт таблицы похожих произведений. Возвращает количество
+    записей.
+    """
+    neighbours = list(
+        compute_neighbours(similarity, size, chunk_size, block_cells)
+    )
+    with transaction.atomic():
+        title_ids = set(Title.objects.values_list('pk', flat=True))
+        neighbours = [
+            neighbour for neighbour in neighbours
+            if {neighbour.title_id, neighbour.similar_id} <= title_ids
+        ]
+        SimilarTitle.objects.all().delete()
+        SimilarTitle.objects.bulk_create(neighbours, batch_size=batch_size)
+    return len(neighbours)
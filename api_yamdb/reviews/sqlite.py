@@ -0,0 +1,100 @@
+"""Настройка и обслуживание БД SQLite.
+
+PRAGMA из ключа PRAGMAS настроек БД выполняются при каждом открытии
+соединения. Обслуживание обновляет статистику планировщика, возвращает
+файлу БД свободные страницы и переносит журнал WAL в основной файл.
+Реплики обновляются копированием основной БД через online backup API.
+"""
+import sqlite3
+
+# Значение PRAGMA auto_vacuum для постраничного освобождения места.
+INCREMENTAL = 2
+# Количество страниц, копируемых за один шаг резервного копирования.
+BACKUP_PAGES = 1024
+
+
+def apply_pragmas(connection):
+    """Выполнение PRAGMA из настроек соединения SQLite."""
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def pragma(cursor, statement):
+    cursor.execute(f'PRAGMA {statement}')
+    return cursor.fetchone()
+
+
+def maintain(connection, analyze=True, vacuum_pages=0,
+             enable_incremental_vacuum=False):
+    """Обслуживание БД SQLite. Возвращает список пар (шаг, результат).
+
+    vacuum_pages — сколько свободных страниц вернуть файлу, 0 — все.
+    Постраничное освобождение места работает только при
+    auto_vacuum=INCREMENTAL; enable_incremental_vacuum включает этот режим,
+    для существующей БД это требует однократного полного VACUUM.
+    """
+    if connection.vendor != 'sqlite':
+        raise ValueError('Обслуживание поддерживается только для SQLite.')
+    steps = []
+    with connection.cursor() as cursor:
+        if analyze:
+            cursor.execute('ANALYZE')
+            steps.append(('ANALYZE', 'ok'))
+        pragma(cursor, 'optimize')
+        steps.append(('PRAGMA optimize', 'ok'))
+
+        auto_vacuum, = pragma(cursor, 'auto_vacuum')
+        if auto_vacuum != INCREMENTAL and enable_incremental_vacuum:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+            auto_vacuum = INCREMENTAL
+            steps.append(('VACUUM', 'auto_vacuum=INCREMENTAL'))
+        if auto_vacuum == INCREMENTAL:
+            free_before, = pragma(cursor, 'freelist_count')
+            # execute() модуля sqlite3 выполняет только первый шаг
+            # инструкции, то есть освобождает одну страницу.
+            connection.connection.executescript(
+                f'PRAGMA incremental_vacuum({vacuum_pages});'
+            )
+            free_after, = pragma(cursor, 'freelist_count')
+            steps.append((
+                'incremental_vacuum',
+                f'освобождено страниц: {free_before - free_after}'
+            ))
+        else:
+            steps.append(
+                ('incremental_vacuum', 'пропущен: auto_vacuum выключен')
+            )
+
+        journal_mode, = pragma(cursor, 'journal_mode')
+        if journal_mode == 'wal':
+            busy, log, checkpointed = pragma(
+                cursor, 'wal_checkpoint(TRUNCATE)'
+            )
+            steps.append((
+                'wal_checkpoint',
+                f'busy={busy}, страниц в журнале: {log}, '
+                f'перенесено: {checkpointed}'
+            ))
+        else:
+            steps.append(('wal_checkpoint', f'пропущен: {journal_mode}'))
+    return steps
+
+
+def copy_database(source, target_name, pages=BACKUP_PAGES):
+    """Копирование БД соединения source в файл target_name. Копирование
+    идёт шагами по pages страниц, между шагами основная БД доступна для
+    записи; читатели target_name видят либо старую, либо новую копию.
+    """
+    if source.vendor != 'sqlite':
+        raise ValueError('Копирование поддерживается только для SQLite.')
+    source.ensure_connection()
+    target = sqlite3.connect(target_name)
+    try:
+        source.connection.backup(target, pages=pages)
+    finally:
+        target.close()
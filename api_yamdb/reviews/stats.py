@@ -0,0 +1,146 @@
+"""Офлайн расчёт статистики оценок произведений.
+
+Отзывы читаются из БД порциями и сворачиваются NumPy в частичные
+гистограммы оценок по произведениям. Так как оценки — небольшие целые
+числа, среднее, медиана и стандартное отклонение точно вычисляются из
+итоговой гистограммы, и в памяти не нужно держать все оценки сразу.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from api_yamdb.constants import MAX_SCORE_VALUE, MIN_SCORE_VALUE
+from .arrays import CHUNK_SIZE, category_value, read_columns
+from .models import SCORES, Review, Title, TitleStats
+
+BATCH_SIZE = 1000
+MONTH = timedelta(days=30.44)
+
+
+def read_review_chunks(chunk_size=CHUNK_SIZE):
+    """Порции отзывов в виде массивов title_id, score и pub_date
+    (секунды от начала эпохи).
+    """
+    return read_columns(
+        Review.objects.order_by(), ('title_id', 'score', 'pub_date'),
+        chunk_size, {'pub_date': datetime.timestamp},
+    )
+
+
+def reduce_by_title(title_ids, histograms, first, last):
+    """Сложение гистограмм и границ дат отзывов с одинаковым title_id."""
+    titles, index = np.unique(title_ids, return_inverse=True)
+    total = np.zeros((len(titles), len(SCORES)), dtype=np.int64)
+    np.add.at(total, index, histograms)
+    first_at = np.full(len(titles), np.inf)
+    np.minimum.at(first_at, index, first)
+    last_at = np.full(len(titles), -np.inf)
+    np.maximum.at(last_at, index, last)
+    return titles, total, first_at, last_at
+
+
+def chunk_histograms(title_ids, scores, timestamps):
+    """Частичные гистограммы оценок одной порции отзывов."""
+    histograms = np.zeros((len(title_ids), len(SCORES)), dtype=np.int64)
+    histograms[np.arange(len(title_ids)), scores - MIN_SCORE_VALUE] = 1
+    return reduce_by_title(title_ids, histograms, timestamps, timestamps)
+
+
+def title_histograms(chunk_size=CHUNK_SIZE):
+    """Гистограммы оценок и даты первого и последнего отзыва каждого
+    произведения с отзывами.
+    """
+    partials = [
+        chunk_histograms(*chunk) for chunk in read_review_chunks(chunk_size)
+    ]
+    if not partials:
+        return None
+    return reduce_by_title(
+        *(np.concatenate(column) for column in zip(*partials))
+    )
+
+
+def histogram_median(histograms, counts):
+    """Медиана по гистограммам: среднее двух центральных оценок."""
+    cumulative = histograms.cumsum(axis=1)
+    lower = np.argmax(cumulative > ((counts - 1) // 2)[:, None], axis=1)
+    upper = np.argmax(cumulative > (counts // 2)[:, None], axis=1)
+    return (lower + upper) / 2 + MIN_SCORE_VALUE
+
+
+def percentile_ranks(categories, means):
+    """Процентильный ранг средней оценки внутри категории: доля
+    произведений категории с меньшей оценкой плюс половина равных.
+    """
+    ranks = np.empty(len(means))
+    for category in np.unique(categories):
+        mask = categories == category
+        group = np.sort(means[mask])
+        below = np.searchsorted(group, means[mask], side='left')
+        equal = np.searchsorted(group, means[mask], side='right') - below
+        ranks[mask] = (below + equal / 2) / len(group) * 100
+    return ranks
+
+
+def compute_stats(chunk_size=CHUNK_SIZE, now=None):
+    """Статистика всех произведений с отзывами в виде несохранённых
+    объектов TitleStats.
+    """
+    now = now or timezone.now()
+    totals = title_histograms(chunk_size)
+    if totals is None:
+        return []
+    titles, histograms, first_at, last_at = totals
+    counts = histograms.sum(axis=1)
+    values = np.arange(MIN_SCORE_VALUE, MAX_SCORE_VALUE + 1)
+    means = histograms @ values / counts
+    variances = histograms @ values ** 2 / counts - means ** 2
+    stds = np.sqrt(np.maximum(variances, 0))
+    medians = histogram_median(histograms, counts)
+
+    category_ids = dict(Title.objects.filter(
+        pk__in=titles.tolist()
+    ).values_list('pk', 'category_id'))
+    categories = np.array([
+        category_value(category_ids.get(title_id))
+        for title_id in titles.tolist()
+    ])
+    ranks = percentile_ranks(categories, means)
+    months = np.maximum(
+        (now.timestamp() - first_at) / MONTH.total_seconds(), 1
+    )
+    velocities = counts / months
+
+    return [
+        TitleStats(
+            title_id=title_id,
+            review_count=count,
+            mean=mean,
+            median=median,
+            std=std,
+            percentile_rank=rank,
+            monthly_velocity=velocity,
+            first_review_at=datetime.fromtimestamp(first, timezone.utc),
+            last_review_at=datetime.fromtimestamp(last, timezone.utc),
+            computed_at=now,
+        )
+        for (
+            title_id, count, mean, median, std, rank, velocity, first, last
+        ) in zip(
+            titles.tolist(), counts.tolist(), means.tolist(),
+            medians.tolist(), stds.tolist(), ranks.tolist(),
+            velocities.tolist(), first_at.tolist(), last_at.tolist(),
+        )
+        if title_id in category_ids
+    ]
+
+
+def refresh_stats(chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, now=None):
+    """Пересчёт таблицы TitleStats. Возвращает количество записей."""
+    stats = compute_stats(chunk_size, now)
+    with transaction.atomic():
+        TitleStats.objects.all().delete()
+        TitleStats.objects.bulk_create(stats, batch_size=batch_size)
+    return len(stats)
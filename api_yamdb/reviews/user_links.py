@@ -0,0 +1,82 @@
+"""Связи каталога с пользователями.
+
+Пользователи могут храниться в отдельной БД (настройка USERS_DATABASE),
+поэтому отзывы, комментарии и рекомендации ссылаются на них по id без
+внешнего ключа БД. Существование пользователя проверяется при создании
+записи, а вместо каскадного удаления данные пользователя удаляются после
+удаления самого пользователя. Данные, оставшиеся без пользователя,
+например после сбоя между удалениями в разных БД, удаляет команда
+cleanup_user_data.
+"""
+from django.db import IntegrityError, transaction
+
+from .models import Comment, Recommendation, Review, User
+
+# Модели каталога и поля с id пользователя.
+USER_REFERENCES = (
+    (Review, 'author'),
+    (Comment, 'author'),
+    (Recommendation, 'user'),
+)
+# Количество id в одном запросе к БД пользователей.
+CHUNK_SIZE = 500
+
+
+def check_user(instance, field_name):
+    """Проверка существования пользователя, на которого ссылается новая
+    запись. Пользователь, загруженный из БД и привязанный к записи, не
+    проверяется повторно.
+    """
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        user = field.get_cached_value(instance)
+        if user is not None and not user._state.adding:
+            return
+    user_id = getattr(instance, field.attname)
+    if not User.objects.filter(pk=user_id).exists():
+        raise IntegrityError(
+            f'{instance._meta.label}.{field_name}: '
+            f'пользователь {user_id} не существует.'
+        )
+
+
+def delete_user_data(user_ids):
+    """Удаление отзывов, комментариев и рекомендаций пользователей с id
+    user_ids. Возвращает количество удалённых записей по моделям.
+
+    Записи удаляются через ORM, поэтому обработчики удаления отзывов и
+    комментариев обновляют рейтинги и счётчики так же, как при каскадном
+    удалении.
+    """
+    counts = {}
+    with transaction.atomic():
+        for model, field_name in USER_REFERENCES:
+            _, deleted = model.objects.filter(
+                **{f'{field_name}__in': user_ids}
+            ).delete()
+            for label, count in deleted.items():
+                counts[label] = counts.get(label, 0) + count
+    return counts
+
+
+def orphan_user_ids(chunk_size=CHUNK_SIZE):
+    """Отсортированный список id отсутствующих пользователей, на которых
+    ссылаются записи каталога. Таблицы в разных БД нельзя соединить в
+    одном запросе, поэтому id проверяются порциями.
+    """
+    user_ids = set()
+    for model, field_name in USER_REFERENCES:
+        user_ids.update(model.objects.order_by().values_list(
+            field_name, flat=True
+        ).distinct())
+    user_ids = sorted(user_ids)
+    missing = []
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        existing = set(
+            User.objects.filter(pk__in=chunk).values_list('pk', flat=True)
+        )
+        missing.extend(
+            user_id for user_id in chunk if user_id not in existing
+        )
+    return missing
@@ -0,0 +1,52 @@
+import pyarrow.parquet as pq
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08ExportData:
+
+    def test_01_export_tables(self, tmp_path, admin_client, user, user_client,
+                              moderator, moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        call_command(
+            'export_data', output=str(tmp_path), chunk_size=1, jobs=2
+        )
+        for name in ('genre', 'category', 'users', 'titles', 'review',
+                     'comments', 'genre_title'):
+            assert (tmp_path / f'{name}.parquet').exists(), (
+                f'Проверьте, что команда `export_data` создаёт файл '
+                f'`{name}.parquet`.'
+            )
+
+        review_file = pq.ParquetFile(tmp_path / 'review.parquet')
+        assert review_file.metadata.num_rows == len(reviews), (
+            'Проверьте, что команда `export_data` выгружает все отзывы.'
+        )
+        assert review_file.metadata.num_row_groups == len(reviews), (
+            'Проверьте, что команда `export_data` записывает данные '
+            'группами строк размером `--chunk-size`.'
+        )
+        review_data = review_file.read().to_pydict()
+        assert sorted(review_data['id']) == sorted(
+            review['id'] for review in reviews
+        )
+        assert set(review_data['title_id']) == {titles[0]['id']}
+
+        users = pq.read_table(tmp_path / 'users.parquet')
+        for column in ('email', 'first_name', 'last_name', 'bio', 'password'):
+            assert column not in users.column_names, (
+                'Проверьте, что команда `export_data` не выгружает '
+                f'персональные данные пользователей: колонка `{column}`.'
+            )
+
+    def test_02_export_selected_tables(self, tmp_path):
+        call_command('export_data', output=str(tmp_path), tables=['genre'])
+        assert [path.name for path in tmp_path.iterdir()] == [
+            'genre.parquet'
+        ]
+        assert pq.read_table(tmp_path / 'genre.parquet').num_rows == 0
@@ -0,0 +1,158 @@
+import gzip
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Category, Genre, Title
+
+GENRES = [
+    {'id': 1, 'name': 'Драма', 'slug': 'drama'},
+    {'id': 2, 'name': 'Комедия', 'slug': 'comedy'},
+    {'id': 3, 'name': 'Ужасы', 'slug': 'horror'},
+]
+CATEGORIES = [
+    {'id': 1, 'name': 'Фильм', 'slug': 'movie'},
+    {'id': 2, 'name': 'Книга', 'slug': 'book'},
+]
+TITLES = [
+    {'id': 1, 'name': 'Побег из Шоушенка', 'year': 1994, 'category': 1},
+    {'id': 2, 'name': 'Крестный отец', 'year': 1972, 'category': 1},
+]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09ImportData:
+
+    def test_01_import_formats(self, tmp_path):
+        with gzip.open(tmp_path / 'genre.csv.gz', 'wt', encoding='utf-8') as f:
+            f.write('id,name,slug\n')
+            for genre in GENRES:
+                f.write('{id},{name},{slug}\n'.format(**genre))
+        with open(tmp_path / 'category.ndjson', 'w', encoding='utf-8') as f:
+            for category in CATEGORIES:
+                f.write(json.dumps(category, ensure_ascii=False) + '\n')
+        pq.write_table(
+            pa.Table.from_pylist(TITLES), tmp_path / 'titles.parquet',
+            row_group_size=1
+        )
+
+        call_command('import_data', source=str(tmp_path), chunk_size=2)
+
+        assert Genre.objects.count() == len(GENRES), (
+            'Проверьте, что команда `import_data` загружает csv, сжатый gzip.'
+        )
+        assert Category.objects.count() == len(CATEGORIES), (
+            'Проверьте, что команда `import_data` загружает ndjson.'
+        )
+        assert list(
+            Title.objects.order_by('id').values_list('name', 'category_id')
+        ) == [(title['name'], title['category']) for title in TITLES], (
+            'Проверьте, что команда `import_data` загружает parquet.'
+        )
+
+    def test_02_detect_format_by_content(self, tmp_path):
+        path = tmp_path / 'genres.dump'
+        with open(path, 'w', encoding='utf-8') as f:
+            for genre in GENRES:
+                f.write(json.dumps(genre, ensure_ascii=False) + '\n')
+
+        call_command('import_data', source=str(tmp_path), files=[
+            f'genre={path}'
+        ])
+
+        assert set(Genre.objects.values_list('slug', flat=True)) == {
+            genre['slug'] for genre in GENRES
+        }, (
+            'Проверьте, что команда `import_data` определяет формат файла '
+            'по содержимому, если расширение неизвестно.'
+        )
+
+    def test_03_upsert_mode(self, tmp_path):
+        path = tmp_path / 'category.csv'
+        path.write_text(
+            'id,name,slug\n1,Фильм,movie\n2,Книга,book\n', encoding='utf-8'
+        )
+        call_command(
+            'import_data', source=str(tmp_path), mode='upsert', chunk_size=1
+        )
+        assert Category.objects.count() == 2
+
+        path.write_text(
+            'id,name,slug\n1,Кино,movie\n2,Книга,book\n3,Музыка,music\n',
+            encoding='utf-8'
+        )
+        call_command('import_data', source=str(tmp_path), mode='upsert')
+        assert dict(Category.objects.values_list('id', 'name')) == {
+            1: 'Кино', 2: 'Книга', 3: 'Музыка'
+        }, (
+            'Проверьте, что в режиме `upsert` команда `import_data` '
+            'обновляет изменённые записи и добавляет новые по `id`.'
+        )
+
+    def test_04_validate_before_import(self, tmp_path):
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n'
+            '1,Побег из Шоушенка,1994,1\n'
+            '2,Из будущего,3000,1\n'
+            '3,Без категории,1990,7\n',
+            encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command(
+                'import_data', source=str(tmp_path), validate_only=True
+            )
+        with pytest.raises(CommandError):
+            call_command('import_data', source=str(tmp_path))
+        assert not Category.objects.exists(), (
+            'Проверьте, что при ошибках предварительной проверки команда '
+            '`import_data` ничего не записывает в БД.'
+        )
+
+    def test_05_unique_against_db(self, tmp_path):
+        path = tmp_path / 'genre.csv'
+        path.write_text('id,name,slug\n1,Драма,drama\n', encoding='utf-8')
+        call_command('import_data', source=str(tmp_path))
+        path.write_text(
+            'id,name,slug\n2,Мелодрама,drama\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command(
+                'import_data', source=str(tmp_path), validate_only=True
+            )
+        with pytest.raises(CommandError):
+            call_command(
+                'import_data', source=str(tmp_path), mode='upsert',
+                skip_validation=True
+            )
+        assert list(Genre.objects.values_list('id', 'slug')) == [
+            (1, 'drama')
+        ], (
+            'Проверьте, что команда `import_data` проверяет уникальность '
+            'значений среди записей в БД.'
+        )
+
+    def test_06_empty_nullable_reference(self, tmp_path):
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n'
+            '1,Побег из Шоушенка,1994,1\n'
+            '2,Без категории,1990,\n',
+            encoding='utf-8'
+        )
+        for mode in ('insert', 'upsert'):
+            call_command('import_data', source=str(tmp_path), mode=mode)
+            assert list(
+                Title.objects.order_by('id').values_list('id', 'category_id')
+            ) == [(1, 1), (2, None)], (
+                'Проверьте, что команда `import_data` допускает пустую '
+                f'ссылку на категорию произведения в режиме `{mode}`.'
+            )
+            Title.objects.all().delete()
@@ -0,0 +1,173 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title, TitleScoreHistogram
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleRating:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_rating_ordering_and_filter(self, admin_client, user_client,
+                                           moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Так себе', 3)
+        create_single_review(moderator_client, titles[0]['id'], 'Ну', 5)
+        create_single_review(user_client, titles[1]['id'], 'Отлично', 9)
+
+        response = admin_client.get(f'{self.TITLES_URL}?ordering=-rating')
+        assert response.status_code == HTTPStatus.OK
+        ratings = [
+            (title['id'], title['rating'])
+            for title in response.json()['results']
+        ]
+        assert ratings == [(titles[1]['id'], 9), (titles[0]['id'], 4)], (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` поддерживает '
+            'сортировку по параметру `ordering=-rating`.'
+        )
+
+        response = admin_client.get(
+            f'{self.TITLES_URL}?ordering=-review_count'
+        )
+        assert response.json()['results'][0]['id'] == titles[0]['id'], (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` поддерживает '
+            'сортировку по количеству отзывов.'
+        )
+
+        response = admin_client.get(
+            f'{self.TITLES_URL}?rating_min=4.5&rating_max=10'
+        )
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == [titles[1]['id']], (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` поддерживает '
+            'фильтрацию по параметрам `rating_min` и `rating_max`.'
+        )
+
+    def test_02_rating_updated_on_review_delete(self, admin_client,
+                                                user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = create_single_review(
+            user_client, titles[0]['id'], 'Отлично', 9
+        )
+        review_id = response.json()['id']
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert admin_client.get(url).json()['rating'] == 9
+
+        user_client.delete(f'{url}reviews/{review_id}/')
+        assert admin_client.get(url).json()['rating'] is None, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+    def test_03_score_histogram(self, admin_client, user_client,
+                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        response = create_single_review(user_client, titles[0]['id'], 'Ну', 5)
+        create_single_review(moderator_client, titles[0]['id'], 'Да', 8)
+        user_client.patch(
+            f'{url}reviews/{response.json()["id"]}/', data={'score': 7}
+        )
+
+        data = admin_client.get(url).json()
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'7': 1, '8': 1})
+        assert data.get('score_histogram') == expected, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'распределение оценок `score_histogram`, обновляемое при '
+            'создании и редактировании отзывов.'
+        )
+        assert data.get('review_count') == 2
+
+        list_data = admin_client.get(self.TITLES_URL).json()['results']
+        assert 'score_histogram' not in list_data[0], (
+            'Проверьте, что распределение оценок выводится только для '
+            'одного произведения.'
+        )
+
+        call_command('rebuild_score_histograms')
+        assert admin_client.get(url).json()['score_histogram'] == expected
+
+        review = Review.objects.defer('score').get(pk=response.json()['id'])
+        review.text = 'Без оценки'
+        review.save()
+        assert admin_client.get(url).json()['score_histogram'] == expected, (
+            'Проверьте, что сохранение отзыва без загруженной оценки не '
+            'искажает распределение оценок.'
+        )
+
+    def test_04_counters_and_cascade_delete(self, admin_client, user,
+                                            user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'{self.TITLES_URL}{title_id}/'
+        review = create_single_review(user_client, title_id, 'Ну', 4).json()
+        create_single_review(moderator_client, title_id, 'Да', 8)
+        create_single_comment(user_client, title_id, review['id'], 'Раз')
+        create_single_comment(moderator_client, title_id, review['id'], 'Два')
+
+        response = admin_client.get(f'{url}reviews/{review["id"]}/')
+        assert response.json().get('comment_count') == 2, (
+            'Проверьте, что ответ на GET-запрос к отзыву содержит '
+            'количество комментариев `comment_count`.'
+        )
+
+        user.delete()
+        data = admin_client.get(url).json()
+        assert (data['review_count'], data['rating']) == (1, 8), (
+            'Проверьте, что при каскадном удалении пользователя счётчики '
+            'и рейтинг произведения пересчитываются.'
+        )
+
+        Title.objects.filter(pk=title_id).update(review_count=10)
+        Review.objects.update(comment_count=5)
+        TitleScoreHistogram.objects.filter(title_id=title_id).update(
+            score_4=3
+        )
+        call_command('reconcile_counters')
+        title = Title.objects.get(pk=title_id)
+        assert (title.review_count, title.score_sum) == (1, 8)
+        assert set(
+            Review.objects.values_list('comment_count', flat=True)
+        ) == {0}, (
+            'Проверьте, что команда `reconcile_counters` исправляет '
+            'расхождения счётчиков.'
+        )
+        histogram = TitleScoreHistogram.objects.get(title_id=title_id)
+        assert histogram.as_dict() == {
+            str(score): int(score == 8) for score in range(1, 11)
+        }, (
+            'Проверьте, что команда `reconcile_counters` исправляет '
+            'распределение оценок.'
+        )
+
+    def test_05_save_keeps_counters(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        title = Title.objects.get(pk=title_id)
+        review = create_single_review(user_client, title_id, 'Ну', 6).json()
+        loaded_review = Review.objects.get(pk=review['id'])
+        create_single_comment(user_client, title_id, review['id'], 'Раз')
+
+        title.name = 'Новое название'
+        title.save()
+        title = Title.objects.get(pk=title_id)
+        assert (
+            title.name, title.review_count, title.score_sum, title.rating
+        ) == ('Новое название', 1, 6, 6), (
+            'Проверьте, что сохранение произведения, загруженного до '
+            'появления отзыва, не затирает его счётчики и рейтинг.'
+        )
+
+        loaded_review.text = 'Изменённый текст'
+        loaded_review.save()
+        assert Review.objects.get(pk=review['id']).comment_count == 1, (
+            'Проверьте, что сохранение отзыва, загруженного до появления '
+            'комментария, не затирает количество комментариев.'
+        )
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api_yamdb.constants import RATING_PRIOR_MEAN, RATING_PRIOR_WEIGHT
+from reviews.leaderboards import HALF_LIFE, refresh_leaderboards
+from reviews.models import Category, RatingPrior, Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Leaderboards:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def test_01_top_titles(self, client, admin_client, user_client,
+                           moderator_client):
+        titles, categories, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        create_single_review(moderator_client, titles[0]['id'], 'Ну', 6)
+        create_single_review(user_client, titles[1]['id'], 'Отлично', 10)
+        refresh_leaderboards()
+
+        response = client.get(f'{self.TOP_URL}?board=trending')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.TOP_URL}` не найден или недоступен '
+            'неавторизованному пользователю.'
+        )
+        results = response.json()['results']
+        assert [entry['title']['id'] for entry in results] == [
+            titles[0]['id'], titles[1]['id']
+        ], (
+            'Проверьте, что список `trending` упорядочен по популярности '
+            'произведений.'
+        )
+        assert [entry['position'] for entry in results] == [1, 2]
+
+        response = client.get(f'{self.TOP_URL}?board=top_rated')
+        assert [
+            entry['title']['id'] for entry in response.json()['results']
+        ] == [titles[1]['id'], titles[0]['id']], (
+            'Проверьте, что список `top_rated` упорядочен по взвешенному '
+            'рейтингу произведений.'
+        )
+
+        response = client.get(
+            f'{self.TOP_URL}?board=top_rated'
+            f'&category={categories[1]["slug"]}'
+        )
+        assert [
+            entry['title']['id'] for entry in response.json()['results']
+        ] == [titles[1]['id']], (
+            'Проверьте, что рейтинговый список можно получить для категории.'
+        )
+
+        response = client.get(f'{self.TOP_URL}?board=unknown')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_popularity_decay(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        now = timezone.now()
+        refresh_leaderboards(now=now)
+        popularity = Title.objects.get(pk=titles[0]['id']).popularity
+
+        refresh_leaderboards(now=now + HALF_LIFE)
+        assert Title.objects.get(
+            pk=titles[0]['id']
+        ).popularity == pytest.approx(popularity / 2), (
+            'Проверьте, что популярность произведения затухает вдвое '
+            'за период полураспада.'
+        )
+
+        refresh_leaderboards(now=now + HALF_LIFE + timedelta(days=1))
+        assert Title.objects.get(pk=titles[0]['id']).popularity < (
+            popularity / 2
+        )
+
+    def test_04_popularity_follows_changes(self, admin_client, user_client,
+                                           moderator_client, moderator):
+        titles, _, _ = create_titles(admin_client)
+        first = create_single_review(
+            user_client, titles[0]['id'], 'Хорошо', 8
+        ).json()
+        create_single_review(moderator_client, titles[0]['id'], 'Ну', 6)
+        now = timezone.now()
+        refresh_leaderboards(now=now)
+        popularity = Title.objects.get(pk=titles[0]['id']).popularity
+
+        user_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{first["id"]}/'
+        )
+        assert Title.objects.get(
+            pk=titles[0]['id']
+        ).popularity < popularity, (
+            'Проверьте, что при удалении отзыва его вклад вычитается из '
+            'популярности произведения.'
+        )
+
+        # Импорт записывает отзывы с явными id, меньшими уже учтённых.
+        Review.objects.create(
+            pk=first['id'], title_id=titles[1]['id'], author=moderator,
+            text='Отлично', score=10, pub_date=now
+        )
+        refresh_leaderboards(now=now)
+        assert Title.objects.get(
+            pk=titles[1]['id']
+        ).popularity == pytest.approx(1), (
+            'Проверьте, что при пересчёте учитываются отзывы, записанные с '
+            'id меньше уже учтённых.'
+        )
+
+    def test_03_weighted_rating_priors(self, admin_client, user_client,
+                                       moderator_client):
+        titles, categories, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        create_single_review(moderator_client, titles[0]['id'], 'Ну', 6)
+        create_single_review(user_client, titles[1]['id'], 'Плохо', 2)
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.weighted_rating == pytest.approx(
+            (14 + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT)
+            / (2 + RATING_PRIOR_WEIGHT)
+        ), (
+            'Проверьте, что взвешенный рейтинг обновляется при создании '
+            'отзыва из суммы и количества оценок.'
+        )
+
+        call_command('recompute_rating_priors', chunk_size=2)
+        priors = {
+            prior.category_id: (prior.mean, prior.weight)
+            for prior in RatingPrior.objects.all()
+        }
+        category_ids = dict(Category.objects.values_list('slug', 'id'))
+        assert priors == {
+            None: (pytest.approx(16 / 3), 1.5),
+            category_ids[categories[0]['slug']]: (7, 2),
+            category_ids[categories[1]['slug']]: (2, 1),
+        }, (
+            'Проверьте, что команда `recompute_rating_priors` вычисляет '
+            'априорные среднее и вес глобально и для каждой категории.'
+        )
+        assert Title.objects.get(
+            pk=titles[1]['id']
+        ).weighted_rating == pytest.approx(2), (
+            'Проверьте, что после пересчёта априорных значений взвешенный '
+            'рейтинг использует значения категории произведения.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'category': categories[0]['slug']}
+        )
+        assert Title.objects.get(
+            pk=titles[1]['id']
+        ).weighted_rating == pytest.approx((2 + 7 * 2) / (1 + 2)), (
+            'Проверьте, что при смене категории произведения взвешенный '
+            'рейтинг пересчитывается с априорными значениями новой '
+            'категории.'
+        )
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert Title.objects.get(
+            pk=titles[1]['id']
+        ).weighted_rating == pytest.approx((2 + 16 / 3 * 1.5) / (1 + 1.5)), (
+            'Проверьте, что после удаления категории взвешенный рейтинг '
+            'её произведений использует глобальные априорные значения.'
+        )
@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, TitleStats
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleStats:
+
+    def test_01_compute_title_stats(self, admin_client, user_client,
+                                    moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        create_single_review(moderator_client, titles[0]['id'], 'Ну', 5)
+        create_single_review(admin_client, titles[0]['id'], 'Да', 6)
+        create_single_review(user_client, titles[1]['id'], 'Плохо', 2)
+
+        call_command('compute_title_stats', chunk_size=3, batch_size=1)
+
+        stats = TitleStats.objects.get(title_id=titles[0]['id'])
+        assert (stats.review_count, stats.median) == (3, 6), (
+            'Проверьте, что команда `compute_title_stats` считает '
+            'количество отзывов и медиану оценок произведения.'
+        )
+        assert stats.mean == pytest.approx(19 / 3)
+        assert stats.std == pytest.approx(1.247219, rel=1e-4), (
+            'Проверьте, что команда `compute_title_stats` считает '
+            'стандартное отклонение оценок.'
+        )
+        assert stats.percentile_rank == 50, (
+            'Проверьте, что процентильный ранг считается внутри категории '
+            'произведения.'
+        )
+        assert stats.monthly_velocity == 3
+        assert stats.first_review_at == Review.objects.filter(
+            title_id=titles[0]['id']
+        ).earliest('pub_date').pub_date
+
+        Review.objects.filter(title_id=titles[1]['id']).delete()
+        call_command('compute_title_stats')
+        assert list(TitleStats.objects.values_list('title_id', flat=True)) == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что команда `compute_title_stats` заменяет '
+            'устаревшую статистику.'
+        )
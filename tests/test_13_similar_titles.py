@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api_yamdb.constants import (CONTENT_CATEGORY_WEIGHT,
+                                 CONTENT_GENRE_WEIGHT, CONTENT_YEAR_WEIGHT)
+from reviews.indexes import TitleIndex, title_index
+from reviews.models import SimilarTitle
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13SimilarTitles:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_similar_titles(self, client, admin_client, user_client,
+                               moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        create_single_review(user_client, titles[1]['id'], 'Ну', 6)
+        create_single_review(moderator_client, titles[0]['id'], 'Так', 4)
+        create_single_review(moderator_client, titles[1]['id'], 'Плохо', 2)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/similar/'
+
+        call_command(
+            'build_similar_titles', similarity='cosine', block_cells=1
+        )
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{url}` не найден или недоступен '
+            'неавторизованному пользователю.'
+        )
+        data = response.json()
+        assert [item['title']['id'] for item in data] == [titles[1]['id']], (
+            'Проверьте, что эндпоинт похожих произведений возвращает '
+            'произведения, оценённые теми же пользователями.'
+        )
+        assert data[0]['score'] == pytest.approx(56 / (80 * 40) ** 0.5), (
+            'Проверьте, что сходство произведений считается как косинус '
+            'угла между векторами оценок.'
+        )
+
+        call_command('build_similar_titles')
+        assert not SimilarTitle.objects.exists(), (
+            'Проверьте, что при скорректированном косинусном сходстве '
+            'учитывается средняя оценка пользователя.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}0/similar/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_similar_by_content(self, client, admin_client):
+        title_index.invalidate()
+        titles, categories, genres = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/similar/'
+        assert [
+            (item['title']['id'], item['score'])
+            for item in client.get(url).json()
+        ] == [(titles[1]['id'], pytest.approx(CONTENT_YEAR_WEIGHT))], (
+            'Проверьте, что для произведений без отзывов похожие '
+            'произведения подбираются по жанрам, категории и году.'
+        )
+
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        new_title_url = f'{self.TITLES_URL}{response.json()["id"]}/'
+        data = client.get(url).json()
+        assert data[0]['title']['id'] == response.json()['id']
+        assert data[0]['score'] == pytest.approx(
+            CONTENT_GENRE_WEIGHT / 2 + CONTENT_CATEGORY_WEIGHT
+        )
+
+        admin_client.patch(new_title_url, data={
+            'genre': [genres[0]['slug'], genres[1]['slug']]
+        })
+        assert client.get(url).json()[0]['score'] == pytest.approx(
+            CONTENT_GENRE_WEIGHT + CONTENT_CATEGORY_WEIGHT
+        ), (
+            'Проверьте, что индекс похожих произведений обновляется при '
+            'изменении жанров произведения.'
+        )
+
+        admin_client.delete(new_title_url)
+        assert [
+            item['title']['id'] for item in client.get(url).json()
+        ] == [titles[1]['id']]
+
+    def test_03_similar_in_other_process(self, admin_client, monkeypatch):
+        titles, categories, genres = create_titles(admin_client)
+        # Индекс другого процесса, построенный до изменений.
+        other = TitleIndex()
+        other.similar(titles[0]['id'])
+
+        def build():
+            raise AssertionError('Индекс перестроен целиком.')
+
+        monkeypatch.setattr(other, 'build', build)
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug'], genres[1]['slug']],
+            'category': categories[0]['slug'],
+        })
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[1]["id"]}/',
+            data={'category': categories[0]['slug']}
+        )
+        assert other.similar(titles[0]['id']) == [
+            (response.json()['id'], pytest.approx(
+                CONTENT_GENRE_WEIGHT + CONTENT_CATEGORY_WEIGHT
+            )),
+            (titles[1]['id'], pytest.approx(
+                CONTENT_CATEGORY_WEIGHT + CONTENT_YEAR_WEIGHT
+            )),
+        ], (
+            'Проверьте, что похожие по метаданным произведения в другом '
+            'процессе учитывают изменения каталога без полного '
+            'перестроения индекса.'
+        )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.leaderboards import refresh_leaderboards
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Recommendations:
+
+    URL = '/api/v1/users/me/recommendations/'
+
+    def test_01_recommendations(self, client, admin_client, user_client,
+                                moderator_client):
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        titles.append(response.json())
+        for author_client, scores in (
+            (user_client, {0: 8, 1: 6}),
+            (moderator_client, {0: 4, 1: 2}),
+            (admin_client, {0: 9, 2: 7}),
+        ):
+            for index, score in scores.items():
+                create_single_review(
+                    author_client, titles[index]['id'], 'Отзыв', score
+                )
+
+        response = client.get(self.URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.URL}` возвращает ответ со статусом 401.'
+        )
+
+        refresh_leaderboards()
+        response = moderator_client.get(self.URL)
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            item['title']['id'] for item in response.json()
+        ] == [titles[2]['id']], (
+            'Проверьте, что пользователю без рассчитанных рекомендаций '
+            'выводятся лучшие произведения, на которые он не писал отзывов.'
+        )
+
+        call_command('build_similar_titles', similarity='cosine')
+        call_command('build_recommendations', jobs=2, batch_users=1)
+        data = admin_client.get(self.URL).json()
+        assert [
+            (item['position'], item['title']['id'], item['score'])
+            for item in data
+        ] == [(1, titles[1]['id'], 9)], (
+            'Проверьте, что рекомендации содержат произведения без отзыва '
+            'пользователя, упорядоченные по предсказанной оценке.'
+        )
+        assert [
+            (item['title']['id'], item['score'])
+            for item in user_client.get(self.URL).json()
+        ] == [(titles[2]['id'], 8)]
@@ -0,0 +1,173 @@
+from http import HTTPStatus
+
+import pytest
+from django.db.models import F
+
+from reviews import facets
+from reviews.indexes import VERSION_KEY, TitleIndex, title_index
+from reviews.models import DataVersion, Genre, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleBrowse:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_catalog(self, admin_client):
+        title_index.invalidate()
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug'], genres[2]['slug']],
+            'category': categories[0]['slug'],
+        })
+        titles.append(response.json())
+        return titles, categories, genres
+
+    def get_ids(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}&page_size=10')
+        assert response.status_code == HTTPStatus.OK
+        return {title['id'] for title in response.json()['results']}
+
+    def test_01_filter_by_several_genres(self, client, admin_client):
+        titles, _, genres = self.create_catalog(admin_client)
+        slugs = f'{genres[0]["slug"]},{genres[2]["slug"]}'
+
+        assert self.get_ids(client, f'genre={slugs}') == {
+            titles[2]['id']
+        }, (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` по умолчанию '
+            'возвращает произведения со всеми жанрами из параметра `genre`.'
+        )
+        assert self.get_ids(client, f'genre={slugs}&genre_mode=any') == {
+            title['id'] for title in titles
+        }, (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` с параметром '
+            '`genre_mode=any` возвращает произведения с любым из жанров.'
+        )
+        assert self.get_ids(
+            client, f'genre={genres[1]["slug"]},unknown&genre_mode=any'
+        ) == {titles[0]['id']}
+        assert self.get_ids(
+            client, f'genre={genres[1]["slug"]},unknown'
+        ) == set()
+
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[1]["id"]}/',
+            data={'genre': [genres[0]['slug'], genres[2]['slug']]}
+        )
+        assert self.get_ids(client, f'genre={slugs}') == {
+            titles[1]['id'], titles[2]['id']
+        }, (
+            'Проверьте, что фильтр по жанрам учитывает изменение жанров '
+            'произведения.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?genre={slugs}&genre_mode=x')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_facets(self, client, admin_client,
+                       django_assert_num_queries):
+        _, categories, genres = self.create_catalog(admin_client)
+        url = f'{self.TITLES_URL}facets/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{url}` не найден или недоступен '
+            'неавторизованному пользователю.'
+        )
+        assert response.json() == {
+            'count': 3,
+            'genre': {
+                genres[0]['slug']: 2, genres[1]['slug']: 1,
+                genres[2]['slug']: 2,
+            },
+            'category': {categories[0]['slug']: 2, categories[1]['slug']: 1},
+            'year': {'1979': 1, '1984': 1, '1988': 1},
+            'decade': {'1970': 1, '1980': 2},
+        }, (
+            f'Проверьте, что эндпоинт `{url}` возвращает количество '
+            'произведений по жанрам, категориям, годам и десятилетиям.'
+        )
+
+        query = f'{url}?category={categories[0]["slug"]}&search=Чужой'
+        data = client.get(query).json()
+        assert (data['count'], data['genre']) == (
+            1, {genres[0]['slug']: 1, genres[2]['slug']: 1}
+        ), (
+            f'Проверьте, что эндпоинт `{url}` учитывает параметры '
+            'фильтрации и поиска списка произведений.'
+        )
+        # Из БД читается только общая для всех процессов версия каталога.
+        with django_assert_num_queries(1):
+            assert client.get(query).json() == data, (
+                'Проверьте, что счётчики кэшируются по параметрам запроса.'
+            )
+        with django_assert_num_queries(1):
+            assert client.get(f'{query}&page=2&page_size=5').json() == data, (
+                'Проверьте, что параметры пагинации не входят в ключ кэша.'
+            )
+
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой 2',
+            'year': 1986,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert client.get(query).json()['count'] == 2, (
+            'Проверьте, что кэш счётчиков сбрасывается при изменении '
+            'каталога.'
+        )
+
+    def test_03_index_version(self, client, admin_client, monkeypatch):
+        titles, _, genres = self.create_catalog(admin_client)
+        slug = genres[1]['slug']
+        assert self.get_ids(client, f'genre={slug}') == {titles[0]['id']}
+        genre = Genre.objects.get(slug=slug)
+        # Изменение из другого процесса: связь без сигналов и новая версия.
+        Title.genre.through.objects.create(
+            title_id=titles[1]['id'], genre=genre
+        )
+        DataVersion.objects.filter(key=VERSION_KEY).update(
+            version=F('version') + 1
+        )
+        assert self.get_ids(client, f'genre={slug}') == {
+            titles[0]['id'], titles[1]['id']
+        }, (
+            'Проверьте, что индекс перестраивается после изменения каталога '
+            'в другом процессе.'
+        )
+
+        # Индекс другого процесса, построенный до изменений.
+        other = TitleIndex()
+        other.filter_genres([genre.pk])
+
+        def build():
+            raise AssertionError('Индекс перестроен целиком.')
+
+        monkeypatch.setattr(other, 'build', build)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[2]["id"]}/', data={'genre': [slug]}
+        )
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert set(other.filter_genres([genre.pk]).tolist()) == {
+            titles[1]['id'], titles[2]['id']
+        }, (
+            'Проверьте, что индекс другого процесса применяет изменения '
+            'произведений из журнала изменений без полного перестроения.'
+        )
+
+    def test_04_facets_version(self, client, admin_client):
+        self.create_catalog(admin_client)
+        url = f'{self.TITLES_URL}facets/'
+        count = client.get(url).json()['count']
+        # Изменение из другого процесса: запись без сигналов и новая версия.
+        Title.objects.bulk_create([Title(name='Чужие', year=1986)])
+        DataVersion.objects.filter(key=facets.VERSION_KEY).update(
+            version=F('version') + 1
+        )
+        assert client.get(url).json()['count'] == count + 1, (
+            'Проверьте, что счётчики пересчитываются после изменения '
+            'каталога в другом процессе.'
+        )
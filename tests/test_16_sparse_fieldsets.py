@@ -0,0 +1,64 @@
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SparseFieldsets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_title_fields(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        with django_assert_num_queries(2):
+            response = client.get(f'{self.TITLES_URL}?fields=id,name,rating')
+        assert [set(title) for title in response.json()['results']] == [
+            {'id', 'name', 'rating'}
+        ] * len(titles), (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` с параметром '
+            '`fields` возвращает только перечисленные поля и не загружает '
+            'жанры и категории.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?omit=description,genre')
+        title = response.json()['results'][0]
+        assert 'description' not in title and 'genre' not in title, (
+            f'Проверьте, что эндпоинт `{self.TITLES_URL}` с параметром '
+            '`omit` не возвращает перечисленные поля.'
+        )
+        assert isinstance(title['category'], dict)
+
+        response = client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?fields=id,score_histogram'
+        )
+        assert set(response.json()) == {'id', 'score_histogram'}
+
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert response.json()['genre'] and response.json()['description'], (
+            'Проверьте, что без параметров `fields` и `omit` ответ '
+            'содержит все поля.'
+        )
+
+    def test_02_other_resources(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+
+        response = admin_client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/?fields=text,score'
+        )
+        assert response.json()['results'] == [{'text': 'Хорошо', 'score': 8}]
+
+        response = admin_client.get('/api/v1/genres/?fields=slug')
+        assert all(
+            set(genre) == {'slug'} for genre in response.json()['results']
+        )
+
+        response = user_client.get('/api/v1/users/me/?omit=bio,email')
+        assert set(response.json()) == {
+            'username', 'first_name', 'last_name', 'role'
+        }, (
+            'Проверьте, что параметр `omit` поддерживается для '
+            'пользователей.'
+        )
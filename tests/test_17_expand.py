@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb.constants import EXPAND_COMMENTS_SIZE
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Expand:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_expand_reviews_and_comments(self, client, admin_client,
+                                            user_client, moderator_client,
+                                            django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Да', 8).json()
+        create_single_review(moderator_client, title_id, 'Нет', 3)
+        create_single_review(admin_client, titles[1]['id'], 'Ну', 5)
+        texts = [f'Комментарий {number}' for number in range(4)]
+        for text in texts:
+            create_single_comment(admin_client, title_id, review['id'], text)
+
+        url = f'{self.TITLES_URL}{title_id}/'
+        assert 'reviews' not in client.get(url).json()
+
+        data = client.get(f'{url}?expand=latest_comments').json()
+        assert (data['reviews']['count'], data['reviews']['next']) == (2, None)
+        reviews = {item['id']: item for item in data['reviews']['results']}
+        assert [
+            comment['text'] for comment in reviews[review['id']][
+                'latest_comments'
+            ]
+        ] == texts[::-1][:EXPAND_COMMENTS_SIZE], (
+            'Проверьте, что параметр `expand=latest_comments` встраивает в '
+            'отзывы последние комментарии.'
+        )
+
+        data = client.get(f'{url}?expand=reviews').json()
+        assert 'latest_comments' not in data['reviews']['results'][0]
+
+        with django_assert_num_queries(5):
+            response = client.get(f'{self.TITLES_URL}?expand=latest_comments')
+        assert [
+            title['reviews']['count'] for title in response.json()['results']
+        ] == [1, 2], (
+            'Проверьте, что отзывы и комментарии встраиваются в список '
+            'произведений фиксированным числом запросов.'
+        )
+
+        response = client.get(f'{url}?expand=unknown')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
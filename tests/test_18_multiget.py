@@ -0,0 +1,94 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb.constants import MULTIGET_LIMIT
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18MultiGet:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_titles_by_ids(self, client, admin_client,
+                              django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        ids = [titles[1]['id'], 0, titles[0]['id']]
+        query = ','.join(map(str, ids))
+
+        with django_assert_num_queries(2):
+            response = client.get(f'{self.TITLES_URL}?ids={query}')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == ids[::2], (
+            'Проверьте, что параметр `ids` возвращает произведения в '
+            'порядке запрошенных id.'
+        )
+        assert data['missing'] == [0]
+
+        response = client.post(
+            f'{self.TITLES_URL}multiget/',
+            data={'ids': ids[::-1]},
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что список id можно передать в теле POST-запроса '
+            'без авторизации.'
+        )
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == ids[::-2]
+
+        response = client.get(f'{self.TITLES_URL}?ids=1,abc')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        too_many = ','.join(map(str, range(1, MULTIGET_LIMIT + 2)))
+        response = client.get(f'{self.TITLES_URL}?ids={too_many}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что количество id в запросе ограничено.'
+        )
+        response = client.post(
+            f'{self.TITLES_URL}multiget/', data=json.dumps(ids),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что тело POST-запроса, которое не является '
+            'объектом, отклоняется с ошибкой 400.'
+        )
+
+    def test_02_reviews_and_comments_by_ids(self, client, admin_client,
+                                            user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        first = create_single_review(user_client, title_id, 'Да', 8).json()
+        second = create_single_review(
+            moderator_client, title_id, 'Нет', 3
+        ).json()
+        other = create_single_review(
+            admin_client, titles[1]['id'], 'Ну', 5
+        ).json()
+        url = f'{self.TITLES_URL}{title_id}/reviews/'
+
+        response = client.get(
+            f'{url}?ids={second["id"]},{other["id"]},{first["id"]}'
+        )
+        data = response.json()
+        assert [review['id'] for review in data['results']] == [
+            second['id'], first['id']
+        ], (
+            'Проверьте, что по `ids` возвращаются только отзывы '
+            'произведения из URL.'
+        )
+        assert data['missing'] == [other['id']]
+
+        comment = create_single_comment(
+            admin_client, title_id, first['id'], 'Комментарий'
+        ).json()
+        response = client.post(
+            f'{url}{first["id"]}/comments/multiget/',
+            data={'ids': [comment['id']]},
+            content_type='application/json'
+        )
+        assert response.json()['results'] == [comment]
@@ -0,0 +1,101 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api.views import GenreViewSet
+from api_yamdb.constants import BATCH_REQUESTS_LIMIT
+from api_yamdb.db_routers import has_recent_write, replica_cache
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Batch:
+
+    BATCH_URL = '/api/v1/batch/'
+
+    def test_01_batch(self, client, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(self.BATCH_URL, data=json.dumps([
+            {'method': 'GET', 'path': '/api/v1/users/me/'},
+            {'method': 'GET', 'path': '/api/v1/titles/?year=1988'},
+            {'method': 'GET', 'path': '/api/v1/unknown/'},
+            {
+                'method': 'POST', 'path': reviews_url,
+                'body': {'text': 'Отзыв', 'score': 7},
+            },
+            {'method': 'GET', 'path': reviews_url},
+        ]), content_type='application/json')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.NOT_FOUND,
+            HTTPStatus.CREATED, HTTPStatus.OK
+        ], (
+            'Проверьте, что пакетный запрос возвращает статусы вложенных '
+            'запросов в порядке пакета.'
+        )
+        assert results[0]['body']['username'] == user.username, (
+            'Проверьте, что вложенные запросы выполняются от имени '
+            'пользователя пакетного запроса.'
+        )
+        assert [
+            title['id'] for title in results[1]['body']['results']
+        ] == [titles[1]['id']]
+        assert results[4]['body']['results'] == [results[3]['body']], (
+            'Проверьте, что GET-запрос после записи видит её результат.'
+        )
+
+        response = client.post(self.BATCH_URL, data=json.dumps([
+            {'method': 'GET', 'path': '/api/v1/titles/'},
+            {
+                'method': 'POST', 'path': reviews_url,
+                'body': {'text': 'Отзыв', 'score': 7},
+            },
+        ]), content_type='application/json')
+        assert [result['status'] for result in response.json()] == [
+            HTTPStatus.OK, HTTPStatus.UNAUTHORIZED
+        ], (
+            'Проверьте, что права проверяются для каждого вложенного '
+            'запроса.'
+        )
+
+    @pytest.mark.parametrize('data', [
+        [],
+        [{'method': 'GET', 'path': '/api/v1/batch/'}],
+        [{'method': 'GET', 'path': '/admin/'}],
+        [{'method': 'GET', 'path': '/api/v1/titles/'}] * (
+            BATCH_REQUESTS_LIMIT + 1
+        ),
+    ])
+    def test_02_invalid_batch(self, client, data):
+        response = client.post(
+            self.BATCH_URL, data=json.dumps(data),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_failed_sub_request(self, admin_client, user_client, user,
+                                   monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError('Ошибка представления')
+
+        replica_cache().clear()
+        create_titles(admin_client)
+        monkeypatch.setattr(GenreViewSet, 'list', fail)
+        response = user_client.post(self.BATCH_URL, data=json.dumps([
+            {'method': 'GET', 'path': '/api/v1/genres/'},
+            {'method': 'GET', 'path': '/api/v1/categories/'},
+        ]), content_type='application/json')
+        assert response.status_code == HTTPStatus.OK
+        assert [result['status'] for result in response.json()] == [
+            HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.OK
+        ], (
+            'Проверьте, что ошибка вложенного запроса возвращается как '
+            'статус 500 этого запроса, а не всего пакета.'
+        )
+        assert not has_recent_write(user.id), (
+            'Проверьте, что пакет только из GET-запросов не считается '
+            'записью пользователя.'
+        )
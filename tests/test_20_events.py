@@ -0,0 +1,99 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+from api.streams import EventStreamRouter
+from reviews.events import Event, broker
+from tests.utils import create_single_comment, create_titles
+
+
+async def not_found(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def parse_event(message):
+    lines = message['body'].decode().strip().split('\n')
+    return lines[0].split(': ', 1)[1], json.loads(lines[1].split(': ', 1)[1])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Events:
+
+    async def open_stream(self, application, path):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'path': path,
+        })
+        await communicator.send_input({'type': 'http.request'})
+        return communicator
+
+    def test_01_review_and_comment_events(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        application = EventStreamRouter(not_found)
+
+        async def listen():
+            communicator = await self.open_stream(
+                application, f'/api/v1/titles/{title_id}/events/'
+            )
+            start = await communicator.receive_output(5)
+            assert start['status'] == HTTPStatus.OK
+            assert (await communicator.receive_output(5))['more_body']
+            review = (await sync_to_async(user_client.post)(
+                url, data={'text': 'Отзыв', 'score': 7}
+            )).json()
+            await sync_to_async(create_single_comment)(
+                admin_client, title_id, review['id'], 'Комментарий'
+            )
+            await sync_to_async(user_client.delete)(
+                f'{url}{review["id"]}/'
+            )
+            received = [
+                parse_event(await communicator.receive_output(5))
+                for _ in range(4)
+            ]
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(5)
+            return review, received
+
+        review, received = asyncio.run(listen())
+        assert [event_type for event_type, _ in received] == [
+            'review.created', 'comment.created', 'comment.deleted',
+            'review.deleted'
+        ], (
+            'Проверьте, что подписчики произведения получают события об '
+            'изменениях отзывов и комментариев.'
+        )
+        assert received[0][1]['author'] == review['author']
+        assert received[3][1] == {'id': review['id']}
+        assert not broker.subscriptions, (
+            'Проверьте, что подписка удаляется после отключения клиента.'
+        )
+
+    def test_02_unknown_title(self, admin_client):
+        async def request():
+            communicator = await self.open_stream(
+                EventStreamRouter(not_found), '/api/v1/titles/0/events/'
+            )
+            return await communicator.receive_output(5)
+
+        assert asyncio.run(request())['status'] == HTTPStatus.NOT_FOUND
+
+    def test_03_slow_consumer_eviction(self):
+        async def overflow():
+            subscription = broker.subscribe('title:0', size=2)
+            for number in range(3):
+                broker.deliver('title:0', Event('review.created', number))
+            await asyncio.sleep(0)
+            return [await subscription.get() for _ in range(3)]
+
+        events = asyncio.run(overflow())
+        assert [event and event.data for event in events] == [0, 1, None], (
+            'Проверьте, что подписчик с переполненным буфером отключается.'
+        )
+        assert not broker.subscriptions
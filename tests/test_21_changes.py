@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import ChangeAction, ChangeLogEntry, Genre
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Changes:
+
+    CHANGES_URL = '/api/v1/changes/'
+
+    def test_01_change_feed(self, client, admin_client, user_client):
+        titles, _, genres = create_titles(admin_client)
+        cursor = client.get(self.CHANGES_URL).json()['cursor']
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Да', 8).json()
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 9}
+        )
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+
+        response = client.get(f'{self.CHANGES_URL}?since={cursor}')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        changes = [
+            (change['model'], change['object_id'], change['action'])
+            for change in data['results']
+        ]
+        assert changes == [
+            ('review', review['id'], 'created'),
+            ('review', review['id'], 'updated'),
+            ('genre', changes[2][1], 'deleted'),
+            ('title', title_id, 'updated'),
+        ], (
+            'Проверьте, что журнал изменений возвращает изменения после '
+            'переданного номера записи.'
+        )
+        assert data['results'][1]['data']['score'] == 9
+        assert data['results'][2]['data'] is None
+        assert data['results'][3]['data']['genre'] == [
+            Genre.objects.get(slug=genres[1]['slug']).pk
+        ], (
+            'Проверьте, что удаление жанра записывается как изменение его '
+            'произведений.'
+        )
+
+        first = client.get(f'{self.CHANGES_URL}?page_size=3').json()
+        second = client.get(first['next']).json()
+        seqs = [
+            change['seq'] for change in first['results'] + second['results']
+        ]
+        assert seqs == sorted(seqs) and len(first['results']) == 3, (
+            'Проверьте, что журнал изменений разбивается на страницы по '
+            'номеру записи.'
+        )
+        response = client.get(f'{self.CHANGES_URL}?since=-1')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_compaction(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Да', 8).json()
+        url = f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        user_client.patch(url, data={'score': 9})
+        user_client.patch(url, data={'score': 3})
+        before = ChangeLogEntry.objects.count()
+
+        call_command('compact_changes')
+        entries = ChangeLogEntry.objects.filter(
+            model='review', object_id=review['id']
+        )
+        assert [entry.data['score'] for entry in entries] == [3], (
+            'Проверьте, что сжатие журнала оставляет только последнюю '
+            'запись объекта.'
+        )
+        assert ChangeLogEntry.objects.count() < before
+        pairs = ChangeLogEntry.objects.values_list('model', 'object_id')
+        assert len(pairs) == len(set(pairs))
+
+    def test_03_upsert(self, tmp_path):
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Произведение,2000,1\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'genre_title.csv').write_text(
+            'id,title_id,genre_id\n1,1,1\n', encoding='utf-8'
+        )
+        call_command('import_data', source=str(tmp_path), mode='upsert')
+        seq = ChangeLogEntry.objects.latest('seq').seq
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n2,Комедии,comedy\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'genre_title.csv').write_text(
+            'id,title_id,genre_id\n1,1,1\n2,1,2\n', encoding='utf-8'
+        )
+        call_command('import_data', source=str(tmp_path), mode='upsert')
+        entries = ChangeLogEntry.objects.filter(seq__gt=seq)
+        assert [
+            (entry.model, entry.object_id, entry.action, entry.data)
+            for entry in entries
+        ] == [
+            ('genre', 2, ChangeAction.UPDATED,
+             {'id': 2, 'name': 'Комедии', 'slug': 'comedy'}),
+            ('title', 1, ChangeAction.UPDATED,
+             {'id': 1, 'name': 'Произведение', 'year': 2000,
+              'description': '', 'category_id': 1, 'genre': [1, 2]}),
+        ], (
+            'Проверьте, что изменения из `import_data --mode=upsert` '
+            'попадают в журнал изменений.'
+        )
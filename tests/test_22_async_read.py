@@ -0,0 +1,142 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from django.test import AsyncClient
+from django.urls import resolve
+
+from api import async_views
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22AsyncRead:
+
+    def test_01_async_read_matches_sync(self, client, admin_client,
+                                        user_client, moderator_client):
+        titles, _, genres = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Да', 8).json()
+        create_single_review(moderator_client, title_id, 'Нет', 3)
+        comment = create_single_comment(
+            admin_client, title_id, review['id'], 'Комментарий'
+        ).json()
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        async_urls = [
+            '/api/v1/genres/',
+            '/api/v1/categories/?page=1',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/?expand=latest_comments',
+            reviews_url,
+            f'{reviews_url}{review["id"]}/',
+            comments_url,
+            f'{comments_url}{comment["id"]}/',
+        ]
+        sync_urls = [
+            '/api/v1/titles/0/',
+            '/api/v1/genres/?page=5',
+            f'/api/v1/titles/{title_id}/?expand=unknown',
+            '/api/v1/titles/0/reviews/',
+        ]
+
+        async def fetch_all():
+            async_client = AsyncClient()
+            return [
+                await async_client.get(url) for url in async_urls + sync_urls
+            ]
+
+        responses = asyncio.run(fetch_all())
+        for url, response in zip(async_urls + sync_urls, responses):
+            expected = client.get(url)
+            assert (response.status_code, response.json()) == (
+                expected.status_code, expected.json()
+            ), (
+                f'Проверьте, что ответ на `{url}` под ASGI совпадает с '
+                'ответом под WSGI.'
+            )
+        modules = [
+            resolve(
+                response.asgi_request.path_info,
+                getattr(response.asgi_request, 'urlconf', None)
+            ).func.__module__
+            for response in responses
+        ]
+        assert modules[:len(async_urls)] == ['api.async_views'] * len(
+            async_urls
+        ), (
+            'Проверьте, что под ASGI запросы чтения обслуживают '
+            'асинхронные представления.'
+        )
+
+    def test_02_authorization_header(self, client):
+        url = '/api/v1/genres/'
+        headers = {'HTTP_AUTHORIZATION': 'Bearer invalid'}
+
+        async def fetch():
+            return await AsyncClient().get(
+                url, authorization='Bearer invalid'
+            )
+
+        response = asyncio.run(fetch())
+        assert response.status_code == client.get(url, **headers).status_code
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что под ASGI запросы с заголовком Authorization '
+            'проходят аутентификацию так же, как под WSGI.'
+        )
+
+    def test_03_authenticated_filtered_reads(self, monkeypatch, client,
+                                             admin_client, user_client,
+                                             moderator_client, token_user):
+        titles, categories, genres = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Да', 8).json()
+        create_single_review(moderator_client, title_id, 'Нет', 3)
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        urls = [
+            f'/api/v1/titles/?genre={genres[0]["slug"]}',
+            f'/api/v1/titles/?category={categories[0]["slug"]}',
+            '/api/v1/titles/?fields=id,name&ordering=-year',
+            '/api/v1/titles/?search=a&genre_mode=any',
+            '/api/v1/genres/?search=a&page_size=1',
+            f'/api/v1/categories/?slug={categories[0]["slug"]}',
+            f'/api/v1/titles/{title_id}/?omit=genre,score_histogram',
+            f'/api/v1/titles/{title_id}/?expand=reviews&fields=id,reviews',
+            f'{reviews_url}?fields=id,score',
+            f'{reviews_url}{review["id"]}/?omit=author',
+        ]
+        fallbacks = []
+
+        async def fallback(request):
+            fallbacks.append(request.get_full_path())
+            return await original(request)
+
+        original = async_views.fallback
+        monkeypatch.setattr(async_views, 'fallback', fallback)
+
+        async def fetch_all():
+            async_client = AsyncClient()
+            return [
+                await async_client.get(
+                    url, authorization=f'Bearer {token_user["access"]}'
+                )
+                for url in urls
+            ]
+
+        responses = asyncio.run(fetch_all())
+        for url, response in zip(urls, responses):
+            expected = user_client.get(url)
+            assert (response.status_code, response.json()) == (
+                expected.status_code, expected.json()
+            ), (
+                f'Проверьте, что ответ на `{url}` под ASGI совпадает с '
+                'ответом под WSGI.'
+            )
+        assert fallbacks == [], (
+            'Проверьте, что запросы с заголовком Authorization и с '
+            'параметрами фильтрации, поиска, сортировки и выбора полей '
+            'обслуживают асинхронные представления без передачи '
+            'синхронным.'
+        )
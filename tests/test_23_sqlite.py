@@ -0,0 +1,33 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.sqlite import apply_pragmas
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Sqlite:
+
+    def test_01_pragmas(self, monkeypatch):
+        monkeypatch.setitem(
+            connection.settings_dict, 'PRAGMAS', {'cache_size': -1234}
+        )
+        apply_pragmas(connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone() == (-1234,), (
+                'Проверьте, что при открытии соединения выполняются PRAGMA '
+                'из настроек БД.'
+            )
+
+    def test_02_maintenance(self):
+        out = StringIO()
+        call_command('maintain_sqlite', stdout=out)
+        output = out.getvalue()
+        for step in ('ANALYZE', 'PRAGMA optimize', 'incremental_vacuum',
+                     'wal_checkpoint'):
+            assert f'{step}:' in output, (
+                f'Проверьте, что команда maintain_sqlite выполняет {step}.'
+            )
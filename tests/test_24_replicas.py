@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from api.middleware import get_token_user_id
+from api_yamdb.db_routers import (ReplicaRouter, fresh_replicas,
+                                  has_recent_write, readable_replicas,
+                                  recent_write_key, recent_write_seq,
+                                  replica_cache)
+from reviews.models import ChangeLogEntry, Title, User
+from reviews.sqlite import copy_database
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Replicas:
+
+    def test_01_router(self, settings):
+        settings.DATABASE_REPLICAS = ['replica1']
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) == 'default', (
+            'Проверьте, что без разрешения для запроса чтение идёт с '
+            'основной БД.'
+        )
+        token = readable_replicas.set(['replica1'])
+        try:
+            assert router.db_for_read(Title) == 'replica1', (
+                'Проверьте, что разрешённое чтение направляется на реплику.'
+            )
+            assert router.db_for_read(User) == 'default', (
+                'Проверьте, что пользователи всегда читаются из основной БД.'
+            )
+            assert router.db_for_write(Title) == 'default', (
+                'Проверьте, что запись всегда идёт в основную БД.'
+            )
+        finally:
+            readable_replicas.reset(token)
+        assert router.allow_migrate('replica1', 'reviews') is False, (
+            'Проверьте, что миграции не применяются к репликам.'
+        )
+
+    def test_02_recent_write(self, admin_client, user_client, user,
+                             settings):
+        replica_cache().clear()
+        titles, _, _ = create_titles(admin_client)
+        assert not has_recent_write(user.id), (
+            'Проверьте, что отметка о записи ставится только после записи.'
+        )
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+        seq = ChangeLogEntry.objects.order_by('-seq').first().seq
+        assert recent_write_seq(user.id) == seq, (
+            'Проверьте, что после успешной записи запоминается номер '
+            'последней записи журнала изменений.'
+        )
+
+        # Реплики в тестах используют основную БД.
+        settings.DATABASE_REPLICAS = ['default']
+        replica_cache().set(recent_write_key(user.id), seq + 1)
+        assert fresh_replicas(user.id, seq + 1) == [], (
+            'Проверьте, что пользователь не читает с реплики, которая не '
+            'содержит его последнюю запись.'
+        )
+        assert has_recent_write(user.id)
+        assert fresh_replicas(user.id, seq) == ['default'], (
+            'Проверьте, что пользователь читает с реплики, которая '
+            'содержит его последнюю запись.'
+        )
+        assert not has_recent_write(user.id), (
+            'Проверьте, что отметка о записи удаляется, когда все реплики '
+            'её догнали.'
+        )
+
+    def test_03_token_user_id(self, token_user, user):
+        request = APIRequestFactory().get(
+            '/api/v1/titles/',
+            HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+        )
+        assert get_token_user_id(request) == user.id, (
+            'Проверьте, что id пользователя берётся из JWT-токена.'
+        )
+        request = APIRequestFactory().get(
+            '/api/v1/titles/', HTTP_AUTHORIZATION='Bearer invalid'
+        )
+        assert get_token_user_id(request) is None, (
+            'Проверьте, что для неверного токена id пользователя не '
+            'определяется.'
+        )
+
+    def test_04_copy_database(self, admin_client, tmp_path):
+        create_titles(admin_client)
+        target = tmp_path / 'replica.sqlite3'
+        copy_database(connection, str(target), pages=1)
+        replica = sqlite3.connect(target)
+        try:
+            count, = replica.execute(
+                f'SELECT COUNT(*) FROM {Title._meta.db_table}'
+            ).fetchone()
+        finally:
+            replica.close()
+        assert count == Title.objects.count(), (
+            'Проверьте, что реплика содержит копию основной БД.'
+        )
@@ -0,0 +1,119 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+
+from api_yamdb.db_routers import AppRouter, load_related
+from reviews.models import Comment, Review, Title, User
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25UserLinks:
+
+    def test_01_router(self, settings):
+        router = AppRouter()
+        assert router.db_for_read(User) is None, (
+            'Проверьте, что без отдельной БД пользователи хранятся в '
+            'основной БД.'
+        )
+        settings.USERS_DATABASE = 'users'
+        assert router.db_for_write(User) == 'users', (
+            'Проверьте, что пользователи хранятся в БД USERS_DATABASE.'
+        )
+        assert router.db_for_read(Review) is None, (
+            'Проверьте, что отзывы хранятся в основной БД.'
+        )
+        assert router.allow_migrate('users', 'auth') is True, (
+            'Проверьте, что миграции приложений пользователей применяются '
+            'к БД пользователей.'
+        )
+        assert router.allow_migrate('users', 'reviews') is False, (
+            'Проверьте, что миграции каталога не применяются к БД '
+            'пользователей.'
+        )
+
+    def test_02_load_related(self, settings):
+        reviews = load_related(Review.objects.all(), 'author', 'title')
+        assert reviews.query.select_related == {'author': {}, 'title': {}}, (
+            'Проверьте, что связи в пределах одной БД загружаются '
+            'соединением таблиц.'
+        )
+        settings.USERS_DATABASE = 'users'
+        reviews = load_related(Review.objects.all(), 'author', 'title')
+        assert reviews.query.select_related == {'title': {}}, (
+            'Проверьте, что авторы из другой БД не соединяются с отзывами.'
+        )
+        assert reviews._prefetch_related_lookups == ('author',), (
+            'Проверьте, что авторы из другой БД загружаются отдельным '
+            'запросом.'
+        )
+
+    def test_03_delete_user(self, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Текст', 5
+        ).json()
+        create_single_comment(
+            admin_client, titles[0]['id'], review['id'], 'Комментарий'
+        )
+        create_single_comment(
+            user_client, titles[0]['id'], review['id'], 'Комментарий'
+        )
+        other_review = create_single_review(
+            admin_client, titles[1]['id'], 'Текст', 3
+        ).json()
+        create_single_comment(
+            user_client, titles[1]['id'], other_review['id'], 'Комментарий'
+        )
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204, (
+            'Проверьте, что администратор может удалить пользователя.'
+        )
+        assert not Review.objects.filter(author_id=user.id).exists(), (
+            'Проверьте, что отзывы удалённого пользователя удаляются.'
+        )
+        assert not Comment.objects.filter(author_id=user.id).exists(), (
+            'Проверьте, что комментарии удалённого пользователя удаляются.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.review_count, title.rating) == (0, None), (
+            'Проверьте, что при удалении данных пользователя обновляются '
+            'счётчики и рейтинг произведения.'
+        )
+        assert Review.objects.get(pk=other_review['id']).comment_count == 0, (
+            'Проверьте, что при удалении комментариев пользователя '
+            'обновляется счётчик комментариев отзыва.'
+        )
+
+    def test_04_check_author(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        with pytest.raises(IntegrityError):
+            Review.objects.create(
+                title_id=titles[0]['id'], author_id=10 ** 6, text='Текст',
+                score=5
+            )
+
+    def test_05_cleanup(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        Review.objects.bulk_create([
+            Review(title_id=titles[0]['id'], author_id=10 ** 6, text='Текст',
+                   score=5),
+            Review(title_id=titles[1]['id'], author_id=admin.id,
+                   text='Текст', score=5),
+        ])
+        Title.objects.refresh_rating()
+        out = StringIO()
+        call_command('cleanup_user_data', '--dry-run', stdout=out)
+        assert Review.objects.count() == 2, (
+            'Проверьте, что с параметром --dry-run данные не удаляются.'
+        )
+        call_command('cleanup_user_data', stdout=out)
+        assert list(Review.objects.values_list('author_id', flat=True)) == [
+            admin.id
+        ], (
+            'Проверьте, что команда cleanup_user_data удаляет только данные '
+            'отсутствующих пользователей.'
+        )